@@ -0,0 +1,47 @@
+"""Compare the assignment engine with the flow engines when opening a day costs nothing.
+
+Usage: python benchmarks/assignment.py [--students 400] [--days 15] [--slots 16] [--repeat 3]
+"""
+
+import argparse
+import time
+
+from support import install_studio, load_schedule_service, make_studio
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=400)
+    parser.add_argument("--days", type=int, default=15)
+    parser.add_argument("--slots", type=int, default=16)
+    parser.add_argument("--density", type=float, default=0.3)
+    parser.add_argument("--gap-penalty", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    schedule_service = load_schedule_service()
+    studio = make_studio(args.students, args.days, args.slots, args.density, seed=args.seed)
+    install_studio(schedule_service, studio)
+
+    timings = {}
+    for engine in ("assignment", "ssp", "cost_scaling"):
+        best = float("inf")
+        for _ in range(args.repeat):
+            schedule_service.schedule_cache.result_cache.clear()
+            started = time.perf_counter()
+            result = schedule_service.generate_schedule(
+                studio.id, day_open_cost=0, gap_penalty=args.gap_penalty, engine=engine
+            )
+            best = min(best, time.perf_counter() - started)
+        timings[engine] = best
+        print(
+            f"{engine}: generate_seconds={best:.3f} scheduled={result['scheduled_count']} "
+            f"cost={result['objective_cost']}"
+        )
+    for engine in ("ssp", "cost_scaling"):
+        print(f"speedup_vs_{engine}={timings[engine] / timings['assignment']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Compare whole-problem, per-component and process-pool solves of a blocked studio.
+
+Usage: python benchmarks/components.py [--students 300] [--days 15] [--blocks 3] [--workers 3]
+"""
+
+import argparse
+import time
+
+from support import install_studio, load_schedule_service, make_studio
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--days", type=int, default=15)
+    parser.add_argument("--slots", type=int, default=16)
+    parser.add_argument("--density", type=float, default=0.3)
+    parser.add_argument("--blocks", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", default="auto")
+    args = parser.parse_args()
+
+    schedule_service = load_schedule_service()
+    from server.services import schedule_core
+
+    studio = make_studio(
+        args.students, args.days, args.slots, args.density, seed=args.seed, blocks=args.blocks
+    )
+    install_studio(schedule_service, studio)
+
+    def timed(label, split):
+        schedule_service.schedule_cache.result_cache.clear()
+        original = schedule_core._split_components
+        if not split:
+            schedule_core._split_components = lambda day_slot_map, slot_metadata, slot_students, student_ids: [
+                schedule_core._SubProblem(
+                    day_slot_map, slot_metadata, slot_students, list(student_ids), list(slot_metadata)
+                )
+            ]
+        try:
+            started = time.perf_counter()
+            result = schedule_service.generate_schedule(studio.id, slot_minutes=30, engine=args.engine)
+            elapsed = time.perf_counter() - started
+        finally:
+            schedule_core._split_components = original
+        print(
+            f"{label}: seconds={elapsed:.3f} engine={result['engine']} "
+            f"scheduled={result['scheduled_count']} objective_cost={result['objective_cost']}"
+        )
+        return result
+
+    schedule_core.configure_component_pool(1)
+    timed("whole", split=False)
+    serial = timed("components", split=True)
+
+    schedule_core.configure_component_pool(args.workers)
+    schedule_core._get_component_pool().submit(int).result()  # start the workers outside the timing
+    parallel = timed(f"components x{args.workers} processes", split=True)
+    schedule_core.configure_component_pool(1)
+
+    print(f"parallel_matches_serial={parallel == serial}")
+
+
+if __name__ == "__main__":
+    main()
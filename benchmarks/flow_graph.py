@@ -0,0 +1,64 @@
+"""Measure the residual graph footprint and solve time of ``_MinCostFlow``.
+
+Usage: python benchmarks/flow_graph.py [--students 200] [--days 15] [--slots 16] [--engine auto]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from support import install_studio, load_schedule_service, make_studio
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--days", type=int, default=15)
+    parser.add_argument("--slots", type=int, default=16)
+    parser.add_argument("--density", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", default="auto")
+    args = parser.parse_args()
+
+    schedule_service = load_schedule_service()
+    from server.services import schedule_core
+
+    studio = make_studio(args.students, args.days, args.slots, args.density, seed=args.seed)
+    install_studio(schedule_service, studio)
+
+    graphs = []
+    engines = dict(schedule_core._SOLVER_ENGINES)
+
+    def recording(engine):
+        def solve(network, target_flow):
+            started = time.perf_counter()
+            solved = engine(network, target_flow)
+            graphs.append((network.solver, time.perf_counter() - started))
+            return solved
+
+        return solve
+
+    schedule_core._SOLVER_ENGINES.update({name: recording(engine) for name, engine in engines.items()})
+    try:
+        started = time.perf_counter()
+        result = schedule_service.generate_schedule(studio.id, slot_minutes=30, engine=args.engine)
+        elapsed = time.perf_counter() - started
+    finally:
+        schedule_core._SOLVER_ENGINES.update(engines)
+
+    # A second, traced run for memory: tracemalloc slows the solve down too much to time it.
+    schedule_service.schedule_cache.result_cache.clear()
+    tracemalloc.start()
+    schedule_service.generate_schedule(studio.id, slot_minutes=30, engine=args.engine)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    graph, solve_seconds = graphs[0]
+    print(f"nodes={graph.node_count} arcs={graph.edge_count}")
+    print(f"graph_bytes={graph.memory_bytes()} peak_traced_bytes={peak}")
+    print(f"generate_seconds={elapsed:.3f} solve_seconds={solve_seconds:.3f}")
+    print(f"engine={result['engine']} scheduled={result['scheduled_count']} objective_cost={result['objective_cost']}")
+
+
+if __name__ == "__main__":
+    main()
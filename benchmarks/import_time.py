@@ -0,0 +1,74 @@
+"""Measure how long a fresh process takes to import the solver and to start a pool worker.
+
+Usage: python benchmarks/import_time.py [--repeat 5]
+
+Each import runs in a new interpreter, best of ``--repeat``, with the
+modules it loaded counted. ``schedule_core`` needs no Flask or SQLAlchemy;
+``schedule_service`` does, and is reported as unavailable where they are not
+installed. The pool line is the first-result latency of a spawned process
+pool solving a tiny sub-problem: the task pickles ``_solve_sub_problem`` by
+reference to ``schedule_core``, so that is all the worker imports.
+"""
+
+import argparse
+import multiprocessing
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from support import ROOT_DIR
+
+_MODULES = ("server.services.schedule_core", "server.services.schedule_service")
+_PROBE = (
+    "import sys, time\n"
+    "started = time.perf_counter()\n"
+    "import {module}\n"
+    "print(time.perf_counter() - started, len(sys.modules))\n"
+)
+
+
+def _import_once(module):
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module)], cwd=ROOT_DIR, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        return None, completed.stderr.strip().splitlines()[-1]
+    seconds, module_count = completed.stdout.split()
+    return float(seconds), int(module_count)
+
+
+def _tiny_problem(schedule_core):
+    day = datetime(2024, 1, 1, 9, 0)
+    return schedule_core._SubProblem({day.date(): [0]}, {0: (day.date(), day, 0)}, {0: [1]}, [1], [0])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for module in _MODULES:
+        runs = [_import_once(module) for _ in range(args.repeat)]
+        timed = [run for run in runs if run[0] is not None]
+        if not timed:
+            print(f"{module}: unavailable ({runs[0][1]})")
+            continue
+        seconds, module_count = min(timed)
+        print(f"{module}: import_seconds={seconds:.4f} modules_loaded={module_count}")
+
+    from server.services import schedule_core
+
+    problem = _tiny_problem(schedule_core)
+    best = float("inf")
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            pool.submit(schedule_core._solve_sub_problem, problem, 10_000, 5, "ssp").result()
+        best = min(best, time.perf_counter() - started)
+    print(f"spawned worker first result: seconds={best:.4f}")
+
+
+if __name__ == "__main__":
+    main()
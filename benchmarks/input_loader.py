@@ -0,0 +1,126 @@
+"""Compare the ORM and the columnar loading of generate_schedule's inputs.
+
+Usage: python benchmarks/input_loader.py [--students 300] [--days 30] [--slots 16] [--repeat 5]
+
+Unlike the other benchmarks this one needs Flask-SQLAlchemy: it writes a
+studio into a SQLite file and loads it back both ways. The ORM way is what
+generate used to do (``Schedule.query.get`` and the lazy ``students`` and
+``availabilities`` relationships); the columnar way is
+``_load_generate_inputs``, which reads plain rows from two narrow SELECTs.
+Each load starts from an empty session, so nothing comes from the identity
+map. Times are the best of ``--repeat``; peak memory comes from one more
+load under ``tracemalloc``.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from support import ROOT_DIR, TEACHER_ID, load_schedule_service, make_studio
+
+sys.path.insert(0, os.path.join(ROOT_DIR, "server"))
+
+from flask import Flask  # noqa: E402
+
+from extensions import db  # noqa: E402
+from models.models import Availability, Schedule, Student, Teacher  # noqa: E402
+
+
+def _store_studio(studio) -> None:
+    db.session.add(Teacher(id=TEACHER_ID, email="teacher@example.com", password="-", name="Teacher"))
+    db.session.add(Schedule(id=studio.id, title="Benchmark", slug="benchmark", days=studio.days, teacher_id=TEACHER_ID))
+    db.session.execute(
+        Student.__table__.insert(),
+        [
+            {"id": student.id, "name": student.name, "lesson_length": student.lesson_length, "schedule_id": studio.id}
+            for student in studio.students
+        ],
+    )
+    db.session.execute(
+        Availability.__table__.insert(),
+        [
+            {
+                "start_time": availability.start_time,
+                "schedule_id": studio.id,
+                "student_id": availability.student_id,
+                "teacher_id": availability.teacher_id,
+            }
+            for availability in studio.availabilities
+        ],
+    )
+    db.session.commit()
+
+
+def _measure(load, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        load()
+        best = min(best, time.perf_counter() - started)
+    db.session.expunge_all()
+    tracemalloc.start()
+    load()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--slots", type=int, default=16)
+    parser.add_argument("--density", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    schedule_service = load_schedule_service()
+    studio = make_studio(args.students, args.days, args.slots, args.density, seed=args.seed)
+
+    def orm_load():
+        schedule = Schedule.query.get(studio.id)
+        students = list(schedule.students)
+        teacher_slots, student_slots = schedule_service._slots_from_rows(
+            (
+                (availability.student_id, availability.teacher_id, availability.start_time)
+                for availability in schedule.availabilities
+            ),
+            schedule.teacher_id,
+        )
+        return students, teacher_slots, student_slots
+
+    def columnar_load():
+        return schedule_service._load_generate_inputs(studio.id, None, None, 0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = Flask(__name__)
+        app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(directory, 'studio.db')}"
+        app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            _store_studio(studio)
+            students, teacher_slots, student_slots = orm_load()
+            inputs = columnar_load()
+            assert [student.id for student in students] == [student.id for student in inputs.students]
+            assert {day: sorted(times) for day, times in teacher_slots.items()} == {
+                day: sorted(times) for day, times in inputs.teacher_slots.items()
+            }
+            assert student_slots == inputs.student_slots, "both loads must see the same availability"
+            orm_seconds, orm_peak = _measure(orm_load, args.repeat)
+            columnar_seconds, columnar_peak = _measure(columnar_load, args.repeat)
+            db.session.remove()
+
+    print(f"availability_rows={len(studio.availabilities)} students={len(studio.students)}")
+    print(f"orm: load_seconds={orm_seconds:.4f} peak_memory_bytes={orm_peak}")
+    print(f"columnar: load_seconds={columnar_seconds:.4f} peak_memory_bytes={columnar_peak}")
+    print(f"speedup={orm_seconds / columnar_seconds:.2f}x memory_ratio={orm_peak / columnar_peak:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
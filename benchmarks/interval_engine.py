@@ -0,0 +1,104 @@
+"""Measure what the interval engine's generality costs against the flow engines.
+
+Usage: python benchmarks/interval_engine.py [--students 200] [--days 15] [--slots 16] [--repeat 3]
+
+On uniform lesson lengths both models see the same candidate starts, so the
+interval engine's time and cost are compared with the default flow engine
+end to end; the interval engine solves such a model with the flow engines
+and the exact day search, so the cost delta is what proving it saves. With
+``--lesson-mix`` the flow engine can only run on a grid as long as the
+longest lesson, and the comparison shows how many more students the exact
+lengths fit.
+"""
+
+import argparse
+import time
+from datetime import timedelta
+
+from support import install_studio, load_schedule_service, make_studio
+
+
+def _best_generate(schedule_service, schedule_id, repeat, **options):
+    best = float("inf")
+    for _ in range(repeat):
+        schedule_service.schedule_cache.result_cache.clear()
+        started = time.perf_counter()
+        result = schedule_service.generate_schedule(schedule_id, diagnostics=True, **options)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def _describe(label, seconds, result):
+    networks = result["diagnostics"]["networks"]
+    parts = [
+        f"{label}: generate_seconds={seconds:.3f}",
+        f"scheduled={result['scheduled_count']}",
+        f"cost={result['objective_cost']}",
+        f"nodes={networks['nodes']} arcs={networks['edges']}",
+    ]
+    if result.get("optimal") is False:
+        parts.append(f"optimal=unproven cost_gap_bound={result.get('cost_gap_bound', 'unknown')}")
+    print(" ".join(parts))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--days", type=int, default=15)
+    parser.add_argument("--slots", type=int, default=16)
+    parser.add_argument("--density", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--lesson-mix",
+        type=lambda value: tuple(int(length) for length in value.split(",")),
+        help="comma-separated lesson lengths, e.g. 30,45,60 (the grid stays 30 minutes)",
+    )
+    args = parser.parse_args()
+
+    schedule_service = load_schedule_service()
+    from server.services import schedule_core
+
+    studio = make_studio(
+        args.students, args.days, args.slots, args.density, seed=args.seed, lesson_mix=args.lesson_mix
+    )
+    install_studio(schedule_service, studio)
+
+    interval_seconds, interval = _best_generate(schedule_service, studio.id, args.repeat, engine="interval")
+    if not args.lesson_mix:
+        flow_seconds, flow = _best_generate(schedule_service, studio.id, args.repeat)
+        _describe(f"flow ({flow['engine']})", flow_seconds, flow)
+        _describe("interval", interval_seconds, interval)
+        print(
+            f"slowdown={interval_seconds / flow_seconds:.2f}x "
+            f"cost_delta={interval['objective_cost'] - flow['objective_cost']}"
+        )
+        return
+
+    # The flow model fits one lesson length, so it runs raw on a grid as
+    # long as the longest lesson.
+    longest = max(args.lesson_mix)
+    student_ids = [student.id for student in studio.students]
+    matrix = schedule_core._AvailabilityMatrix.build(
+        *schedule_service._slots_from_rows(schedule_service._fetch_availability_rows(studio.id), studio.teacher_id),
+        student_ids,
+        schedule_service._parse_schedule_days(studio.days),
+    )
+    day_slot_map, slot_metadata, slot_students = schedule_core._build_candidate_slots(
+        matrix, timedelta(minutes=longest)
+    )
+    best = float("inf")
+    for _ in range(args.repeat):
+        network = schedule_core._FlowNetwork(
+            day_slot_map, slot_metadata, slot_students, student_ids, 10_000, 5
+        )
+        started = time.perf_counter()
+        flow, cost = network.solve_cost_scaling(len(student_ids))
+        best = min(best, time.perf_counter() - started)
+    print(f"flow on a {longest}-minute grid: solve_seconds={best:.3f} scheduled={flow} cost={cost}")
+    _describe("interval", interval_seconds, interval)
+    print(f"extra_scheduled={interval['scheduled_count'] - flow}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compare rolling-horizon generation with the monolithic solve on a term-long schedule.
+
+Usage: python benchmarks/rolling_horizon.py [--students 600] [--days 105] [--horizons 7,14] [--repairs 0,1]
+
+Each line is one generate call: the monolithic solve first, then every
+``horizon_days`` and ``horizon_repair`` combination, with its time, how
+many students it scheduled and its cost against the monolithic ones.
+"""
+
+import argparse
+import time
+
+from support import install_studio, load_schedule_service, make_studio
+
+
+def _integers(value):
+    return tuple(int(number) for number in value.split(","))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=600)
+    parser.add_argument("--days", type=int, default=105)
+    parser.add_argument("--slots", type=int, default=16)
+    parser.add_argument("--density", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", default="auto")
+    parser.add_argument("--horizons", type=_integers, default=(7, 14))
+    parser.add_argument("--repairs", type=_integers, default=(0, 1))
+    args = parser.parse_args()
+
+    schedule_service = load_schedule_service()
+    studio = make_studio(args.students, args.days, args.slots, args.density, seed=args.seed, clustering=0.5)
+    install_studio(schedule_service, studio)
+
+    def timed(**options):
+        schedule_service.schedule_cache.result_cache.clear()
+        started = time.perf_counter()
+        result = schedule_service.generate_schedule(studio.id, engine=args.engine, diagnostics=True, **options)
+        return time.perf_counter() - started, result
+
+    monolithic_seconds, monolithic = timed()
+    print(
+        f"monolithic ({monolithic['engine']}): seconds={monolithic_seconds:.3f} "
+        f"scheduled={monolithic['scheduled_count']} cost={monolithic['objective_cost']}"
+    )
+    for horizon_days in args.horizons:
+        for horizon_repair in args.repairs:
+            seconds, result = timed(horizon_days=horizon_days, horizon_repair=horizon_repair)
+            counters = result["diagnostics"]["counters"]
+            print(
+                f"horizon_days={horizon_days} horizon_repair={horizon_repair}: seconds={seconds:.3f} "
+                f"speedup={monolithic_seconds / seconds:.2f}x scheduled={result['scheduled_count']} "
+                f"cost={result['objective_cost']} "
+                f"cost_ratio={result['objective_cost'] / monolithic['objective_cost']:.4f} "
+                f"repairs_kept={counters.get('horizon_repairs_kept', 0)}/{counters.get('horizon_repairs', 0)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""Run the synthetic-studio benchmark suite and check it against a committed baseline.
+
+Usage:
+    python benchmarks/suite.py [--quick] [--output results.json]
+    python benchmarks/suite.py --baseline benchmarks/baseline.json [--threshold 0.5]
+    python benchmarks/suite.py --update-baseline
+
+Every scenario runs in a fresh interpreter, so its peak RSS is its own; the
+retained size of the residual graph is recorded alongside it. Each
+one times ``generate_schedule`` end to end (stubbed models, cold cache, best
+of ``--repeat``) and the raw solver on the same candidate graph. Times are
+also stored divided by a fixed pure-Python calibration loop timed in the
+same interpreter, and those
+normalized times are what get compared, so a baseline recorded on one
+machine stays usable on another. A scenario regresses when its normalized
+time or memory grows past ``--threshold``, or when it schedules fewer
+students or at a higher objective cost than the baseline.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from datetime import timedelta
+
+from support import install_studio, load_schedule_service, make_studio
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# name -> (make_studio arguments, engine of the raw solve, engine generate_schedule runs)
+SCENARIOS = {
+    "small-uniform": (dict(students=30, days=5, slots_per_day=10, density=0.3), "cost_scaling", "cost_scaling"),
+    "small-uniform-ssp": (dict(students=30, days=5, slots_per_day=10, density=0.3), "ssp", "ssp"),
+    "medium-clustered": (
+        dict(students=100, days=10, slots_per_day=16, density=0.25, clustering=0.7),
+        "cost_scaling",
+        "cost_scaling",
+    ),
+    "medium-clustered-ssp": (
+        dict(students=100, days=10, slots_per_day=16, density=0.25, clustering=0.7),
+        "ssp",
+        "ssp",
+    ),
+    "large-uniform": (
+        dict(students=200, days=15, slots_per_day=16, density=0.3),
+        "cost_scaling",
+        "cost_scaling",
+    ),
+    "large-uniform-ssp": (dict(students=200, days=15, slots_per_day=16, density=0.3), "ssp", "ssp"),
+    "large-blocks": (dict(students=300, days=15, slots_per_day=16, density=0.3, blocks=3), "auto", "auto"),
+    # The flow model fits one lesson length, so the raw solve runs on a grid
+    # as long as the longest lesson; generate runs the interval engine, which
+    # gives every student their own length.
+    "mixed-lengths": (
+        dict(students=80, days=8, slots_per_day=16, density=0.3, lesson_mix=(30, 45, 60)),
+        "cost_scaling",
+        "interval",
+    ),
+}
+QUICK_SCENARIOS = ("small-uniform", "small-uniform-ssp", "medium-clustered", "mixed-lengths")
+# Timings shorter than this are mostly noise and are not checked for regressions.
+MIN_COMPARED_SECONDS = 0.05
+
+
+def calibrate() -> float:
+    """Best-of-five time of a fixed integer/list workload, as a machine speed unit."""
+
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        values = list(range(200_000))
+        total = 0
+        for index in range(len(values)):
+            total += values[index] * 3 // 2
+        values.sort(key=lambda value: -value)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run_scenario(name: str, repeat: int) -> dict:
+    studio_args, engine, generate_engine = SCENARIOS[name]
+    schedule_service = load_schedule_service()
+    from server.services import schedule_core
+
+    studio = make_studio(seed=0, **studio_args)
+    install_studio(schedule_service, studio)
+    record = {"scenario": name, "engine": engine, "students": len(studio.students), "calibration_seconds": calibrate()}
+
+    # Mixed lengths keep their own; every other studio is on the 30 minute grid.
+    slot_minutes = None if "lesson_mix" in studio_args else 30
+    best = float("inf")
+    for _ in range(repeat):
+        schedule_service.schedule_cache.result_cache.clear()
+        started = time.perf_counter()
+        result = schedule_service.generate_schedule(studio.id, slot_minutes=slot_minutes, engine=generate_engine)
+        best = min(best, time.perf_counter() - started)
+    record["generate_seconds"] = best
+    record["generate_engine"] = result["engine"]
+    record["scheduled_count"] = result["scheduled_count"]
+    record["objective_cost"] = result["objective_cost"]
+
+    lesson_minutes = max(student.lesson_length for student in studio.students)
+    teacher_slots, student_slots = schedule_service._slots_from_rows(
+        schedule_service._fetch_availability_rows(studio.id), studio.teacher_id
+    )
+    student_ids = [student.id for student in studio.students]
+    matrix = schedule_core._AvailabilityMatrix.build(
+        teacher_slots,
+        student_slots,
+        student_ids,
+        schedule_service._parse_schedule_days(studio.days),
+    )
+    day_slot_map, slot_metadata, slot_students = schedule_core._build_candidate_slots(
+        matrix, timedelta(minutes=lesson_minutes)
+    )
+    engine_name = record["engine"] = schedule_service._resolve_engine(
+        None if engine == "auto" else engine, incremental=False
+    )
+    best = float("inf")
+    for _ in range(repeat):
+        network = schedule_core._FlowNetwork(
+            day_slot_map, slot_metadata, slot_students, student_ids, 10_000, 5
+        )
+        started = time.perf_counter()
+        flow, cost = schedule_core._SOLVER_ENGINES[engine_name](network, len(student_ids))
+        best = min(best, time.perf_counter() - started)
+    record["raw_solve_seconds"] = best
+    record["raw_scheduled_count"] = flow
+    record["raw_objective_cost"] = cost
+    record["nodes"] = network.solver.node_count
+    record["edges"] = network.solver.edge_count
+    record["graph_bytes"] = network.solver.memory_bytes()
+
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    record["peak_rss_bytes"] = peak if sys.platform == "darwin" else peak * 1024
+    return record
+
+
+def run_suite(names, repeat: int) -> dict:
+    records = []
+    for name in names:
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run-one", name, "--repeat", str(repeat)],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        record = json.loads(completed.stdout)
+        for key in ("generate_seconds", "raw_solve_seconds"):
+            if key in record:
+                record[key.replace("_seconds", "_normalized")] = record[key] / record["calibration_seconds"]
+        records.append(record)
+        print(_describe(record), file=sys.stderr)
+    return {"python": sys.version.split()[0], "scenarios": records}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Return one message per regression of ``results`` against ``baseline``."""
+
+    previous = {record["scenario"]: record for record in baseline["scenarios"]}
+    failures = []
+    for record in results["scenarios"]:
+        old = previous.get(record["scenario"])
+        if old is None:
+            continue
+        name = record["scenario"]
+        for key in ("generate_normalized", "raw_solve_normalized", "peak_rss_bytes", "graph_bytes"):
+            seconds_key = key.replace("_normalized", "_seconds")
+            if seconds_key != key and old.get(seconds_key, 0) < MIN_COMPARED_SECONDS:
+                continue
+            if key in old and key in record and record[key] > old[key] * (1 + threshold):
+                failures.append(f"{name}: {key} {record[key]:.4g} > baseline {old[key]:.4g} (+{threshold:.0%})")
+        for count_key, cost_key in (
+            ("scheduled_count", "objective_cost"),
+            ("raw_scheduled_count", "raw_objective_cost"),
+        ):
+            if count_key not in old or count_key not in record:
+                continue
+            if record[count_key] < old[count_key]:
+                failures.append(f"{name}: {count_key} {record[count_key]} < baseline {old[count_key]}")
+            elif record[count_key] == old[count_key] and record[cost_key] > old[cost_key]:
+                failures.append(f"{name}: {cost_key} {record[cost_key]} > baseline {old[cost_key]}")
+    return failures
+
+
+def _describe(record: dict) -> str:
+    parts = [f"{record['scenario']:<22} engine={record['engine']:<12}"]
+    if "generate_seconds" in record:
+        parts.append(
+            f"generate({record['generate_engine']})={record['generate_seconds']:.3f}s "
+            f"cost={record['objective_cost']}"
+        )
+    parts.append(f"raw_solve={record['raw_solve_seconds']:.3f}s")
+    parts.append(f"peak_rss={record['peak_rss_bytes'] / 2**20:.1f}MiB")
+    return " ".join(parts)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="only run the small and medium scenarios")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    parser.add_argument("--baseline", help="fail if the results regress against this baseline JSON")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--update-baseline", action="store_true", help=f"overwrite {BASELINE_PATH}")
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        print(json.dumps(run_scenario(args.run_one, args.repeat)))
+        return 0
+
+    names = args.scenario or (QUICK_SCENARIOS if args.quick else tuple(SCENARIOS))
+    results = run_suite(names, args.repeat)
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w") as handle:
+            json.dump(results, handle, indent=2)
+            handle.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            failures = compare(results, json.load(handle), args.threshold)
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""Shared helpers for the scheduling benchmarks.
+
+The benchmarks import ``schedule_service`` the same way
+``tests/services/test_schedule_generation.py`` does: the Flask/SQLAlchemy
+modules it imports are replaced with placeholders, and ``Schedule.query`` and
+the row fetchers are swapped for stubs that serve an in-memory studio.
+"""
+
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from types import ModuleType, SimpleNamespace
+from typing import Optional, Sequence
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+TEACHER_ID = 42
+
+
+def load_schedule_service():
+    if "extensions" not in sys.modules:
+        extensions_module = ModuleType("extensions")
+        extensions_module.db = SimpleNamespace()
+        sys.modules["extensions"] = extensions_module
+
+    if "models.models" not in sys.modules:
+        models_module = sys.modules.setdefault("models", ModuleType("models"))
+        models_models = ModuleType("models.models")
+        for name in ("Schedule", "Student", "Availability", "FinalizedSchedule"):
+            setattr(models_models, name, type(name, (), {}))
+        sys.modules["models.models"] = models_models
+        models_module.models = models_models
+
+    if "sqlalchemy" not in sys.modules:
+        sqlalchemy_module = ModuleType("sqlalchemy")
+        sqlalchemy_exc = ModuleType("sqlalchemy.exc")
+        sqlalchemy_orm = ModuleType("sqlalchemy.orm")
+        sqlalchemy_exc.IntegrityError = type("IntegrityError", (Exception,), {})
+        sqlalchemy_orm.joinedload = lambda *_args, **_kwargs: None
+        sqlalchemy_module.exc = sqlalchemy_exc
+        sqlalchemy_module.orm = sqlalchemy_orm
+        sys.modules["sqlalchemy"] = sqlalchemy_module
+        sys.modules["sqlalchemy.exc"] = sqlalchemy_exc
+        sys.modules["sqlalchemy.orm"] = sqlalchemy_orm
+
+    from server.services import schedule_service
+
+    return schedule_service
+
+
+class _QueryStub:
+    def __init__(self, mapping):
+        self._mapping = mapping
+
+    def get(self, key):
+        return self._mapping.get(key)
+
+
+def make_studio(
+    students: int = 200,
+    days: int = 15,
+    slots_per_day: int = 16,
+    density: float = 0.3,
+    lesson_length: int = 30,
+    seed: int = 0,
+    schedule_id: int = 1,
+    blocks: int = 1,
+    lesson_mix: Optional[Sequence[int]] = None,
+    clustering: float = 0.0,
+    grid_minutes: Optional[int] = None,
+):
+    """Build a schedule-shaped namespace with random student availability.
+
+    The teacher is free on a ``lesson_length`` grid of ``slots_per_day`` starts
+    every day, and each student is free at each start with probability
+    ``density``.
+
+    With ``blocks`` > 1, students and days are dealt round-robin into that many
+    groups and students are only ever available on their own group's days.
+    ``lesson_mix`` draws each student's lesson length from the given lengths
+    instead of using ``lesson_length``. ``clustering`` (0..1) moves that share
+    of each student's availability into a window of three days and a quarter
+    of the day around a random centre, keeping the expected density the same.
+    ``grid_minutes`` spaces the starts more finely than the lessons.
+    """
+
+    rng = random.Random(seed)
+    grid_minutes = grid_minutes or lesson_length
+    first_day = datetime(2024, 1, 1, 9, 0)
+    day_starts = [first_day + timedelta(days=offset) for offset in range(days)]
+
+    availabilities = []
+    for day_start in day_starts:
+        for index in range(slots_per_day):
+            availabilities.append(
+                SimpleNamespace(
+                    start_time=day_start + timedelta(minutes=grid_minutes * index),
+                    teacher_id=TEACHER_ID,
+                    student_id=None,
+                )
+            )
+
+    day_window = min(3, days)
+    slot_window = max(1, slots_per_day // 4)
+    window_boost = (days * slots_per_day) / (day_window * slot_window)
+
+    student_rows = []
+    for student_id in range(1, students + 1):
+        length = rng.choice(lesson_mix) if lesson_mix else lesson_length
+        student_rows.append(SimpleNamespace(id=student_id, name=f"Student {student_id}", lesson_length=length))
+        if clustering:
+            centre_day = rng.randrange(days - day_window + 1)
+            centre_slot = rng.randrange(slots_per_day - slot_window + 1)
+        for day_offset, day_start in enumerate(day_starts):
+            if day_offset % blocks != student_id % blocks:
+                continue
+            for index in range(slots_per_day):
+                probability = density
+                if clustering:
+                    inside = (
+                        centre_day <= day_offset < centre_day + day_window
+                        and centre_slot <= index < centre_slot + slot_window
+                    )
+                    probability = density * ((1 - clustering) + clustering * window_boost * inside)
+                if rng.random() < probability:
+                    availabilities.append(
+                        SimpleNamespace(
+                            start_time=day_start + timedelta(minutes=grid_minutes * index),
+                            teacher_id=None,
+                            student_id=student_id,
+                        )
+                    )
+
+    dates = [day_start.date().isoformat() for day_start in day_starts]
+    return SimpleNamespace(
+        id=schedule_id,
+        teacher_id=TEACHER_ID,
+        days=json.dumps(dates),
+        dates=dates,
+        students=student_rows,
+        availabilities=availabilities,
+    )
+
+
+def install_studio(schedule_service, studio) -> None:
+    schedule_service.Schedule = SimpleNamespace(query=_QueryStub({studio.id: studio}))
+    student_rows = [
+        schedule_service._StudentRow(student.id, student.lesson_length, student.name) for student in studio.students
+    ]
+    availability_rows = [
+        (availability.student_id, availability.teacher_id, availability.start_time)
+        for availability in studio.availabilities
+    ]
+    schedule_service._fetch_student_rows = lambda _schedule_id: student_rows
+    schedule_service._fetch_availability_rows = lambda _schedule_id: availability_rows
@@ -1,11 +1,11 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 
 from schemas.schedule_schema import (
     schedule_detail_schema,
     schedule_public_schema,
     schedules_schema,
 )
-from services import schedule_service
+from services import feasibility_service, generation_jobs, schedule_cache, schedule_service, speculative_solves
 from .auth_decorator import token_required
 
 schedules_bp = Blueprint('schedules_bp', __name__, url_prefix='/api/schedules')
@@ -95,18 +95,80 @@ def finalize_schedule(current_teacher_id, schedule_id):
         return jsonify({"error": str(e)}), 500
 
 
+def _generate_options(data: dict) -> dict:
+    return {
+        'slot_minutes': data.get('slot_minutes'),
+        'buffer_minutes': data.get('buffer_minutes', 0),
+        'day_open_cost': data.get('day_open_cost', 10_000),
+        'gap_penalty': data.get('gap_penalty', 5),
+        'incremental': bool(data.get('incremental', False)),
+        'engine': data.get('engine'),
+        'diagnostics': bool(data.get('diagnostics', False)),
+        'time_budget_ms': data.get('time_budget_ms'),
+        'k': data.get('k', 1),
+        'candidate_starts': data.get('candidate_starts', 'greedy'),
+        'horizon_days': data.get('horizon_days'),
+        'horizon_repair': data.get('horizon_repair', 1),
+        'exact_days': bool(data.get('exact_days', False)),
+    }
+
+
 @schedules_bp.route('/<int:schedule_id>/generate', methods=['POST'])
 @token_required
 def generate_schedule(current_teacher_id, schedule_id):
     data = request.get_json() or {}
+    options = _generate_options(data)
+    if data.get('async'):
+        return _submit_generate_job(current_teacher_id, schedule_id, options)
     try:
         result = schedule_service.generate_schedule(
             schedule_id,
             teacher_id=current_teacher_id,
+            **options,
+        )
+        return jsonify(result), 200
+    except LookupError as exc:
+        return jsonify({"error": str(exc)}), 404
+    except PermissionError as exc:
+        return jsonify({"error": str(exc)}), 403
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@schedules_bp.route('/<int:schedule_id>/generate/sweep', methods=['POST'])
+@token_required
+def sweep_schedule(current_teacher_id, schedule_id):
+    data = request.get_json() or {}
+    try:
+        result = schedule_service.sweep_schedule(
+            schedule_id,
+            data.get('parameter_sets'),
             slot_minutes=data.get('slot_minutes'),
             buffer_minutes=data.get('buffer_minutes', 0),
-            day_open_cost=data.get('day_open_cost', 10_000),
-            gap_penalty=data.get('gap_penalty', 5),
+            teacher_id=current_teacher_id,
+            engine=data.get('engine'),
+        )
+        return jsonify(result), 200
+    except LookupError as exc:
+        return jsonify({"error": str(exc)}), 404
+    except PermissionError as exc:
+        return jsonify({"error": str(exc)}), 403
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@schedules_bp.route('/<int:schedule_id>/feasibility', methods=['GET'])
+@token_required
+def get_schedule_feasibility(current_teacher_id, schedule_id):
+    try:
+        result = feasibility_service.get_feasibility(
+            schedule_id,
+            current_teacher_id,
+            buffer_minutes=request.args.get('buffer_minutes', 0, type=int),
         )
         return jsonify(result), 200
     except LookupError as exc:
@@ -117,3 +179,38 @@ def generate_schedule(current_teacher_id, schedule_id):
         return jsonify({"error": str(exc)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+def _submit_generate_job(current_teacher_id, schedule_id, options):
+    if schedule_service.get_schedule(schedule_id, current_teacher_id) is None:
+        return jsonify({"error": "Schedule not found."}), 404
+
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            return schedule_service.generate_schedule(schedule_id, teacher_id=current_teacher_id, **options)
+
+    key = generation_jobs.make_job_key(schedule_id, current_teacher_id, options)
+    try:
+        job, _created = generation_jobs.jobs.submit(key, schedule_id, current_teacher_id, run)
+    except generation_jobs.JobQueueFullError as exc:
+        return jsonify({"error": str(exc)}), 503
+    return jsonify(job.to_dict()), 202
+
+
+@schedules_bp.route('/<int:schedule_id>/generate/<job_id>', methods=['GET'])
+@token_required
+def get_generate_job(current_teacher_id, schedule_id, job_id):
+    job = generation_jobs.jobs.get(job_id)
+    if job is None or job.schedule_id != schedule_id or job.teacher_id != current_teacher_id:
+        return jsonify({"error": "Generation job not found."}), 404
+    return jsonify(job.to_dict()), 200
+
+
+@schedules_bp.route('/generate/cache', methods=['GET'])
+@token_required
+def get_generate_cache_stats(current_teacher_id):
+    stats = schedule_cache.result_cache.stats()
+    stats['speculative'] = speculative_solves.solves.stats()
+    return jsonify(stats), 200
@@ -6,6 +6,7 @@ from api.schedules import schedules_bp
 from api.students import students_bp
 from api.availabilities import availabilities_bp
 from api.finalized_schedules import finalized_schedules_bp
+from services import generation_jobs, schedule_cache, schedule_core, speculative_solves
 
 
 def create_app(config_class=DevelopmentConfig):
@@ -15,6 +16,21 @@ def create_app(config_class=DevelopmentConfig):
 
     db.init_app(app)
 
+    schedule_cache.result_cache.configure(
+        max_entries=app.config['GENERATE_CACHE_MAX_ENTRIES'],
+        ttl_seconds=app.config['GENERATE_CACHE_TTL_SECONDS'],
+    )
+    schedule_core.configure_component_pool(app.config['GENERATE_PROCESS_WORKERS'])
+    generation_jobs.jobs.configure(
+        max_workers=app.config['GENERATE_JOB_WORKERS'],
+        max_pending=app.config['GENERATE_JOB_MAX_PENDING'],
+    )
+    speculative_solves.solves.configure(
+        delay_seconds=app.config['GENERATE_SPECULATIVE_DELAY_SECONDS'],
+        enabled=app.config['GENERATE_SPECULATIVE_SOLVE'],
+        context=app.app_context,
+    )
+
     app.register_blueprint(teachers_bp)
     app.register_blueprint(schedules_bp)
     app.register_blueprint(students_bp)
@@ -0,0 +1,127 @@
+"""Command-line tools for reproducing slow generate calls offline.
+
+Usage:
+    python server/cli.py export SCHEDULE_ID network.min [--day-open-cost 10000] [--gap-penalty 5]
+    python server/cli.py replay network.min [--engine ssp] [--repeat 3] [--top 25] [--whole]
+    python server/cli.py batch studios.ndjson [more files] [--output results.ndjson] [--workers 4]
+
+``export`` reads the schedule from the configured database and writes the
+flow network generate would solve as DIMACS, with a ``.json`` sidecar next
+to it (see ``services.network_export``). ``replay`` needs neither the
+database nor the app: it solves the files with any engine, prints each
+solve's time, and profiles the last one. ``batch`` generates schedules for
+studios defined in JSON or NDJSON files (see ``services.batch_generate``)
+and writes one result per line as each finishes, in input order.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from services import batch_generate, network_export
+
+
+def _export(args: argparse.Namespace) -> None:
+    # Only export reads the database, so only it loads the app.
+    from app import create_app
+    from services import schedule_service
+
+    with create_app().app_context():
+        inputs = schedule_service._load_generate_inputs(
+            args.schedule_id, None, args.slot_minutes, args.buffer_minutes
+        )
+    summary = network_export.export_network(
+        args.schedule_id,
+        inputs,
+        args.path,
+        day_open_cost=args.day_open_cost,
+        gap_penalty=args.gap_penalty,
+    )
+    print(json.dumps(summary, indent=2))
+
+
+def _replay(args: argparse.Namespace) -> None:
+    result = network_export.replay_network(
+        args.path,
+        args.engine,
+        repeat=args.repeat,
+        whole=args.whole,
+        profile_output=None if args.top == 0 else sys.stdout,
+        profile_limit=args.top,
+    )
+    for run, seconds in enumerate(result['solve_seconds'], start=1):
+        print(f'run {run}: solve_seconds={seconds:.4f}')
+    print(
+        f"engine={result['engine']} components={result['components']} "
+        f"scheduled={result['scheduled_count']} cost={result['objective_cost']} "
+        f"best_seconds={min(result['solve_seconds']):.4f}"
+    )
+
+
+def _batch(args: argparse.Namespace) -> None:
+    options = {
+        name: value
+        for name, value in (
+            ('slot_minutes', args.slot_minutes),
+            ('buffer_minutes', args.buffer_minutes),
+            ('day_open_cost', args.day_open_cost),
+            ('gap_penalty', args.gap_penalty),
+            ('engine', args.engine),
+            ('time_budget_ms', args.time_budget_ms),
+        )
+        if value is not None
+    }
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        records = batch_generate.generate_batch(batch_generate.read_studios(args.paths), options, args.workers)
+        for record in records:
+            output.write(json.dumps(record, separators=(',', ':'), default=str) + '\n')
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export = commands.add_parser('export', help='write a schedule\'s flow network as DIMACS plus a JSON sidecar')
+    export.add_argument('schedule_id', type=int)
+    export.add_argument('path', help='DIMACS file to write; the sidecar goes to PATH.json')
+    export.add_argument('--slot-minutes', type=int)
+    export.add_argument('--buffer-minutes', type=int, default=0)
+    export.add_argument('--day-open-cost', type=int, default=10_000)
+    export.add_argument('--gap-penalty', type=int, default=5)
+    export.set_defaults(run=_export)
+
+    replay = commands.add_parser('replay', help='solve an exported network under cProfile')
+    replay.add_argument('path', help='DIMACS file written by export, with its sidecar next to it')
+    replay.add_argument('--engine', help='solver engine; defaults to the one generate would pick')
+    replay.add_argument('--repeat', type=int, default=1)
+    replay.add_argument('--top', type=int, default=25, help='profiled functions to print; 0 skips profiling')
+    replay.add_argument('--whole', action='store_true', help='solve the network whole instead of by component')
+    replay.set_defaults(run=_replay)
+
+    batch = commands.add_parser('batch', help='generate schedules for studios read from JSON or NDJSON files')
+    batch.add_argument('paths', nargs='+', help='.json files hold a studio or a list of them, others NDJSON')
+    batch.add_argument('--output', '-o', default='-', help='NDJSON file to write; - for stdout')
+    batch.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    batch.add_argument('--slot-minutes', type=int)
+    batch.add_argument('--buffer-minutes', type=int)
+    batch.add_argument('--day-open-cost', type=int)
+    batch.add_argument('--gap-penalty', type=int)
+    batch.add_argument('--engine')
+    batch.add_argument('--time-budget-ms', type=int)
+    batch.set_defaults(run=_batch)
+
+    args = parser.parse_args(argv)
+    try:
+        args.run(args)
+    except (LookupError, PermissionError, ValueError) as exc:
+        parser.exit(1, f'error: {exc}\n')
+
+
+if __name__ == '__main__':
+    main()
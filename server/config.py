@@ -8,6 +8,14 @@ load_dotenv()
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    GENERATE_CACHE_MAX_ENTRIES = int(os.environ.get('GENERATE_CACHE_MAX_ENTRIES', 128))
+    GENERATE_CACHE_TTL_SECONDS = int(os.environ.get('GENERATE_CACHE_TTL_SECONDS', 600))
+    GENERATE_JOB_WORKERS = int(os.environ.get('GENERATE_JOB_WORKERS', 2))
+    GENERATE_JOB_MAX_PENDING = int(os.environ.get('GENERATE_JOB_MAX_PENDING', 32))
+    # Single-worker deployments only: the pre-solve fills this process's cache.
+    GENERATE_SPECULATIVE_SOLVE = os.environ.get('GENERATE_SPECULATIVE_SOLVE', '0') != '0'
+    GENERATE_SPECULATIVE_DELAY_SECONDS = float(os.environ.get('GENERATE_SPECULATIVE_DELAY_SECONDS', 5))
+    GENERATE_PROCESS_WORKERS = int(os.environ.get('GENERATE_PROCESS_WORKERS', min(4, os.cpu_count() or 1)))
 
 
 class DevelopmentConfig(Config):
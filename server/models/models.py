@@ -35,6 +35,8 @@ class Schedule(db.Model):
         server_default=db.func.now(),
         onupdate=db.func.now(),
     )
+    # Bumped in SQL by every edit of the schedule's inputs; see schedule_service.mark_edited.
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     teacher_id = db.Column(db.Integer, db.ForeignKey('teachers.id'), nullable=False)
 
     teacher = db.relationship('Teacher', back_populates='schedules')
@@ -1,9 +1,14 @@
+import logging
 from datetime import datetime
-from typing import Iterable, List, Optional
+from typing import Callable, Iterable, List, Optional
 
 from extensions import db
 from models.models import Availability, Schedule, Student
 
+from . import feasibility_service, schedule_cache, schedule_service, speculative_solves
+
+logger = logging.getLogger(__name__)
+
 
 def _parse_datetime(value) -> datetime:
     if isinstance(value, datetime):
@@ -17,6 +22,50 @@ def _parse_datetime(value) -> datetime:
     raise ValueError('start_time must be a datetime string.')
 
 
+def _after_commit(hook: Callable[..., None], *args) -> None:
+    """Run ``hook`` to refresh state derived from an availability write that already committed.
+
+    A failure is logged instead of raised: the write landed, so an error
+    response would only tell the client it had not.
+    """
+
+    try:
+        hook(*args)
+    except Exception:
+        db.session.rollback()
+        logger.exception('%s failed after an availability write', hook.__name__)
+
+
+def _speculate(schedule_id: int) -> None:
+    """Solve ahead of the teacher once every student has submitted availability.
+
+    That is the moment the teacher opens the schedule and presses generate,
+    so the background solve (with generate's default options) is usually
+    cached by then. Each edit restarts the debounce; an edit that leaves a
+    student without availability cancels the solve instead.
+    """
+
+    student_ids = {
+        student_id for (student_id,) in db.session.query(Student.id).filter(Student.schedule_id == schedule_id)
+    }
+    submitted_ids = {
+        student_id
+        for (student_id,) in db.session.query(Availability.student_id)
+        .filter(Availability.schedule_id == schedule_id, Availability.student_id.isnot(None))
+        .distinct()
+    }
+    if not student_ids or student_ids - submitted_ids:
+        speculative_solves.solves.cancel(schedule_id)
+        return
+
+    teacher_id = db.session.query(Schedule.teacher_id).filter(Schedule.id == schedule_id).scalar()
+    speculative_solves.solves.schedule(
+        schedule_id,
+        teacher_id,
+        lambda: schedule_service.generate_schedule(schedule_id, teacher_id=teacher_id),
+    )
+
+
 def get_all_availabilities() -> List[Availability]:
     return Availability.query.all()
 
@@ -59,14 +108,16 @@ def create_availability(data: dict) -> Availability:
         student_id=student_id,
         teacher_id=teacher_id,
     )
+    schedule_service.mark_edited(schedule)
 
     try:
         db.session.add(availability)
         db.session.commit()
-        return availability
     except Exception:
         db.session.rollback()
         raise
+    schedule_cache.invalidate_schedule(schedule_id)
+    return availability
 
 
 def update_availability(availability_id: int, data: dict, teacher_id: Optional[int] = None) -> Availability:
@@ -97,13 +148,15 @@ def update_availability(availability_id: int, data: dict, teacher_id: Optional[i
         if teacher_id_value is not None and teacher_id_value != schedule.teacher_id:
             raise PermissionError('Teacher is not authorized for this schedule.')
         availability.teacher_id = teacher_id_value
+    schedule_service.mark_edited(schedule)
 
     try:
         db.session.commit()
-        return availability
     except Exception:
         db.session.rollback()
         raise
+    schedule_cache.invalidate_schedule(availability.schedule_id)
+    return availability
 
 
 def replace_teacher_availability(
@@ -120,6 +173,7 @@ def replace_teacher_availability(
 
     parsed_times = [_parse_datetime(value) for value in start_times]
     unique_times = sorted({item for item in parsed_times})
+    since = schedule_service.mark_edited(schedule)
 
     try:
         Availability.query.filter_by(
@@ -138,10 +192,13 @@ def replace_teacher_availability(
             created.append(availability)
 
         db.session.commit()
-        return created
     except Exception:
         db.session.rollback()
         raise
+    schedule_cache.invalidate_schedule(schedule_id)
+    _after_commit(feasibility_service.teacher_availability_replaced, schedule, since, unique_times)
+    _after_commit(_speculate, schedule_id)
+    return created
 
 
 def replace_student_availability(
@@ -160,6 +217,8 @@ def replace_student_availability(
 
     parsed_times = [_parse_datetime(value) for value in start_times]
     unique_times = sorted({item for item in parsed_times})
+    schedule = student.schedule
+    since = schedule_service.mark_edited(schedule)
 
     try:
         Availability.query.filter_by(
@@ -178,7 +237,10 @@ def replace_student_availability(
             created.append(availability)
 
         db.session.commit()
-        return created
     except Exception:
         db.session.rollback()
         raise
+    schedule_cache.invalidate_schedule(schedule_id)
+    _after_commit(feasibility_service.student_availability_replaced, schedule, since, student_id, unique_times)
+    _after_commit(_speculate, schedule_id)
+    return created
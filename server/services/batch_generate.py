@@ -0,0 +1,110 @@
+"""Generate schedules for studios read from JSON files, without the app or the database.
+
+A studio is one JSON object::
+
+    {"id": 7, "days": ["2024-03-18", "2024-03-19"],
+     "teacher_start_times": ["2024-03-18T09:00:00", ...],
+     "students": [{"id": 1, "name": "Ann", "lesson_length": 30,
+                   "start_times": ["2024-03-18T09:00:00", ...]}, ...],
+     "options": {"day_open_cost": 5000}}
+
+``options`` is optional and overrides the batch's options for that studio;
+both take ``generate_studio_schedule``'s keyword arguments. A ``.json``
+file holds one studio or a list of them, any other file one studio per
+line (NDJSON).
+"""
+
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing.context import BaseContext
+from typing import Iterable, Iterator, Mapping, Optional, Sequence
+
+from . import schedule_core
+from .generation_jobs import _ERROR_STATUS
+
+
+def read_studios(paths: Sequence[str]) -> Iterator[dict]:
+    """Yield the studio objects of ``paths`` in file order."""
+
+    for path in paths:
+        with open(path, encoding='utf-8') as handle:
+            if path.endswith('.json'):
+                data = json.load(handle)
+                yield from data if isinstance(data, list) else [data]
+                continue
+            for line_number, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as exc:
+                    raise ValueError(f'{path}:{line_number}: {exc}') from exc
+
+
+def parse_studio(data: Mapping) -> schedule_core.StudioInputs:
+    try:
+        students = data['students']
+        return schedule_core.StudioInputs(
+            id=int(data['id']),
+            days=schedule_core._parse_schedule_days(data['days']),
+            students=[
+                (int(student['id']), str(student['name']), int(student['lesson_length'])) for student in students
+            ],
+            teacher_start_times=[schedule_core._parse_datetime(value) for value in data['teacher_start_times']],
+            student_start_times={
+                int(student['id']): [schedule_core._parse_datetime(value) for value in student['start_times']]
+                for student in students
+                if student.get('start_times')
+            },
+        )
+    except KeyError as exc:
+        raise ValueError(f'Studio is missing {exc.args[0]!r}.') from exc
+    except TypeError as exc:
+        raise ValueError(f'Malformed studio: {exc}') from exc
+
+
+def generate_studio(data: Mapping, options: Mapping[str, object]) -> dict:
+    """One NDJSON output record: the studio's generate result, or its error."""
+
+    record = {'id': data.get('id') if isinstance(data, Mapping) else None}
+    started = time.perf_counter()
+    try:
+        if not isinstance(data, Mapping):
+            raise ValueError('A studio must be a JSON object.')
+        studio = parse_studio(data)
+        result = schedule_core.generate_studio_schedule(studio, **{**options, **data.get('options', {})})
+    except Exception as exc:
+        record['error'] = str(exc)
+        record['error_status'] = next((status for kind, status in _ERROR_STATUS if isinstance(exc, kind)), 500)
+    else:
+        record['result'] = result
+    record['seconds'] = time.perf_counter() - started
+    return record
+
+
+def _init_worker() -> None:
+    # The batch already keeps every worker busy with a studio of its own.
+    schedule_core.configure_component_pool(1)
+
+
+def generate_batch(
+    studios: Iterable[Mapping],
+    options: Mapping[str, object],
+    max_workers: int = 1,
+    mp_context: Optional[BaseContext] = None,
+) -> Iterator[dict]:
+    """Yield ``generate_studio``'s record for every studio, in input order.
+
+    With ``max_workers`` above 1 the studios are spread over a process pool,
+    one at a time, so a large studio does not hold back a chunk of small
+    ones; ``<= 1`` generates in-process.
+    """
+
+    if max_workers <= 1:
+        for data in studios:
+            yield generate_studio(data, options)
+        return
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context, initializer=_init_worker) as pool:
+        yield from pool.map(generate_studio, studios, repeat(dict(options)), chunksize=1)
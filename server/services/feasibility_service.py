@@ -0,0 +1,300 @@
+import threading
+from collections import deque
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+from models.models import Schedule
+
+from . import matching, schedule_service
+from .schedule_core import _parse_schedule_days, _slots_from_rows
+
+
+class FeasibilityTracker:
+    """Maximum student/slot matching of one schedule, kept current edit by edit.
+
+    The candidate slots are the ones ``generate_schedule`` builds: per day, the
+    teacher start times someone can take, skipping any that would overlap the
+    previous slot. Replacing an availability only re-derives the slots of the
+    days it touches, unmatches students whose slot or edge disappeared, and
+    then augments from the free students until no augmenting path is left, so
+    the matching stays maximum without re-solving from scratch. The matched
+    count is therefore the number of students a generate call would schedule.
+
+    ``version`` is the schedule's ``version`` the tracker reflects, and
+    ``buffer_minutes`` and ``approximate`` (mixed lesson lengths) are fixed
+    when it is built, so reads need no student rows.
+    """
+
+    def __init__(
+        self,
+        teacher_slots: Dict[date, List[datetime]],
+        student_slots: Dict[int, Set[datetime]],
+        student_ids: Iterable[int],
+        schedule_days: Set[date],
+        slot_duration: timedelta,
+        version: int,
+        buffer_minutes: int = 0,
+        approximate: bool = False,
+    ):
+        self.schedule_days = schedule_days
+        self.slot_duration = slot_duration
+        self.version = version
+        self.buffer_minutes = buffer_minutes
+        self.approximate = approximate
+        self.teacher_times: Dict[date, List[datetime]] = {}
+        self.student_slots: Dict[int, Set[datetime]] = {}
+        self.students_at: Dict[datetime, Set[int]] = {}
+        self.slots: Dict[date, List[datetime]] = {}
+        self.candidates: Set[datetime] = set()
+        self.match_student: Dict[int, datetime] = {}
+        self.match_slot: Dict[datetime, int] = {}
+        self.unmatched: Set[int] = set()
+
+        self._set_teacher_times(teacher_slots)
+        for student_id in student_ids:
+            starts = set(student_slots.get(student_id, ()))
+            self.student_slots[student_id] = starts
+            self.unmatched.add(student_id)
+            for start_time in starts:
+                self.students_at.setdefault(start_time, set()).add(student_id)
+        for day_key in self.teacher_times:
+            self.slots[day_key] = self._day_slots(day_key)
+            self.candidates.update(self.slots[day_key])
+
+        # The initial matching comes from Hopcroft-Karp; edits then repair it.
+        student_order = list(self.student_slots)
+        slot_order = sorted(self.candidates)
+        slot_index = {start_time: index for index, start_time in enumerate(slot_order)}
+        adjacency = [
+            [slot_index[start_time] for start_time in self.student_slots[student_id] if start_time in slot_index]
+            for student_id in student_order
+        ]
+        _size, match_left = matching.hopcroft_karp(adjacency, len(slot_order))
+        for student_id, index in zip(student_order, match_left):
+            if index >= 0:
+                self._match(student_id, slot_order[index])
+
+    @property
+    def matched_count(self) -> int:
+        return len(self.match_student)
+
+    def to_dict(self) -> dict:
+        return {
+            'student_count': len(self.student_slots),
+            'slot_count': len(self.candidates),
+            'matched_count': self.matched_count,
+            'unmatchable_student_ids': sorted(self.unmatched),
+            'feasible': not self.unmatched,
+        }
+
+    def replace_student(self, student_id: int, start_times: Iterable[datetime]) -> None:
+        previous = self.student_slots.get(student_id, set())
+        current = set(start_times)
+        for start_time in previous - current:
+            students = self.students_at.get(start_time)
+            if students is not None:
+                students.discard(student_id)
+                if not students:
+                    del self.students_at[start_time]
+        for start_time in current - previous:
+            self.students_at.setdefault(start_time, set()).add(student_id)
+        self.student_slots[student_id] = current
+        if student_id not in self.match_student:
+            self.unmatched.add(student_id)
+        elif self.match_student[student_id] not in current:
+            self._unmatch(student_id)
+
+        # A student's times decide which teacher times are free to open a slot.
+        changed_days = {start_time.date() for start_time in previous ^ current}
+        self._refresh_days(changed_days & self.teacher_times.keys())
+        self._augment_all()
+
+    def replace_teacher(self, teacher_slots: Dict[date, List[datetime]]) -> None:
+        previous_days = set(self.teacher_times)
+        self._set_teacher_times(teacher_slots)
+        self._refresh_days(previous_days | set(self.teacher_times))
+        self._augment_all()
+
+    def _set_teacher_times(self, teacher_slots: Dict[date, List[datetime]]) -> None:
+        self.teacher_times = {
+            day_key: sorted(set(starts))
+            for day_key, starts in teacher_slots.items()
+            if starts and (not self.schedule_days or day_key in self.schedule_days)
+        }
+
+    def _day_slots(self, day_key: date) -> List[datetime]:
+        day_slots: List[datetime] = []
+        next_available_time: Optional[datetime] = None
+        for start_time in self.teacher_times.get(day_key, ()):
+            if not self.students_at.get(start_time):
+                continue
+            if next_available_time is not None and start_time < next_available_time:
+                continue
+            day_slots.append(start_time)
+            next_available_time = start_time + self.slot_duration
+        return day_slots
+
+    def _refresh_days(self, days: Iterable[date]) -> None:
+        for day_key in days:
+            previous = set(self.slots.pop(day_key, ()))
+            day_slots = self._day_slots(day_key)
+            if day_slots:
+                self.slots[day_key] = day_slots
+            current = set(day_slots)
+            for start_time in previous - current:
+                self.candidates.discard(start_time)
+                student_id = self.match_slot.get(start_time)
+                if student_id is not None:
+                    self._unmatch(student_id)
+            self.candidates.update(current - previous)
+
+    def _match(self, student_id: int, start_time: datetime) -> None:
+        self.match_student[student_id] = start_time
+        self.match_slot[start_time] = student_id
+        self.unmatched.discard(student_id)
+
+    def _unmatch(self, student_id: int) -> None:
+        start_time = self.match_student.pop(student_id)
+        del self.match_slot[start_time]
+        self.unmatched.add(student_id)
+
+    def _augment_all(self) -> None:
+        while self.unmatched and self._augment():
+            pass
+
+    def _augment(self) -> bool:
+        """Grow the matching along one shortest augmenting path from any free student."""
+
+        candidates = self.candidates
+        reached_by: Dict[datetime, int] = {}
+        visited = set(self.unmatched)
+        queue = deque(self.unmatched)
+        while queue:
+            student_id = queue.popleft()
+            for start_time in self.student_slots[student_id]:
+                if start_time not in candidates or start_time in reached_by:
+                    continue
+                reached_by[start_time] = student_id
+                partner = self.match_slot.get(start_time)
+                if partner is None:
+                    # Flip the path back to its free student.
+                    while start_time is not None:
+                        owner = reached_by[start_time]
+                        previous_slot = self.match_student.get(owner)
+                        self._match(owner, start_time)
+                        start_time = previous_slot
+                    return True
+                if partner not in visited:
+                    visited.add(partner)
+                    queue.append(partner)
+        return False
+
+
+_trackers: Dict[int, FeasibilityTracker] = {}
+_lock = threading.Lock()
+
+
+def _build_tracker(schedule: Schedule, buffer_minutes: int) -> FeasibilityTracker:
+    # The same narrow SELECTs generate loads its inputs with.
+    students = schedule_service._fetch_student_rows(schedule.id)
+    teacher_slots, student_slots = _slots_from_rows(
+        schedule_service._fetch_availability_rows(schedule.id),
+        schedule.teacher_id,
+    )
+    lesson_lengths = {student.lesson_length for student in students}
+    # Mixed lesson lengths need an explicit slot_minutes for the flow engines;
+    # the longest lesson is their grid until then, and the one the interval
+    # engine starts from.
+    slot_duration = timedelta(minutes=max(lesson_lengths, default=0) + buffer_minutes)
+    return FeasibilityTracker(
+        teacher_slots,
+        student_slots,
+        [student.id for student in students],
+        _parse_schedule_days(schedule.days or schedule.dates),
+        slot_duration,
+        schedule.version,
+        buffer_minutes,
+        len(lesson_lengths) > 1,
+    )
+
+
+def get_feasibility(schedule_id: int, teacher_id: Optional[int] = None, buffer_minutes: int = 0) -> dict:
+    """Return the matched count and unmatchable students of ``schedule_id``.
+
+    Slots are one lesson plus ``buffer_minutes`` apart, as in a generate
+    call with that buffer. With one lesson length the matched count is what
+    such a call schedules. With mixed lengths the slots are one longest
+    lesson apart, so the count (flagged ``approximate``) is what the flow
+    engines schedule on that grid and a lower bound for the interval engine,
+    which fits each student's own length and may place more.
+
+    Answers from the live tracker. It is rebuilt when the schedule's
+    ``version`` moved past it, which every edit of the schedule's inputs
+    does (see ``schedule_service.mark_edited``), in whichever worker it ran;
+    availability replacements in this one update it in place instead.
+    """
+
+    if buffer_minutes < 0:
+        raise ValueError('buffer_minutes must be non-negative')
+    schedule: Optional[Schedule] = Schedule.query.get(schedule_id)
+    if schedule is None:
+        with _lock:
+            _trackers.pop(schedule_id, None)
+        raise LookupError('Schedule not found.')
+    if teacher_id is not None and schedule.teacher_id != teacher_id:
+        raise PermissionError('Teacher is not authorized for this schedule.')
+
+    with _lock:
+        tracker = _trackers.get(schedule_id)
+        if (
+            tracker is None
+            or tracker.version != schedule.version
+            or tracker.buffer_minutes != buffer_minutes
+        ):
+            tracker = _trackers[schedule_id] = _build_tracker(schedule, buffer_minutes)
+        return {
+            'schedule_id': schedule_id,
+            **tracker.to_dict(),
+            'buffer_minutes': buffer_minutes,
+            'approximate': tracker.approximate,
+        }
+
+
+def _current_tracker(schedule: Schedule, since: int) -> Optional[FeasibilityTracker]:
+    """The tracker that missed only the edit that moved ``schedule.version`` on from ``since``.
+
+    Callers hold ``_lock``. A tracker that also missed some other edit, from
+    this worker or another, is dropped, to be rebuilt by the next read:
+    either it is behind ``since``, or the version moved by more than one.
+    """
+
+    tracker = _trackers.get(schedule.id)
+    if tracker is None:
+        return None
+    if tracker.version != since or schedule.version != since + 1:
+        del _trackers[schedule.id]
+        return None
+    tracker.version = schedule.version
+    return tracker
+
+
+def student_availability_replaced(
+    schedule: Schedule,
+    since: int,
+    student_id: int,
+    start_times: Iterable[datetime],
+) -> None:
+    with _lock:
+        tracker = _current_tracker(schedule, since)
+        if tracker is not None:
+            tracker.replace_student(student_id, start_times)
+
+
+def teacher_availability_replaced(schedule: Schedule, since: int, start_times: Iterable[datetime]) -> None:
+    teacher_slots: Dict[date, List[datetime]] = {}
+    for start_time in start_times:
+        teacher_slots.setdefault(start_time.date(), []).append(start_time)
+    with _lock:
+        tracker = _current_tracker(schedule, since)
+        if tracker is not None:
+            tracker.replace_teacher(teacher_slots)
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+from . import schedule_cache
+
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_MAX_PENDING = 32
+DEFAULT_MAX_FINISHED = 256
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+# Same mapping the generate endpoint uses for synchronous errors.
+_ERROR_STATUS = ((LookupError, 404), (PermissionError, 403), (ValueError, 400))
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when too many generation jobs are already queued or running."""
+
+
+@dataclass
+class GenerationJob:
+    id: str
+    key: str
+    schedule_id: int
+    teacher_id: int
+    status: str = QUEUED
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    error_status: Optional[int] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self) -> dict:
+        payload = {
+            'job_id': self.id,
+            'schedule_id': self.schedule_id,
+            'status': self.status,
+        }
+        if self.status == SUCCEEDED:
+            payload['result'] = self.result
+        elif self.status == FAILED:
+            payload['error'] = self.error
+            payload['error_status'] = self.error_status
+        return payload
+
+
+def make_job_key(schedule_id: int, teacher_id: int, options: Mapping[str, object]) -> str:
+    """Identify a generate request; equal keys while a job is pending coalesce onto it.
+
+    The schedule's cache generation is part of the key, so a submission made
+    after the schedule's inputs changed never joins a job started before.
+    """
+
+    encoded = json.dumps(
+        [schedule_id, teacher_id, schedule_cache.result_cache.generation(schedule_id), sorted(options.items())],
+        separators=(',', ':'),
+        default=str,
+    )
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class GenerationJobs:
+    """Runs generate calls on a bounded thread pool and keeps their outcome for polling."""
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        max_finished: int = DEFAULT_MAX_FINISHED,
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: 'OrderedDict[str, GenerationJob]' = OrderedDict()
+        self._pending_by_key: Dict[str, str] = {}
+
+    def configure(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        max_finished: Optional[int] = None,
+    ) -> None:
+        with self._lock:
+            if max_workers is not None and max_workers != self.max_workers:
+                self.max_workers = max_workers
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                    self._executor = None
+            if max_pending is not None:
+                self.max_pending = max_pending
+            if max_finished is not None:
+                self.max_finished = max_finished
+                self._trim_finished()
+
+    def submit(
+        self,
+        key: str,
+        schedule_id: int,
+        teacher_id: int,
+        run: Callable[[], dict],
+    ) -> Tuple[GenerationJob, bool]:
+        """Queue ``run`` unless a job with ``key`` is still pending.
+
+        Returns the job and whether it was newly created.
+        """
+
+        with self._lock:
+            pending_id = self._pending_by_key.get(key)
+            if pending_id is not None:
+                return self._jobs[pending_id], False
+
+            if len(self._pending_by_key) >= self.max_pending:
+                raise JobQueueFullError('Too many schedule generations are already in progress.')
+
+            job = GenerationJob(id=uuid.uuid4().hex, key=key, schedule_id=schedule_id, teacher_id=teacher_id)
+            self._jobs[job.id] = job
+            self._pending_by_key[key] = job.id
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(self.max_workers, 1),
+                    thread_name_prefix='generate-job',
+                )
+            executor = self._executor
+
+        executor.submit(self._run, job, run)
+        return job, True
+
+    def get(self, job_id: str) -> Optional[GenerationJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            counts['max_workers'] = self.max_workers
+            counts['max_pending'] = self.max_pending
+            return counts
+
+    def _run(self, job: GenerationJob, run: Callable[[], dict]) -> None:
+        with self._lock:
+            job.status = RUNNING
+        try:
+            result = run()
+        except Exception as exc:
+            error_status = next((status for kind, status in _ERROR_STATUS if isinstance(exc, kind)), 500)
+            with self._lock:
+                job.status = FAILED
+                job.error = str(exc)
+                job.error_status = error_status
+        else:
+            with self._lock:
+                job.status = SUCCEEDED
+                job.result = result
+        finally:
+            with self._lock:
+                job.finished_at = time.time()
+                if self._pending_by_key.get(job.key) == job.id:
+                    del self._pending_by_key[job.key]
+                self._trim_finished()
+
+    def _trim_finished(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job_id]
+
+
+jobs = GenerationJobs()
@@ -0,0 +1,661 @@
+import math
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from . import matching
+
+# Subgradient steps before the engine settles for its best schedule so far.
+MAX_ITERATIONS = 200
+# Steps without a tighter bound before the step size is halved, and the
+# step size below which the bound no longer moves enough to be worth it.
+_STALL_ITERATIONS = 8
+_MIN_STEP_SCALE = 1e-3
+# Schedules the bound leaves unproven are searched exhaustively up to this
+# many students, for at most this many search nodes.
+EXACT_MAX_STUDENTS = 12
+EXACT_MAX_NODES = 10_000
+
+# A candidate lesson: (start point, end point, student row, position).
+Candidate = Tuple[int, int, int, int]
+# A placed lesson on one day: (start point, end point, student row, candidate index).
+Lesson = Tuple[int, int, int, int]
+
+
+class IntervalModel:
+    """Lessons of mixed lengths on a shared quantized timeline.
+
+    Every teacher start time on a schedule day is kept, and a student may
+    take any of them they are free at, for ``lesson_minutes`` plus the
+    buffer. Times are counted in quanta, the largest step that divides every
+    start offset and lesson duration, and each day's timeline is compressed
+    to the points where some candidate lesson starts or ends, so its size
+    follows the number of candidates rather than the grid. Two lessons of a
+    day conflict when their intervals overlap; touching is fine.
+
+    The objective matches the flow model's: schedule as many students as
+    possible, then pay ``day_open_cost`` per teaching day plus
+    ``gap_penalty * position ** 2`` per lesson. Positions come from the
+    slots the flow model would keep (each day's starts taken greedily, one
+    shortest lesson apart): a start shares the position of the last such
+    slot at or before it. On uniform lengths the flow model's schedules are
+    therefore feasible here at the same cost, and a finer teacher grid adds
+    starts without inflating positions. Two lessons never share a position,
+    since the second cannot start before the slot after the first one's.
+
+    ``fixed_slots`` says every lesson is equally long and every start opens
+    a position of its own: lessons at different starts then never overlap,
+    and the model is exactly the flow model's.
+    """
+
+    def __init__(
+        self,
+        teacher_slots: Mapping[date, Sequence[datetime]],
+        student_slots: Mapping[int, Set[datetime]],
+        lesson_minutes: Mapping[int, int],
+        schedule_days: Set[date],
+        buffer_minutes: int = 0,
+    ):
+        self.student_ids: List[int] = list(lesson_minutes)
+        self.days: List[date] = []
+        # Per day, the first candidate start (timeline points count quanta from it).
+        self.origins: List[datetime] = []
+        # Per day, how many positions its candidates use.
+        self.position_counts: List[int] = []
+        self.candidates: List[List[Candidate]] = []
+        self.points: List[List[int]] = []
+        # Per day and timeline point, the candidates that end there.
+        self.ending: List[List[List[int]]] = []
+        # Per student row, its candidates as (day index, candidate index), by position.
+        self.student_candidates: List[List[Tuple[int, int]]] = [[] for _ in self.student_ids]
+        self.fixed_slots = True
+
+        durations = {
+            row: int(timedelta(minutes=lesson_minutes[student_id] + buffer_minutes).total_seconds())
+            for row, student_id in enumerate(self.student_ids)
+        }
+        shortest = min(durations.values(), default=0)
+        if len(set(durations.values())) > 1:
+            self.fixed_slots = False
+        available_at: Dict[datetime, List[int]] = {}
+        for row, student_id in enumerate(self.student_ids):
+            for start_time in student_slots.get(student_id, ()):
+                available_at.setdefault(start_time, []).append(row)
+
+        # Per day, (start, end, row, position) with times in seconds from the day's first start.
+        timed: List[List[Tuple[int, int, int, int]]] = []
+        quantum = 0
+        for day_key in sorted(teacher_slots):
+            if schedule_days and day_key not in schedule_days:
+                continue
+            starts = sorted(start for start in set(teacher_slots[day_key]) if available_at.get(start))
+            if not starts:
+                continue
+            origin = starts[0]
+            day_candidates = []
+            position = -1
+            next_slot = 0
+            for start_time in starts:
+                offset = int((start_time - origin).total_seconds())
+                quantum = math.gcd(quantum, offset)
+                if offset >= next_slot:
+                    position += 1
+                    next_slot = offset + shortest
+                for row in sorted(available_at[start_time]):
+                    day_candidates.append((offset, offset + durations[row], row, position))
+            if position + 1 < len(starts):
+                self.fixed_slots = False
+            self.days.append(day_key)
+            self.origins.append(origin)
+            self.position_counts.append(position + 1)
+            timed.append(day_candidates)
+        for duration in durations.values():
+            quantum = math.gcd(quantum, duration)
+        quantum = quantum or 1
+        self.quantum = timedelta(seconds=quantum)
+
+        for day_index, day_candidates in enumerate(timed):
+            seconds = {start for start, _end, _row, _position in day_candidates}
+            seconds.update(end for _start, end, _row, _position in day_candidates)
+            points = sorted(second // quantum for second in seconds)
+            point_index = {point: index for index, point in enumerate(points)}
+            candidates: List[Candidate] = []
+            ending: List[List[int]] = [[] for _ in points]
+            for start, end, row, position in day_candidates:
+                candidate = (point_index[start // quantum], point_index[end // quantum], row, position)
+                ending[candidate[1]].append(len(candidates))
+                self.student_candidates[row].append((day_index, len(candidates)))
+                candidates.append(candidate)
+            self.points.append(points)
+            self.candidates.append(candidates)
+            self.ending.append(ending)
+        for row_candidates in self.student_candidates:
+            row_candidates.sort(key=lambda pick: (self.candidates[pick[0]][pick[1]][3], pick))
+
+    @property
+    def candidate_count(self) -> int:
+        return sum(len(candidates) for candidates in self.candidates)
+
+    @property
+    def point_count(self) -> int:
+        return sum(len(points) for points in self.points)
+
+    def start_time(self, day: int, candidate: int) -> datetime:
+        start_point = self.candidates[day][candidate][0]
+        return self.origins[day] + self.quantum * self.points[day][start_point]
+
+    def max_cost(self, day_open_cost: int, gap_penalty: int) -> int:
+        """An upper bound on the cost of any schedule: each position hosts one lesson at most."""
+
+        return sum(
+            day_open_cost + gap_penalty * sum(position * position for position in range(count))
+            for count in self.position_counts
+        )
+
+
+@dataclass
+class IntervalSolution:
+    # (student id, day index, candidate index) per scheduled lesson.
+    assignments: List[Tuple[int, int, int]]
+    scheduled_count: int
+    cost: int
+    optimal: bool
+    # How far above the optimum ``cost`` can be at most, once the scheduled
+    # count is proven maximum; ``None`` while it is not.
+    cost_gap_bound: Optional[int]
+    truncated: bool = False
+    counters: Dict[str, int] = field(default_factory=dict)
+
+
+class _Timetable:
+    """A feasible set of lessons, kept sorted per day for overlap lookups."""
+
+    def __init__(self, model: IntervalModel, day_open_cost: int, gap_penalty: int):
+        self.model = model
+        self.day_open_cost = day_open_cost
+        self.gap_penalty = gap_penalty
+        self.lessons: List[List[Lesson]] = [[] for _ in model.days]
+        self.starts: List[List[int]] = [[] for _ in model.days]
+        self.placed: Dict[int, Tuple[int, int]] = {}
+
+    def blockers(self, day: int, candidate: int) -> List[Lesson]:
+        start, end, _row, _position = self.model.candidates[day][candidate]
+        lessons = self.lessons[day]
+        index = bisect_left(self.starts[day], end) - 1
+        found = []
+        # Lessons are disjoint, so the ones that overlap are a run ending at ``index``.
+        while index >= 0 and lessons[index][1] > start:
+            found.append(lessons[index])
+            index -= 1
+        return found
+
+    def is_free(self, day: int, candidate: int) -> bool:
+        start, end, _row, _position = self.model.candidates[day][candidate]
+        index = bisect_left(self.starts[day], end)
+        # Of the lessons starting before ``end``, the last one also ends last.
+        return index == 0 or self.lessons[day][index - 1][1] <= start
+
+    def marginal_cost(self, day: int, candidate: int) -> int:
+        position = self.model.candidates[day][candidate][3]
+        cost = self.gap_penalty * position * position
+        return cost if self.lessons[day] else cost + self.day_open_cost
+
+    def place(self, day: int, candidate: int) -> None:
+        start, end, row, _position = self.model.candidates[day][candidate]
+        index = bisect_left(self.starts[day], start)
+        self.starts[day].insert(index, start)
+        self.lessons[day].insert(index, (start, end, row, candidate))
+        self.placed[row] = (day, candidate)
+
+    def remove(self, row: int) -> Tuple[int, int]:
+        day, candidate = self.placed.pop(row)
+        index = bisect_left(self.starts[day], self.model.candidates[day][candidate][0])
+        del self.starts[day][index]
+        del self.lessons[day][index]
+        return day, candidate
+
+    def copy(self) -> "_Timetable":
+        other = _Timetable(self.model, self.day_open_cost, self.gap_penalty)
+        other.lessons = [list(lessons) for lessons in self.lessons]
+        other.starts = [list(starts) for starts in self.starts]
+        other.placed = dict(self.placed)
+        return other
+
+    def cheapest_free(self, row: int) -> Optional[Tuple[int, int]]:
+        """The free candidate of ``row`` with the lowest marginal cost, if any."""
+
+        candidates = self.model.candidates
+        best = None
+        best_cost = None
+        # Candidates come by position, so the static part of the cost only grows.
+        for day, candidate in self.model.student_candidates[row]:
+            position = candidates[day][candidate][3]
+            cost = self.gap_penalty * position * position
+            if best_cost is not None and cost >= best_cost:
+                break
+            if not self.lessons[day]:
+                cost += self.day_open_cost
+                if best_cost is None or cost < best_cost:
+                    best, best_cost = (day, candidate), cost
+            elif self.is_free(day, candidate):
+                return day, candidate
+        return best
+
+    def cost(self) -> int:
+        total = 0
+        for day, lessons in enumerate(self.lessons):
+            if lessons:
+                total += self.day_open_cost
+            for _start, _end, _row, candidate in lessons:
+                position = self.model.candidates[day][candidate][3]
+                total += self.gap_penalty * position * position
+        return total
+
+
+class _LagrangianSolver:
+    """Lagrangian relaxation of "each student at most once", with a repair heuristic.
+
+    With the students' constraints priced out by multipliers, each day is an
+    independent weighted interval scheduling problem, solved exactly by a DP
+    over its timeline points; open the day when its best value beats the day
+    cost. The relaxed value bounds the best schedule from above, and a
+    subgradient step on the multipliers tightens it. Every relaxed solution
+    is repaired into a real schedule (drop repeated students, then fill the
+    gaps), the best one is kept, and ``polish`` improves it at the end. The
+    search stops early once the bound proves the schedule optimal; when it
+    does not, ``prove`` settles small instances by branch and bound.
+    """
+
+    def __init__(self, model: IntervalModel, day_open_cost: int, gap_penalty: int):
+        self.model = model
+        self.day_open_cost = day_open_cost
+        self.gap_penalty = gap_penalty
+        # Weighting a scheduled student above any possible cost makes the
+        # count lexicographically first, and the doubling leaves room to
+        # prove the count maximum before the cost is.
+        self.max_cost = model.max_cost(day_open_cost, gap_penalty)
+        self.reward = 2 * (self.max_cost + 1)
+        # Lessons need distinct positions, so a student/position matching bounds the count.
+        starts: Dict[Tuple[int, int], int] = {}
+        adjacency = [
+            [starts.setdefault((day, model.candidates[day][candidate][3]), len(starts)) for day, candidate in picks]
+            for picks in model.student_candidates
+        ]
+        self.max_count, _match = matching.hopcroft_karp(adjacency, len(starts))
+        self.weights = [
+            [self.reward - gap_penalty * position * position for _start, _end, _row, position in candidates]
+            for candidates in model.candidates
+        ]
+
+    def relax(self, multipliers: Sequence[float]) -> Tuple[float, List[Tuple[int, int]]]:
+        value = float(sum(multipliers))
+        chosen: List[Tuple[int, int]] = []
+        for day, candidates in enumerate(self.model.candidates):
+            weights = self.weights[day]
+            ending = self.model.ending[day]
+            best = [0.0] * len(ending)
+            taken = [-1] * len(ending)
+            previous = 0.0
+            for point, ends_here in enumerate(ending):
+                value_here = previous
+                take = -1
+                for candidate in ends_here:
+                    start, _end, row, _position = candidates[candidate]
+                    option = best[start] + weights[candidate] - multipliers[row]
+                    if option > value_here:
+                        value_here, take = option, candidate
+                best[point] = previous = value_here
+                taken[point] = take
+            if previous <= self.day_open_cost:
+                continue
+            value += previous - self.day_open_cost
+            point = len(ending) - 1
+            while point >= 0:
+                candidate = taken[point]
+                if candidate < 0:
+                    point -= 1
+                else:
+                    chosen.append((day, candidate))
+                    point = candidates[candidate][0]
+        return value, chosen
+
+    def repair(self, chosen: Sequence[Tuple[int, int]]) -> _Timetable:
+        model = self.model
+        table = _Timetable(model, self.day_open_cost, self.gap_penalty)
+        # One day's picks never overlap, so keeping each student's first pick is feasible.
+        for day, candidate in sorted(chosen, key=lambda pick: (model.candidates[pick[0]][pick[1]][3], pick)):
+            row = model.candidates[day][candidate][2]
+            if row not in table.placed and table.is_free(day, candidate):
+                table.place(day, candidate)
+
+        waiting = [
+            row
+            for row in sorted(range(len(model.student_ids)), key=lambda row: len(model.student_candidates[row]))
+            if row not in table.placed and model.student_candidates[row]
+        ]
+        for row in waiting:
+            spot = table.cheapest_free(row)
+            if spot is not None:
+                table.place(*spot)
+        return table
+
+    def _eject(self, table: _Timetable, row: int) -> bool:
+        """Place ``row`` by moving the one lesson in its way somewhere free."""
+
+        for day, candidate in self.model.student_candidates[row]:
+            blocking = table.blockers(day, candidate)
+            if len(blocking) != 1:
+                continue
+            other = blocking[0][2]
+            previous = table.remove(other)
+            table.place(day, candidate)
+            spot = table.cheapest_free(other)
+            if spot is not None:
+                table.place(*spot)
+                return True
+            table.remove(row)
+            table.place(*previous)
+        return False
+
+    def _compact(self, table: _Timetable) -> None:
+        # Emptiest days first, so their lessons can leave and close them.
+        for _pass in range(2):
+            moved = False
+            order = sorted(table.placed, key=lambda row: (len(table.lessons[table.placed[row][0]]), row))
+            for row in order:
+                day, candidate = table.remove(row)
+                current = table.marginal_cost(day, candidate)
+                spot = table.cheapest_free(row)
+                if spot is not None and table.marginal_cost(*spot) < current:
+                    table.place(*spot)
+                    moved = True
+                else:
+                    table.place(day, candidate)
+            if not moved:
+                return
+
+    def polish(self, table: _Timetable) -> _Timetable:
+        """Improve the final schedule with moves too costly to try on every repair."""
+
+        model = self.model
+        for row in sorted(range(len(model.student_ids)), key=lambda row: len(model.student_candidates[row])):
+            if row not in table.placed and model.student_candidates[row]:
+                self._eject(table, row)
+        for _round in range(4):
+            self._compact(table)
+            closed = self._close_days(table)
+            if closed is not None:
+                table = closed
+            if closed is None and not self._swap_out(table):
+                break
+        return table
+
+    def _close_days(self, table: _Timetable) -> Optional[_Timetable]:
+        """Empty the lightest day whose lessons all fit elsewhere for less."""
+
+        cost = table.cost()
+        open_days = sorted(
+            (len(lessons), day) for day, lessons in enumerate(table.lessons) if lessons
+        )
+        for _count, day in open_days:
+            trial = table.copy()
+            rows = [lesson[2] for lesson in table.lessons[day]]
+            for row in rows:
+                trial.remove(row)
+            for row in sorted(rows, key=lambda row: len(self.model.student_candidates[row])):
+                spot = trial.cheapest_free(row)
+                if spot is not None and spot[0] != day:
+                    trial.place(*spot)
+                elif not self._eject(trial, row):
+                    break
+            if len(trial.placed) == len(table.placed) and trial.cost() < cost:
+                return trial
+        return None
+
+    def _swap_out(self, table: _Timetable) -> bool:
+        """Move lessons into cheaper spots, pushing the one lesson there somewhere free."""
+
+        improved = False
+        for row in sorted(table.placed):
+            old_spot = table.remove(row)
+            saved = table.marginal_cost(*old_spot)
+            moved = False
+            for day, candidate in self.model.student_candidates[row]:
+                if (day, candidate) == old_spot or table.marginal_cost(day, candidate) >= saved:
+                    continue
+                blocking = table.blockers(day, candidate)
+                if not blocking:
+                    table.place(day, candidate)
+                    moved = True
+                    break
+                if len(blocking) != 1:
+                    continue
+                other = blocking[0][2]
+                other_spot = table.remove(other)
+                other_saved = table.marginal_cost(*other_spot)
+                price = table.marginal_cost(day, candidate)
+                table.place(day, candidate)
+                spot = table.cheapest_free(other)
+                if spot is not None and price + table.marginal_cost(*spot) < saved + other_saved:
+                    table.place(*spot)
+                    moved = True
+                    break
+                table.remove(row)
+                table.place(*other_spot)
+            if moved:
+                improved = True
+            else:
+                table.place(*old_spot)
+        return improved
+
+    def prove(self, best: _Timetable, deadline: Optional[float], counters: Dict[str, int]) -> Tuple[_Timetable, bool]:
+        """Search every schedule for one better than ``best``, by branch and bound.
+
+        The search first fixes which days open, each day in or out, then
+        places students on the open days only, fewest candidates first, on
+        each free candidate by cost and then not at all. Lessons need
+        positions of their own, so the students still to place can add at
+        most what a cheapest maximum matching of them to the free positions
+        they have candidates at is worth; a branch that cannot beat the best
+        schedule that way is cut. Returns the best schedule and whether the
+        search finished, proving it optimal.
+        """
+
+        model = self.model
+        gap_penalty = self.gap_penalty
+        table = _Timetable(model, self.day_open_cost, gap_penalty)
+        best_value = len(best.placed) * self.reward - best.cost()
+        nodes = 0
+
+        def ceiling(rows: Sequence[int], picks: Sequence[Sequence[Tuple[int, int, int]]]) -> int:
+            spots: Dict[Tuple[int, int], List[int]] = {}
+            for right, row in enumerate(rows):
+                for day, candidate, position in picks[row]:
+                    if table.is_free(day, candidate):
+                        spots.setdefault((day, position), []).append(right)
+            costs = [gap_penalty * position * position for _day, position in spots]
+            size, match, _truncated = matching.cheapest_maximum_matching(list(spots.values()), costs, len(rows))
+            return size * self.reward - sum(cost for cost, row in zip(costs, match) if row != -1)
+
+        def spend() -> bool:
+            nonlocal nodes
+            nodes += 1
+            return nodes <= EXACT_MAX_NODES and (deadline is None or time.monotonic() < deadline)
+
+        def picks_on(days: Set[int]) -> List[List[Tuple[int, int, int]]]:
+            return [
+                [(day, candidate, model.candidates[day][candidate][3]) for day, candidate in picks if day in days]
+                for picks in model.student_candidates
+            ]
+
+        def search(days: Set[int]) -> bool:
+            picks = picks_on(days)
+            rows = sorted((row for row in range(len(picks)) if picks[row]), key=lambda row: len(picks[row]))
+
+            def branch(index: int, value: int) -> bool:
+                nonlocal best, best_value
+                if value > best_value:
+                    best, best_value = table.copy(), value
+                if index == len(rows) or value + ceiling(rows[index:], picks) <= best_value:
+                    return True
+                if not spend():
+                    return False
+                row = rows[index]
+                for day, candidate, position in picks[row]:
+                    if not table.is_free(day, candidate):
+                        continue
+                    table.place(day, candidate)
+                    finished = branch(index + 1, value + self.reward - gap_penalty * position * position)
+                    table.remove(row)
+                    if not finished:
+                        return False
+                return branch(index + 1, value)
+
+            # Every chosen day is paid for; a schedule leaving one empty is
+            # found at its true cost under the subset without it.
+            return branch(0, -self.day_open_cost * len(days))
+
+        rows = range(len(model.student_ids))
+
+        def choose(day: int, opened: Set[int], allowed: Set[int]) -> bool:
+            if ceiling(rows, picks_on(allowed)) - self.day_open_cost * len(opened) <= best_value:
+                return True
+            if day == len(model.days):
+                return search(opened)
+            if not spend():
+                return False
+            opened.add(day)
+            finished = choose(day + 1, opened, allowed)
+            opened.discard(day)
+            if not finished:
+                return False
+            allowed.discard(day)
+            finished = choose(day + 1, opened, allowed)
+            allowed.add(day)
+            return finished
+
+        finished = choose(0, set(), set(range(len(model.days))))
+        counters["search_nodes"] = nodes
+        return best, finished
+
+    def seeded(self, seed: Sequence[Tuple[int, datetime]]) -> _Timetable:
+        model = self.model
+        rows = {student_id: row for row, student_id in enumerate(model.student_ids)}
+        table = _Timetable(model, self.day_open_cost, self.gap_penalty)
+        for student_id, start_time in seed:
+            row = rows.get(student_id)
+            if row is None or row in table.placed:
+                continue
+            for day, candidate in model.student_candidates[row]:
+                if model.start_time(day, candidate) == start_time and table.is_free(day, candidate):
+                    table.place(day, candidate)
+                    break
+        return table
+
+    def solve(
+        self,
+        deadline: Optional[float],
+        max_iterations: int,
+        seed: Sequence[Tuple[int, datetime]] = (),
+    ) -> IntervalSolution:
+        model = self.model
+        # The unpriced relaxation is each day's best lessons, repeats allowed,
+        # and repairs into a strong first schedule.
+        multipliers = [0.0] * len(model.student_ids)
+        bound = math.inf
+        best: Optional[_Timetable] = None
+        best_value = -math.inf
+        if seed:
+            best = self.seeded(seed)
+            best_value = len(best.placed) * self.reward - best.cost()
+        step_scale = 2.0
+        stalled = 0
+        truncated = False
+        counters = {"lagrangian_iterations": 0, "primal_improvements": 0}
+
+        for iteration in range(max_iterations):
+            if deadline is not None and time.monotonic() >= deadline:
+                truncated = True
+                break
+            counters["lagrangian_iterations"] += 1
+            value, chosen = self.relax(multipliers)
+            if value < bound - 1e-9:
+                bound = value
+                stalled = 0
+            else:
+                stalled += 1
+                if stalled >= _STALL_ITERATIONS:
+                    step_scale /= 2
+                    stalled = 0
+
+            table = self.repair(chosen)
+            table_value = len(table.placed) * self.reward - table.cost()
+            if table_value > best_value:
+                best, best_value = table, table_value
+                counters["primal_improvements"] += 1
+            if bound - best_value < 1 or step_scale < _MIN_STEP_SCALE:
+                break
+            if iteration == 0:
+                # Pricing every student at the reward then bounds the schedule
+                # by "everyone, at no cost", and the steps lower the prices.
+                multipliers = [float(self.reward) if candidates else 0.0 for candidates in model.student_candidates]
+                continue
+
+            counts = [0] * len(multipliers)
+            for day, candidate in chosen:
+                counts[model.candidates[day][candidate][2]] += 1
+            direction = [1 - count for count in counts]
+            for row, multiplier in enumerate(multipliers):
+                if multiplier <= 0 and direction[row] > 0:
+                    direction[row] = 0
+            norm = sum(step * step for step in direction)
+            if norm == 0:
+                break
+            step = step_scale * (value - best_value) / norm
+            multipliers = [max(0.0, multiplier - step * direction[row]) for row, multiplier in enumerate(multipliers)]
+
+        if not counters["lagrangian_iterations"]:
+            # Out of time before the first relaxation: place students greedily.
+            best = self.repair(list(best.placed.values()) if best is not None else ())
+        elif not truncated:
+            best = self.polish(best)
+        count = len(best.placed)
+        cost = best.cost()
+        optimal = bound - (count * self.reward - cost) < 1
+        if not optimal and not truncated and len(model.student_ids) <= EXACT_MAX_STUDENTS:
+            best, optimal = self.prove(best, deadline, counters)
+            count = len(best.placed)
+            cost = best.cost()
+        gap: Optional[int] = None
+        if optimal:
+            gap = 0
+        elif count == self.max_count or bound < (count + 1) * self.reward - self.max_cost:
+            # No schedule places one more student, so any with ``count`` costs at least this.
+            lower_bound = 0 if bound == math.inf else max(0, math.ceil(count * self.reward - bound))
+            gap = max(0, cost - lower_bound)
+        assignments = [
+            (model.student_ids[row], day, candidate)
+            for row, (day, candidate) in best.placed.items()
+        ]
+        return IntervalSolution(assignments, count, cost, optimal, gap, truncated, counters)
+
+
+def solve(
+    model: IntervalModel,
+    day_open_cost: int,
+    gap_penalty: int,
+    deadline: Optional[float] = None,
+    max_iterations: int = MAX_ITERATIONS,
+    seed: Sequence[Tuple[int, datetime]] = (),
+) -> IntervalSolution:
+    """Schedule ``model``'s students; ``deadline`` is a ``time.monotonic()`` value.
+
+    ``seed`` lessons, as ``(student id, start time)``, are a schedule to
+    start from, so the result is never worse than it (lessons that do not
+    fit the model are left out of it). Up to ``EXACT_MAX_STUDENTS``
+    students, a schedule the bound leaves unproven is searched exactly.
+    """
+
+    return _LagrangianSolver(model, day_open_cost, gap_penalty).solve(deadline, max_iterations, seed)
@@ -0,0 +1,165 @@
+import time
+from collections import deque
+from typing import List, Optional, Sequence, Tuple
+
+_UNMATCHED = -1
+
+
+def hopcroft_karp(adjacency: Sequence[Sequence[int]], right_count: int) -> Tuple[int, List[int]]:
+    """Maximum cardinality matching of a bipartite graph.
+
+    ``adjacency[left]`` lists the right vertices (``0 <= right < right_count``)
+    that left vertex ``left`` may be matched to. Returns the matching size and,
+    per left vertex, its right vertex or ``-1``. Each phase finds a maximal
+    set of shortest augmenting paths with one BFS and iterative DFS, so the
+    whole matching takes ``O(E * sqrt(V))``.
+    """
+
+    left_count = len(adjacency)
+    match_left = [_UNMATCHED] * left_count
+    match_right = [_UNMATCHED] * right_count
+    size = 0
+
+    # Matching each left vertex to its first free neighbour up front leaves
+    # the phases only the conflicts to resolve.
+    for left, neighbours in enumerate(adjacency):
+        for right in neighbours:
+            if match_right[right] == _UNMATCHED:
+                match_left[left] = right
+                match_right[right] = left
+                size += 1
+                break
+
+    while True:
+        layer = [-1] * left_count
+        queue = deque()
+        for left in range(left_count):
+            if match_left[left] == _UNMATCHED and adjacency[left]:
+                layer[left] = 0
+                queue.append(left)
+        found = False
+        while queue:
+            left = queue.popleft()
+            for right in adjacency[left]:
+                partner = match_right[right]
+                if partner == _UNMATCHED:
+                    found = True
+                elif layer[partner] == -1:
+                    layer[partner] = layer[left] + 1
+                    queue.append(partner)
+        if not found:
+            return size, match_left
+
+        next_edge = [0] * left_count
+        for root in range(left_count):
+            if match_left[root] != _UNMATCHED or layer[root] != 0:
+                continue
+            # Iterative DFS along the layers; ``path`` holds (left, right) steps.
+            path: List[Tuple[int, int]] = []
+            left = root
+            while True:
+                neighbours = adjacency[left]
+                advanced = False
+                while next_edge[left] < len(neighbours):
+                    right = neighbours[next_edge[left]]
+                    next_edge[left] += 1
+                    partner = match_right[right]
+                    if partner == _UNMATCHED:
+                        path.append((left, right))
+                        for step_left, step_right in path:
+                            match_left[step_left] = step_right
+                            match_right[step_right] = step_left
+                        size += 1
+                        path = []
+                        break
+                    if layer[partner] == layer[left] + 1:
+                        path.append((left, right))
+                        left = partner
+                        advanced = True
+                        break
+                else:
+                    # Dead end: no augmenting path runs through ``left`` this phase.
+                    layer[left] = -1
+                    if not path:
+                        break
+                    left = path.pop()[0]
+                    continue
+                if not advanced:
+                    break
+
+
+def cheapest_maximum_matching(
+    adjacency: Sequence[Sequence[int]],
+    costs: Sequence[int],
+    right_count: int,
+    deadline: Optional[float] = None,
+) -> Tuple[int, List[int], bool]:
+    """Maximum matching of least total cost, when each left vertex carries the cost.
+
+    The sets of left vertices that some matching covers are the independent
+    sets of a (transversal) matroid, so taking left vertices cheapest first
+    and keeping each one an augmenting path can still reach gives a maximum
+    matching of minimum cost, without a shortest-path search. A search that
+    fails leaves its vertices marked until the next success: with the
+    matching unchanged, they cannot reach a free right vertex either.
+
+    Returns the matching size, per left vertex its right vertex or ``-1``,
+    and whether ``deadline`` (a ``time.monotonic()`` value) cut the search
+    short; the left vertices after that only take a free neighbour.
+    """
+
+    left_count = len(adjacency)
+    match_left = [_UNMATCHED] * left_count
+    match_right = [_UNMATCHED] * right_count
+    visited = [0] * left_count
+    next_edge = [0] * left_count
+    stamp = 1
+    size = 0
+    truncated = False
+
+    for count, root in enumerate(sorted(range(left_count), key=lambda left: (costs[left], left))):
+        if not truncated and deadline is not None and count % 64 == 0 and time.monotonic() >= deadline:
+            truncated = True
+        if truncated:
+            for right in adjacency[root]:
+                if match_right[right] == _UNMATCHED:
+                    match_left[root] = right
+                    match_right[right] = root
+                    size += 1
+                    break
+            continue
+
+        visited[root] = stamp
+        next_edge[root] = 0
+        path: List[Tuple[int, int]] = []
+        left = root
+        while True:
+            neighbours = adjacency[left]
+            advanced = False
+            while next_edge[left] < len(neighbours):
+                right = neighbours[next_edge[left]]
+                next_edge[left] += 1
+                partner = match_right[right]
+                if partner == _UNMATCHED:
+                    path.append((left, right))
+                    for step_left, step_right in path:
+                        match_left[step_left] = step_right
+                        match_right[step_right] = step_left
+                    size += 1
+                    stamp += 1
+                    path = []
+                    break
+                if visited[partner] != stamp:
+                    visited[partner] = stamp
+                    next_edge[partner] = 0
+                    path.append((left, right))
+                    left = partner
+                    advanced = True
+                    break
+            if advanced:
+                continue
+            if not path:
+                break
+            left = path.pop()[0]
+
+    return size, match_left, truncated
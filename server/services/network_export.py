@@ -0,0 +1,276 @@
+"""Export the flow network a generate call builds, and replay it offline.
+
+The network goes to a DIMACS min-cost-flow file: node 1 is the source, the
+last node the sink, and each ``a`` line one forward arc with its capacity
+and cost as built, before any solve. DIMACS has no way to say that a day's
+throughput arc only opens after its open arc is taken, so the JSON sidecar
+next to it keeps everything else: the parameters, the candidate slots and
+students the network was built from, each day's ``_DayState``, every arc's
+tag, and what presolve settled. Replay rebuilds the network from the
+sidecar, checks it against the DIMACS arcs, and solves it in-process so
+``cProfile`` sees the whole solve.
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import time
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, TextIO, Tuple
+
+from . import schedule_core
+
+SIDECAR_VERSION = 1
+
+_TAG_NAMES = {
+    schedule_core._TAG_NONE: 'none',
+    schedule_core._TAG_OPEN: 'open',
+    schedule_core._TAG_THROUGHPUT: 'throughput',
+    schedule_core._TAG_DAY_SLOT: 'day_slot',
+    schedule_core._TAG_SLOT_STUDENT: 'slot_student',
+    schedule_core._TAG_STUDENT_SINK: 'student_sink',
+}
+
+Arc = Tuple[int, int, int, int]
+
+
+def sidecar_path(dimacs_path: str) -> str:
+    return f'{dimacs_path}.json'
+
+
+def _network_arcs(network: 'schedule_core._FlowNetwork') -> List[Arc]:
+    """``(tail, head, capacity, cost)`` of every forward arc, with 0-based nodes."""
+
+    solver = network.solver
+    return [
+        (solver.edge_head(edge ^ 1), solver.edge_head(edge), solver.residual_capacity(edge), solver.edge_cost(edge))
+        for edge in range(0, solver.edge_count, 2)
+    ]
+
+
+def _build_network(
+    problem: 'schedule_core._SubProblem',
+    day_open_cost: int,
+    gap_penalty: int,
+) -> 'schedule_core._FlowNetwork':
+    return schedule_core._FlowNetwork(
+        problem.day_slot_map,
+        problem.slot_metadata,
+        problem.slot_students,
+        problem.student_ids,
+        day_open_cost,
+        gap_penalty,
+        problem.open_days,
+    )
+
+
+def export_network(
+    schedule_id: int,
+    inputs: 'schedule_core._GenerateInputs',
+    dimacs_path: str,
+    *,
+    day_open_cost: int = 10_000,
+    gap_penalty: int = 5,
+) -> Dict[str, object]:
+    """Write the flow network of ``schedule_id``'s loaded ``inputs`` to ``dimacs_path`` and its sidecar.
+
+    The network is the one a plain generate call with these options solves:
+    the candidate slots after presolve, whole (generate splits it into
+    components only to solve them apart). ``inputs`` come from
+    ``schedule_service._load_generate_inputs``, so only loading them needs
+    the database. Returns the sidecar's summary fields.
+    """
+
+    if inputs.empty_result() is not None:
+        raise ValueError('Schedule has no students to export.')
+    day_slot_map, slot_metadata, slot_students = schedule_core._candidate_slots(inputs)
+    if not day_slot_map:
+        raise ValueError('Schedule has no candidate slots to export.')
+    presolved = schedule_core._presolve(day_slot_map, slot_metadata, slot_students, list(inputs.student_by_id))
+    problem = presolved.whole()
+    network = _build_network(problem, day_open_cost, gap_penalty)
+    arcs = _network_arcs(network)
+    target_flow = problem.target_flow
+
+    with open(dimacs_path, 'w', encoding='utf-8') as handle:
+        handle.write(f'c lesson-scheduler flow network of schedule {schedule_id}\n')
+        handle.write(f'c day_open_cost={day_open_cost} gap_penalty={gap_penalty}\n')
+        handle.write(f'c day throughput arcs open with their day; see {sidecar_path(dimacs_path)}\n')
+        handle.write(f'p min {network.solver.node_count} {len(arcs)}\n')
+        handle.write(f'n {network.source + 1} {target_flow}\n')
+        handle.write(f'n {network.sink + 1} {-target_flow}\n')
+        for tail, head, capacity, cost in arcs:
+            handle.write(f'a {tail + 1} {head + 1} 0 {capacity} {cost}\n')
+
+    summary = {
+        'version': SIDECAR_VERSION,
+        'schedule_id': schedule_id,
+        'parameters': {
+            'slot_minutes': inputs.slot_minutes,
+            'buffer_minutes': inputs.buffer_minutes,
+            'day_open_cost': day_open_cost,
+            'gap_penalty': gap_penalty,
+            'default_engine': schedule_core._resolve_engine(None, False, assignment=day_open_cost == 0),
+        },
+        'nodes': {
+            'count': network.solver.node_count,
+            'source': network.source,
+            'sink': network.sink,
+            'first_day': network.first_day_node,
+            'first_slot': network.first_slot_node,
+            'first_student': network.first_student_node,
+        },
+        'arc_count': len(arcs),
+        'target_flow': target_flow,
+    }
+    sidecar = {
+        **summary,
+        'arc_tags': [_TAG_NAMES[network.solver._tag[edge // 2]] for edge in range(0, network.solver.edge_count, 2)],
+        'days': [
+            {
+                'day': day_key.isoformat(),
+                'slots': problem.day_slot_map[day_key],
+                'open': day_key in problem.open_days,
+                'state': {
+                    'total_slots': state.total_slots,
+                    'open_arc': state.open_edge // 2,
+                    'through_arc': state.through_edge // 2,
+                },
+            }
+            for day_key, state in zip(network.day_keys, network.day_states)
+        ],
+        'slots': [
+            {
+                'start_time': start_time.isoformat(),
+                'position': position,
+                'students': problem.slot_students[slot_id],
+            }
+            for slot_id, (_day_key, start_time, position) in sorted(problem.slot_metadata.items())
+        ],
+        'student_ids': problem.student_ids,
+        'presolve': {
+            **presolved.stats,
+            'forced_count': len(presolved.forced),
+            'fixed_cost': presolved.fixed_cost(slot_metadata, day_open_cost, gap_penalty),
+            'matched_student_ids': sorted(presolved.matched),
+        },
+    }
+    with open(sidecar_path(dimacs_path), 'w', encoding='utf-8') as handle:
+        json.dump(sidecar, handle, indent=1)
+    return summary
+
+
+def _read_dimacs_arcs(dimacs_path: str) -> List[Arc]:
+    arcs: List[Arc] = []
+    with open(dimacs_path, encoding='utf-8') as handle:
+        for line in handle:
+            if line.startswith('a '):
+                _kind, tail, head, _lower, capacity, cost = line.split()
+                arcs.append((int(tail) - 1, int(head) - 1, int(capacity), int(cost)))
+    return arcs
+
+
+def load_network(dimacs_path: str) -> Tuple[dict, 'schedule_core._Presolve']:
+    """Rebuild an exported network's sub-problem; ``ValueError`` if it no longer matches the DIMACS file."""
+
+    with open(sidecar_path(dimacs_path), encoding='utf-8') as handle:
+        sidecar = json.load(handle)
+    if sidecar.get('version') != SIDECAR_VERSION:
+        raise ValueError(f'Unsupported sidecar version: {sidecar.get("version")!r}')
+
+    problem = schedule_core._SubProblem({}, {}, {}, list(sidecar['student_ids']), [])
+    day_of_slot: Dict[int, date] = {}
+    for day in sidecar['days']:
+        day_key = date.fromisoformat(day['day'])
+        problem.day_slot_map[day_key] = list(day['slots'])
+        day_of_slot.update((slot_id, day_key) for slot_id in day['slots'])
+        if day['open']:
+            problem.open_days.add(day_key)
+    for slot_id, slot in enumerate(sidecar['slots']):
+        problem.slot_metadata[slot_id] = (
+            day_of_slot[slot_id],
+            datetime.fromisoformat(slot['start_time']),
+            slot['position'],
+        )
+        problem.slot_students[slot_id] = list(slot['students'])
+        problem.slot_ids.append(slot_id)
+    problem.target_flow = sidecar['target_flow']
+
+    parameters = sidecar['parameters']
+    network = _build_network(problem, parameters['day_open_cost'], parameters['gap_penalty'])
+    if _network_arcs(network) != _read_dimacs_arcs(dimacs_path):
+        raise ValueError('The DIMACS arcs do not match the network rebuilt from the sidecar.')
+    presolved = schedule_core._Presolve(
+        problem=problem,
+        forced=[],
+        open_days=set(problem.open_days),
+        matched=set(sidecar['presolve']['matched_student_ids']),
+        stats={},
+    )
+    return sidecar, presolved
+
+
+def replay_network(
+    dimacs_path: str,
+    engine: Optional[str] = None,
+    *,
+    repeat: int = 1,
+    whole: bool = False,
+    profile_output: Optional[TextIO] = None,
+    profile_limit: int = 25,
+) -> Dict[str, object]:
+    """Solve an exported network ``repeat`` times and time each solve.
+
+    Like generate, the network is split into components unless ``whole``;
+    every solve runs in this process, one component after another, so the
+    profile covers all of it. With ``profile_output`` the last solve runs
+    under ``cProfile`` and its top ``profile_limit`` functions by cumulative
+    time are written there.
+    """
+
+    if repeat < 1:
+        raise ValueError('repeat must be positive')
+    sidecar, presolved = load_network(dimacs_path)
+    parameters = sidecar['parameters']
+    day_open_cost, gap_penalty = parameters['day_open_cost'], parameters['gap_penalty']
+    engine_name = schedule_core._resolve_engine(
+        engine or parameters['default_engine'],
+        False,
+        assignment=day_open_cost == 0,
+    )
+    if engine_name == schedule_core._INTERVAL_ENGINE:
+        raise ValueError('The interval engine does not solve flow networks.')
+
+    def solve() -> List['schedule_core._SubSolution']:
+        problems: Sequence['schedule_core._SubProblem'] = (
+            [presolved.whole()] if whole else presolved.components()
+        )
+        return [
+            schedule_core._solve_sub_problem(problem, day_open_cost, gap_penalty, engine_name)
+            for problem in problems
+        ]
+
+    seconds: List[float] = []
+    for run in range(repeat):
+        profiler = cProfile.Profile() if profile_output is not None and run == repeat - 1 else None
+        started = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        solutions = solve()
+        if profiler is not None:
+            profiler.disable()
+        seconds.append(time.perf_counter() - started)
+        if profiler is not None:
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(profile_limit)
+            profile_output.write(stream.getvalue())
+
+    solution = schedule_core._merge_solutions(solutions)
+    return {
+        'engine': engine_name,
+        'components': len(solutions),
+        'scheduled_count': solution.flow + sidecar['presolve']['forced_count'],
+        'objective_cost': solution.cost + sidecar['presolve']['fixed_cost'],
+        'solve_seconds': seconds,
+    }
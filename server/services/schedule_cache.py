@@ -0,0 +1,149 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, Mapping, Optional, Set, Tuple
+
+DEFAULT_MAX_ENTRIES = 128
+DEFAULT_TTL_SECONDS = 600
+
+
+def make_key(
+    teacher_slots: Mapping[date, Iterable[datetime]],
+    student_slots: Mapping[int, Iterable[datetime]],
+    students: Iterable[Tuple[int, str, int]],
+    schedule_days: Iterable[date],
+    parameters: Mapping[str, object],
+) -> str:
+    """Hash the normalized solver inputs of a generate call.
+
+    ``students`` holds ``(id, name, lesson_length)`` rows; names are part of
+    the key because they are part of the cached payload.
+    """
+
+    normalized = {
+        "teacher_slots": sorted(
+            (day_key.isoformat(), sorted({start.isoformat() for start in starts}))
+            for day_key, starts in teacher_slots.items()
+        ),
+        "student_slots": sorted(
+            (student_id, sorted({start.isoformat() for start in starts}))
+            for student_id, starts in student_slots.items()
+        ),
+        "students": sorted([student_id, name, lesson_length] for student_id, name, lesson_length in students),
+        "days": sorted(day_key.isoformat() for day_key in schedule_days),
+        "parameters": sorted(parameters.items()),
+    }
+    encoded = json.dumps(normalized, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Bounded LRU of generate results with a time-to-live per entry."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, int, dict]]" = OrderedDict()
+        self._keys_by_schedule: Dict[int, Set[str]] = {}
+        self._generations: Dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def configure(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None) -> None:
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if ttl_seconds is not None:
+                self.ttl_seconds = ttl_seconds
+            self._evict_overflow()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[0] > self.ttl_seconds:
+                self._discard(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[2])
+
+    def put(self, key: str, schedule_id: int, result: dict) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (self._clock(), schedule_id, copy.deepcopy(result))
+            self._keys_by_schedule.setdefault(schedule_id, set()).add(key)
+            self._evict_overflow()
+
+    def generation(self, schedule_id: int) -> int:
+        """How many times ``schedule_id`` has been invalidated; changes whenever its inputs do."""
+
+        with self._lock:
+            return self._generations.get(schedule_id, 0)
+
+    def invalidate_schedule(self, schedule_id: int) -> None:
+        with self._lock:
+            self._generations[schedule_id] = self._generations.get(schedule_id, 0) + 1
+            keys = self._keys_by_schedule.pop(schedule_id, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            self.invalidations += len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_schedule.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _evict_overflow(self) -> None:
+        while len(self._entries) > max(self.max_entries, 0):
+            key = next(iter(self._entries))
+            self._discard(key)
+            self.evictions += 1
+
+    def _discard(self, key: str) -> None:
+        _created, schedule_id, _result = self._entries.pop(key)
+        keys = self._keys_by_schedule.get(schedule_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_schedule[schedule_id]
+
+
+result_cache = ResultCache()
+
+
+def invalidate_schedule(schedule_id: Optional[int]) -> None:
+    if schedule_id is not None:
+        result_cache.invalidate_schedule(schedule_id)
@@ -0,0 +1,2896 @@
+"""The scheduling solver: slot building, the flow network, its engines and generate itself.
+
+Nothing here imports Flask or SQLAlchemy, so process-pool workers and
+command-line tools can load the solver without the web stack.
+``_generate`` runs one generate call on inputs from any loader:
+``schedule_service`` reads a schedule's rows from the database, and
+``generate_studio_schedule`` takes them from memory.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import threading
+import time
+from array import array
+from collections import Counter, OrderedDict, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from multiprocessing.context import BaseContext
+from typing import (
+    Callable,
+    Collection,
+    Dict,
+    Iterable as TypingIterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from . import interval_engine, matching, schedule_cache, solver_diagnostics
+
+
+@dataclass(frozen=True)
+class ScheduledLesson:
+    """Result object representing a scheduled lesson."""
+
+    student_id: int
+    student_name: str
+    start_time: datetime
+    end_time: datetime
+    day: date
+
+
+_TAG_NONE = 0
+_TAG_OPEN = 1
+_TAG_THROUGHPUT = 2
+_TAG_DAY_SLOT = 3
+_TAG_SLOT_STUDENT = 4
+_TAG_STUDENT_SINK = 5
+# Most slope-scaling rounds the cost-scaling engine spends choosing its days.
+_DAY_PRICING_ROUNDS = 4
+
+class _MinCostFlow:
+    """Residual graph stored as parallel arrays in forward-star layout.
+
+    Edges are added in pairs: the forward arc lives at an even index ``e`` and
+    its reverse at ``e ^ 1``, so the reverse index never has to be stored.
+    ``_head``/``_next`` chain each node's arcs in insertion order, and every
+    pair carries an integer tag (``_TAG_*``) plus an integer payload (the day
+    index for day-level arcs) instead of a metadata tuple.
+    """
+
+    def __init__(self, node_count: int):
+        self._n = node_count
+        self._head = array("l", [-1]) * node_count
+        self._last = array("l", [-1]) * node_count
+        self._next = array("l")
+        self._to = array("l")
+        self._cap = array("l")
+        self._cost = array("q")
+        self._tag = array("b")
+        self._tag_ref = array("l")
+        self.potential: List[int] = []
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.deadline_hit = False
+
+    @property
+    def node_count(self) -> int:
+        return self._n
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._to)
+
+    def add_edge(
+        self,
+        u: int,
+        v: int,
+        capacity: int,
+        cost: int,
+        tag: int = _TAG_NONE,
+        tag_ref: int = -1,
+    ) -> int:
+        forward = len(self._to)
+        self._append_arc(u, v, capacity, cost)
+        self._append_arc(v, u, 0, -cost)
+        self._tag.append(tag)
+        self._tag_ref.append(tag_ref)
+        return forward
+
+    def _append_arc(self, u: int, v: int, capacity: int, cost: int) -> None:
+        index = len(self._to)
+        self._to.append(v)
+        self._cap.append(capacity)
+        self._cost.append(cost)
+        self._next.append(-1)
+        if self._head[u] == -1:
+            self._head[u] = index
+        else:
+            self._next[self._last[u]] = index
+        self._last[u] = index
+
+    def residual_capacity(self, edge: int) -> int:
+        return self._cap[edge]
+
+    def set_residual_capacity(self, edge: int, capacity: int) -> None:
+        self._cap[edge] = capacity
+
+    def push(self, edge: int, amount: int = 1) -> None:
+        self._cap[edge] -= amount
+        self._cap[edge ^ 1] += amount
+
+    def find_edge(self, u: int, v: int) -> int:
+        e = self._head[u]
+        while e != -1:
+            if self._to[e] == v and not e & 1:
+                return e
+            e = self._next[e]
+        return -1
+
+    def edge_cost(self, edge: int) -> int:
+        return self._cost[edge]
+
+    def set_edge_cost(self, edge: int, cost: int) -> None:
+        self._cost[edge] = cost
+        self._cost[edge ^ 1] = -cost
+
+    def edge_head(self, edge: int) -> int:
+        return self._to[edge]
+
+    def forward_edges(self, u: int) -> Iterator[int]:
+        e = self._head[u]
+        while e != -1:
+            if not e & 1:
+                yield e
+            e = self._next[e]
+
+    def saturated_edges(self, tag: int) -> Iterator[Tuple[int, int]]:
+        """Yield ``(tail, head)`` for every forward arc with ``tag`` and no residual capacity."""
+
+        to = self._to
+        cap = self._cap
+        for pair, edge_tag in enumerate(self._tag):
+            if edge_tag == tag and cap[2 * pair] == 0:
+                yield to[2 * pair + 1], to[2 * pair]
+
+    def memory_bytes(self) -> int:
+        arrays = (
+            self._head,
+            self._last,
+            self._next,
+            self._to,
+            self._cap,
+            self._cost,
+            self._tag,
+            self._tag_ref,
+        )
+        return sum(item.buffer_info()[1] * item.itemsize for item in arrays)
+
+    def successive_shortest_path(
+        self,
+        source: int,
+        sink: int,
+        max_flow: int,
+        day_states: Sequence["_DayState"],
+        potential: Optional[List[int]] = None,
+        deadline: Optional[float] = None,
+    ) -> Tuple[int, int]:
+        """Augment along cheapest paths until ``max_flow`` units or no path remain.
+
+        With a ``deadline`` (a ``time.monotonic()`` value) it also stops, with
+        ``deadline_hit`` set, once the deadline passes between augmentations.
+        """
+
+        import heapq
+
+        n = self._n
+        head = self._head
+        nxt = self._next
+        to = self._to
+        cap = self._cap
+        edge_cost = self._cost
+        tag = self._tag
+        tag_ref = self._tag_ref
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        flow = 0
+        cost = 0
+        if potential is None:
+            potential = [0] * n
+        self.potential = potential
+        inf = 10**18
+        counters = self.counters
+        pushes = 0
+        pops = 0
+
+        # Opening a day can leave a negative cycle behind; after the last
+        # augmentation one more search looks for it before returning.
+        recheck = False
+        while flow < max_flow or recheck:
+            if deadline is not None and time.monotonic() >= deadline:
+                self.deadline_hit = True
+                break
+            dist = [inf] * n
+            prev_edge = [-1] * n
+            dist[source] = 0
+            pushes += 1
+            counters["dijkstra_runs"] += 1
+
+            # Entries are ``dist * n + node`` ints rather than tuples: cheaper to
+            # push, pop and compare, and they order the same way. Monotone
+            # bucket frontiers were measured against this heap and dropped:
+            # Dial's buckets ran at 0.93x-1.06x its speed, and a plain list
+            # for nodes reached over zero reduced-cost arcs at 0.71x-0.99x.
+            # Scanning arcs dominates a run, and Python-level buckets cost
+            # more than the C heap they replace.
+            heap: List[int] = [source]
+            while heap:
+                cur_dist, u = divmod(heappop(heap), n)
+                pops += 1
+                if cur_dist != dist[u]:
+                    continue
+                base = cur_dist + potential[u]
+                e = head[u]
+                while e != -1:
+                    if cap[e] > 0:
+                        v = to[e]
+                        next_cost = base + edge_cost[e] - potential[v]
+                        if next_cost < dist[v] and v != source:
+                            dist[v] = next_cost
+                            prev_edge[v] = e
+                            heappush(heap, next_cost * n + v)
+                            pushes += 1
+                    e = nxt[e]
+
+            cycle = self._source_cycle(source, dist, potential, prev_edge)
+            if cycle is not None:
+                pushed = min(cap[e] for e in cycle)
+                for day_index, units in self._day_slot_changes(cycle).items():
+                    day_states[day_index].assignments_made += units * pushed
+                cost += self._cancel_cycle(cycle)
+                counters["cycles_cancelled"] += 1
+                continue
+
+            if flow >= max_flow or dist[sink] == inf:
+                break
+
+            for node in range(n):
+                if dist[node] < inf:
+                    potential[node] += dist[node]
+
+            add_flow = max_flow - flow
+            v = sink
+            path: List[int] = []
+            while v != source:
+                e = prev_edge[v]
+                if e == -1:
+                    add_flow = 0
+                    break
+                if cap[e] < add_flow:
+                    add_flow = cap[e]
+                path.append(e)
+                v = to[e ^ 1]
+
+            if add_flow <= 0:
+                break
+
+            flow += add_flow
+            cost += add_flow * potential[sink]
+            counters["augmentations"] += 1
+
+            open_edges: Dict[int, bool] = {}
+
+            for e in path:
+                cap[e] -= add_flow
+                cap[e ^ 1] += add_flow
+
+                if tag[e >> 1] == _TAG_OPEN:
+                    open_edges[tag_ref[e >> 1]] = True
+            recheck = bool(open_edges)
+
+            for day_index, units in self._day_slot_changes(path).items():
+                state = day_states[day_index]
+                state.assignments_made += units * add_flow
+                remaining = max(0, state.total_slots - state.assignments_made)
+                if not state.opened and day_index in open_edges:
+                    state.opened = True
+                    cap[state.through_edge] = remaining
+                    cap[state.open_edge ^ 1] = 0
+                elif state.opened:
+                    if cap[state.through_edge] > remaining:
+                        cap[state.through_edge] = remaining
+
+        counters["heap_pushes"] += pushes
+        counters["heap_pops"] += pops
+        return flow, cost
+
+    def _day_slot_changes(self, edges: Sequence[int]) -> Dict[int, int]:
+        """Net lessons gained per day index when one unit is pushed along ``edges``.
+
+        A path may back a lesson out of a day (a reverse day -> slot arc) as
+        well as add one, so the counts are signed.
+        """
+
+        tag = self._tag
+        tag_ref = self._tag_ref
+        changes: Dict[int, int] = {}
+        for e in edges:
+            if tag[e >> 1] == _TAG_DAY_SLOT:
+                day_index = tag_ref[e >> 1]
+                changes[day_index] = changes.get(day_index, 0) + (-1 if e & 1 else 1)
+        return changes
+
+    def reduced_costs_valid(self, potential: Sequence[int]) -> bool:
+        to = self._to
+        cap = self._cap
+        edge_cost = self._cost
+        for u in range(self._n):
+            pu = potential[u]
+            e = self._head[u]
+            while e != -1:
+                if cap[e] > 0 and edge_cost[e] + pu - potential[to[e]] < 0:
+                    return False
+                e = self._next[e]
+        return True
+
+    def cheapest_cycle(self, edge: int, potential: Sequence[int]) -> Optional[Tuple[int, List[int]]]:
+        """Return the cost and arcs of the cheapest residual cycle through ``edge``.
+
+        Searches from the head of ``edge`` back to its tail with Dijkstra on
+        reduced costs, so ``potential`` should leave every residual arc with
+        a non-negative reduced cost, as the potentials of a finished solve do.
+        Returns ``None`` when no such cycle exists.
+        """
+
+        import heapq
+
+        head = self._head
+        nxt = self._next
+        to = self._to
+        cap = self._cap
+        edge_cost = self._cost
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        start, target = to[edge], to[edge ^ 1]
+        inf = 10**18
+        dist = [inf] * self._n
+        prev_edge = [-1] * self._n
+        done = [False] * self._n
+        dist[start] = 0
+        heap: List[Tuple[int, int]] = [(0, start)]
+        self.counters["cycle_searches"] += 1
+
+        while heap:
+            cur_dist, u = heappop(heap)
+            if done[u]:
+                continue
+            done[u] = True
+            if u == target:
+                break
+            base = cur_dist + potential[u]
+            e = head[u]
+            while e != -1:
+                if cap[e] > 0 and e != edge:
+                    v = to[e]
+                    next_cost = base + edge_cost[e] - potential[v]
+                    if next_cost < dist[v] and not done[v]:
+                        dist[v] = next_cost
+                        prev_edge[v] = e
+                        heappush(heap, (next_cost, v))
+                e = nxt[e]
+
+        if not done[target]:
+            return None
+        cycle = [edge]
+        v = target
+        while v != start:
+            e = prev_edge[v]
+            cycle.append(e)
+            v = to[e ^ 1]
+        return sum(edge_cost[e] for e in cycle), cycle
+
+    def repair_potentials(self, source: int) -> List[int]:
+        """Recompute potentials with label-correcting shortest paths from ``source``.
+
+        Used when flow is carried into a freshly built network, where it may no
+        longer be cost-optimal: negative residual cycles are cancelled as they
+        are found, after which the distances are valid Dijkstra potentials.
+        """
+
+        n = self._n
+        head = self._head
+        nxt = self._next
+        to = self._to
+        cap = self._cap
+        edge_cost = self._cost
+        inf = 10**18
+
+        while True:
+            dist = [inf] * n
+            prev_edge = [-1] * n
+            relaxations = [0] * n
+            queued = [False] * n
+            dist[source] = 0
+            queue = deque([source])
+            queued[source] = True
+            cycle: Optional[List[int]] = None
+
+            while queue and cycle is None:
+                u = queue.popleft()
+                queued[u] = False
+                e = head[u]
+                while e != -1:
+                    if cap[e] > 0:
+                        v = to[e]
+                        next_cost = dist[u] + edge_cost[e]
+                        if next_cost < dist[v]:
+                            dist[v] = next_cost
+                            prev_edge[v] = e
+                            relaxations[v] += 1
+                            if v == source or relaxations[v] >= n:
+                                cycle = self._predecessor_cycle(v, prev_edge)
+                                if cycle is not None:
+                                    break
+                            if not queued[v]:
+                                queued[v] = True
+                                queue.append(v)
+                    e = nxt[e]
+
+            if cycle is None:
+                reachable = [value for value in dist if value < inf]
+                ceiling = max(reachable) if reachable else 0
+                return [value if value < inf else ceiling for value in dist]
+
+            self._cancel_cycle(cycle)
+
+    def _predecessor_cycle(self, start: int, prev_edge: Sequence[int]) -> Optional[List[int]]:
+        to = self._to
+        order: Dict[int, int] = {}
+        node = start
+        while node not in order:
+            e = prev_edge[node]
+            if e == -1:
+                return None
+            order[node] = e
+            node = to[e ^ 1]
+
+        cycle: List[int] = []
+        cursor = node
+        while True:
+            e = order[cursor]
+            cycle.append(e)
+            cursor = to[e ^ 1]
+            if cursor == node:
+                return cycle
+
+    def _source_cycle(
+        self,
+        source: int,
+        dist: Sequence[int],
+        potential: Sequence[int],
+        prev_edge: Sequence[int],
+    ) -> Optional[List[int]]:
+        """Return a negative residual cycle through ``source``, if one exists.
+
+        Opening a day gives its zero-cost throughput arc capacity after flow has
+        already been routed around it. That arc leaves the source, so it is the
+        only arc whose reduced cost turns negative, and every negative cycle it
+        creates returns to the source through one of the source's reverse arcs.
+        """
+
+        to = self._to
+        cap = self._cap
+        edge_cost = self._cost
+        e = self._head[source]
+        while e != -1:
+            back = e ^ 1
+            u = to[e]
+            if cap[back] > 0 and dist[u] + potential[u] + edge_cost[back] - potential[source] < 0:
+                cycle = [back]
+                while u != source:
+                    e = prev_edge[u]
+                    cycle.append(e)
+                    u = to[e ^ 1]
+                return cycle
+            e = self._next[e]
+        return None
+
+    def _cancel_cycle(self, cycle: Sequence[int]) -> int:
+        cap = self._cap
+        push = min(cap[e] for e in cycle)
+        for e in cycle:
+            cap[e] -= push
+            cap[e ^ 1] += push
+        return push * sum(self._cost[e] for e in cycle)
+
+    def capacities(self) -> array:
+        return array(self._cap.typecode, self._cap)
+
+    def restore_capacities(self, snapshot: array) -> None:
+        self._cap[:] = snapshot
+
+    def max_flow(self, source: int, sink: int, limit: int, deadline: Optional[float] = None) -> int:
+        """Augment up to ``limit`` units along shortest-hop paths, ignoring costs (Dinic).
+
+        A ``deadline`` is checked between phases, as in ``successive_shortest_path``.
+        """
+
+        n = self._n
+        head = self._head
+        nxt = self._next
+        to = self._to
+        cap = self._cap
+        total = 0
+
+        while total < limit:
+            if deadline is not None and time.monotonic() >= deadline:
+                self.deadline_hit = True
+                break
+            level = [-1] * n
+            level[source] = 0
+            queue = deque([source])
+            while queue:
+                u = queue.popleft()
+                e = head[u]
+                while e != -1:
+                    if cap[e] > 0 and level[to[e]] < 0:
+                        level[to[e]] = level[u] + 1
+                        queue.append(to[e])
+                    e = nxt[e]
+            if level[sink] < 0:
+                break
+            self.counters["max_flow_phases"] += 1
+
+            current = list(head)
+            path: List[int] = []
+            u = source
+            while total < limit:
+                if u == sink:
+                    add_flow = min(limit - total, min(cap[e] for e in path))
+                    for e in path:
+                        cap[e] -= add_flow
+                        cap[e ^ 1] += add_flow
+                    total += add_flow
+                    self.counters["max_flow_paths"] += 1
+                    path.clear()
+                    u = source
+                    continue
+
+                e = current[u]
+                next_level = level[u] + 1
+                while e != -1 and (cap[e] == 0 or level[to[e]] != next_level):
+                    e = nxt[e]
+                current[u] = e
+                if e != -1:
+                    path.append(e)
+                    u = to[e]
+                elif u == source:
+                    break
+                else:
+                    level[u] = -1
+                    e = path.pop()
+                    u = to[e ^ 1]
+                    current[u] = nxt[e]
+
+        return total
+
+    def cost_scaling(
+        self,
+        alpha: int = 16,
+        deadline: Optional[float] = None,
+        price: Optional[List[int]] = None,
+    ) -> List[int]:
+        """Turn the current flow into a min-cost flow with the same node balances.
+
+        Goldberg-Tarjan cost scaling: costs are multiplied by ``n + 1`` so an
+        ``epsilon`` of 1 certifies optimality, and each refine step saturates
+        every arc with negative reduced cost before discharging the resulting
+        excesses with FIFO push/relabel. Arcs with no residual capacity in
+        either direction (like an opened day's locked open arc) never move.
+        A ``deadline`` is checked between refine steps, where the flow is
+        always feasible, just not yet optimal. Returns the final (scaled)
+        prices; passing them back as ``price`` after a small change to the
+        flow starts the scaling at the largest violation they leave instead
+        of at the largest cost.
+        """
+
+        n = self._n
+        head = self._head
+        nxt = self._next
+        to = self._to
+        cap = self._cap
+        scale = n + 1
+        scaled = [value * scale for value in self._cost]
+        tail = [to[e ^ 1] for e in range(len(to))]
+        excess = [0] * n
+
+        pushes = 0
+        relabels = 0
+        if price is None:
+            price = [0] * n
+            epsilon = max((abs(value) for value in scaled), default=0)
+        else:
+            price = list(price)
+            violation = max(
+                (
+                    -(scaled[e] + price[tail[e]] - price[to[e]])
+                    for e, residual in enumerate(cap)
+                    if residual > 0
+                ),
+                default=0,
+            )
+            epsilon = violation * alpha if violation > 1 else 0
+        while epsilon > 1:
+            if deadline is not None and time.monotonic() >= deadline:
+                self.deadline_hit = True
+                break
+            epsilon = max(1, epsilon // alpha)
+            self.counters["refines"] += 1
+
+            for e, residual in enumerate(cap):
+                if residual > 0:
+                    u = tail[e]
+                    v = to[e]
+                    if scaled[e] + price[u] - price[v] < 0:
+                        cap[e] = 0
+                        cap[e ^ 1] += residual
+                        excess[u] -= residual
+                        excess[v] += residual
+
+            active = deque(u for u in range(n) if excess[u] > 0)
+            current = list(head)
+            while active:
+                u = active.popleft()
+                while excess[u] > 0:
+                    pu = price[u]
+                    e = current[u]
+                    while e != -1 and (cap[e] == 0 or scaled[e] + pu - price[to[e]] >= 0):
+                        e = nxt[e]
+
+                    if e == -1:
+                        highest = None
+                        e = head[u]
+                        while e != -1:
+                            if cap[e] > 0:
+                                candidate = price[to[e]] - scaled[e]
+                                if highest is None or candidate > highest:
+                                    highest = candidate
+                            e = nxt[e]
+                        price[u] = highest - epsilon
+                        current[u] = head[u]
+                        relabels += 1
+                        continue
+
+                    current[u] = e
+                    v = to[e]
+                    amount = excess[u] if excess[u] < cap[e] else cap[e]
+                    cap[e] -= amount
+                    cap[e ^ 1] += amount
+                    excess[u] -= amount
+                    if 0 < excess[v] + amount and excess[v] <= 0:
+                        active.append(v)
+                    excess[v] += amount
+                    pushes += 1
+
+        self.counters["cost_scaling_pushes"] += pushes
+        self.counters["relabels"] += relabels
+        return price
+
+
+@dataclass
+class _DayState:
+    total_slots: int
+    open_edge: int
+    through_edge: int
+    opened: bool = False
+    assignments_made: int = 0
+
+
+class _FlowNetwork:
+    """The source -> day -> slot -> student -> sink network for one generate call."""
+
+    def __init__(
+        self,
+        day_slot_map: Dict[date, List[int]],
+        slot_metadata: Dict[int, Tuple[date, datetime, int]],
+        slot_students: Dict[int, List[int]],
+        student_ids: Sequence[int],
+        day_open_cost: int,
+        gap_penalty: int,
+        open_days: Collection[date] = (),
+    ):
+        self.slot_metadata = slot_metadata
+        self.slot_students = slot_students
+        # Days another lesson already pays for: their open arc is free.
+        self.open_days = frozenset(open_days)
+        self.student_ids = list(student_ids)
+        self.deadline: Optional[float] = None
+        # Most students any solve could place; the cost-scaling engine tightens it
+        # with a max flow, unless presolve already made it exact.
+        self.max_flow_bound = len(self.student_ids)
+        self.max_flow_exact = False
+        self.day_keys: List[date] = list(day_slot_map.keys())
+        self.day_index = {day_key: index for index, day_key in enumerate(self.day_keys)}
+        day_index = self.day_index
+
+        self.source = 0
+        self.first_day_node = 1
+        self.first_slot_node = self.first_day_node + len(self.day_keys)
+        self.first_student_node = self.first_slot_node + len(slot_metadata)
+        self.sink = self.first_student_node + len(self.student_ids)
+        self.student_nodes: Dict[int, int] = {
+            student_id: self.first_student_node + offset
+            for offset, student_id in enumerate(self.student_ids)
+        }
+
+        solver = _MinCostFlow(self.sink + 1)
+        self.solver = solver
+        self.day_states: List[_DayState] = []
+
+        for index, day_key in enumerate(self.day_keys):
+            day_node = self.first_day_node + index
+            open_cost = 0 if day_key in self.open_days else day_open_cost
+            open_edge = solver.add_edge(self.source, day_node, 1, open_cost, _TAG_OPEN, index)
+            through_edge = solver.add_edge(self.source, day_node, 0, 0, _TAG_THROUGHPUT, index)
+            self.day_states.append(
+                _DayState(
+                    total_slots=len(day_slot_map[day_key]),
+                    open_edge=open_edge,
+                    through_edge=through_edge,
+                )
+            )
+
+        self.slot_edges: List[int] = []
+        for slot_id, (day_key, _start_time, position) in slot_metadata.items():
+            slot_node = self.first_slot_node + slot_id
+            gap_cost = gap_penalty * position * position
+            self.slot_edges.append(
+                solver.add_edge(
+                    self.first_day_node + day_index[day_key],
+                    slot_node,
+                    1,
+                    gap_cost,
+                    _TAG_DAY_SLOT,
+                    day_index[day_key],
+                )
+            )
+
+            for student_id in slot_students[slot_id]:
+                solver.add_edge(slot_node, self.student_nodes[student_id], 1, 0, _TAG_SLOT_STUDENT)
+
+        self.sink_edges: Dict[int, int] = {
+            student_id: solver.add_edge(node, self.sink, 1, 0, _TAG_STUDENT_SINK)
+            for student_id, node in self.student_nodes.items()
+        }
+
+    def reweight(self, day_open_cost: int, gap_penalty: int) -> None:
+        """Drop the current flow and re-cost the network, keeping its arcs.
+
+        Lets a parameter sweep solve several cost settings on one graph build.
+        """
+
+        solver = self.solver
+        for edge in range(0, solver.edge_count, 2):
+            solver.set_residual_capacity(edge, 1)
+            solver.set_residual_capacity(edge ^ 1, 0)
+        for day_key, state in zip(self.day_keys, self.day_states):
+            solver.set_residual_capacity(state.through_edge, 0)
+            solver.set_edge_cost(state.open_edge, 0 if day_key in self.open_days else day_open_cost)
+            state.opened = False
+            state.assignments_made = 0
+        for slot_id, (_day_key, _start_time, position) in self.slot_metadata.items():
+            solver.set_edge_cost(self.slot_edges[slot_id], gap_penalty * position * position)
+        solver.potential = []
+        solver.counters.clear()
+        solver.deadline_hit = False
+        self.max_flow_bound = len(self.student_ids)
+        self.max_flow_exact = False
+
+    def solve(self, max_flow: int, potential: Optional[List[int]] = None) -> Tuple[int, int]:
+        return self.solver.successive_shortest_path(
+            self.source,
+            self.sink,
+            max_flow,
+            self.day_states,
+            potential,
+            self.deadline,
+        )
+
+    def solve_cost_scaling(self, max_flow: int) -> Tuple[int, int]:
+        """Choose the days to open, then route lessons on them with cost scaling.
+
+        Days are opened greedily by how many still-unscheduled students they
+        could take, growing a Dinic max flow as they open, and days whose
+        lessons can be moved onto the other open days are closed again. That
+        set only answers reach, so ``_price_days`` weighs it against sets
+        that trade each day's open cost against the gap cost it saves. The
+        first lesson of every open day is then locked onto its open arc, as
+        ``successive_shortest_path`` does, and a last cost-scaling pass keeps
+        the flow on the open days min-cost. Every step is a bulk flow computation,
+        so the work no longer grows with one shortest-path search per student.
+        """
+
+        solver = self.solver
+        source, sink = self.source, self.sink
+        deadline = self.deadline
+        for state in self.day_states:
+            solver.set_residual_capacity(state.open_edge, 0)
+        empty = solver.capacities()
+
+        if self.max_flow_exact:
+            target = min(max_flow, self.max_flow_bound)
+        else:
+            for state in self.day_states:
+                solver.set_residual_capacity(state.through_edge, state.total_slots)
+            target = solver.max_flow(source, sink, max_flow, deadline)
+            solver.restore_capacities(empty)
+            if not solver.deadline_hit:
+                self.max_flow_bound = target
+
+        student_days: Dict[int, Set[int]] = defaultdict(set)
+        for slot_id, (day_key, _start_time, _position) in self.slot_metadata.items():
+            for edge in solver.forward_edges(self.first_slot_node + slot_id):
+                student_days[solver.edge_head(edge)].add(self.day_index[day_key])
+
+        opened: List[int] = []
+        flow = 0
+        while flow < target and len(opened) < len(self.day_states) and not solver.deadline_hit:
+            waiting = [
+                node
+                for student_id, node in self.student_nodes.items()
+                if solver.residual_capacity(self.sink_edges[student_id]) > 0
+            ]
+            best_index, best_score = -1, (-1, -1)
+            for index, state in enumerate(self.day_states):
+                if index in opened:
+                    continue
+                reach = sum(1 for node in waiting if index in student_days[node])
+                score = (min(reach, state.total_slots), state.total_slots)
+                if score > best_score:
+                    best_index, best_score = index, score
+            opened.append(best_index)
+            state = self.day_states[best_index]
+            solver.set_residual_capacity(state.through_edge, state.total_slots)
+            flow += solver.max_flow(source, sink, target - flow, deadline)
+
+        for index in sorted(opened, key=self._day_flow):
+            dropped = self._day_flow(index)
+            if solver.deadline_hit and dropped:
+                continue
+            snapshot = solver.capacities()
+            self._clear_day(index)
+            if solver.max_flow(source, sink, dropped, deadline) < dropped:
+                solver.restore_capacities(snapshot)
+            else:
+                opened.remove(index)
+
+        price = None
+        if not solver.deadline_hit:
+            opened, price = self._price_days(flow, empty)
+
+        for index in opened:
+            # The day's first lesson moves onto its (locked) open arc.
+            state = self.day_states[index]
+            used = self._day_flow(index)
+            solver.push(state.through_edge ^ 1)
+            solver.set_residual_capacity(state.through_edge, state.total_slots - used)
+            state.opened = True
+
+        solver.cost_scaling(deadline=deadline, price=price)
+
+        for state in self.day_states:
+            if not state.opened:
+                solver.set_residual_capacity(state.open_edge, 1)
+        for slot_id, (day_key, _start_time, _position) in self.slot_metadata.items():
+            if solver.residual_capacity(self.slot_edges[slot_id]) == 0:
+                self.day_states[self.day_index[day_key]].assignments_made += 1
+        return flow, self.objective_cost()
+
+    def _price_days(self, flow: int, empty: array) -> Tuple[List[int], List[int]]:
+        """Weigh the greedy days against days chosen by charging open costs per lesson.
+
+        The greedy pass only looks at reach, so it opens as few days as it can
+        even when another day's open cost is less than the gap cost it saves.
+        Dynamic slope scaling puts that trade-off into the flow itself: every
+        day's open cost is spread over its lessons as a per-lesson cost on its
+        throughput arc, first as if the day were full and then over the
+        lessons it took in the previous round, so a min-cost flow over all
+        days opens only those that pay. Each new set of days is re-priced at
+        its real cost, the rounds stop once a set repeats, and the cheapest
+        set, greedy included, is left routed in the network with its
+        ``cost_scaling`` prices.
+        """
+
+        solver = self.solver
+        price = solver.cost_scaling(deadline=self.deadline)
+        cost = self._routed_cost()
+        best = solver.capacities()
+        priced = {frozenset(index for index in range(len(self.day_states)) if self._day_flow(index))}
+        loads = [state.total_slots for state in self.day_states]
+        for _round in range(_DAY_PRICING_ROUNDS):
+            solver.restore_capacities(empty)
+            for index, state in enumerate(self.day_states):
+                open_cost = solver.edge_cost(state.open_edge)
+                solver.set_edge_cost(state.through_edge, -(-open_cost // loads[index]))
+                solver.set_residual_capacity(state.through_edge, state.total_slots)
+            solver.max_flow(self.source, self.sink, flow, self.deadline)
+            sloped = solver.cost_scaling(deadline=self.deadline)
+            for state in self.day_states:
+                solver.set_edge_cost(state.through_edge, 0)
+            if solver.deadline_hit:
+                break
+
+            loads = [self._day_flow(index) or loads[index] for index in range(len(self.day_states))]
+            days = frozenset(index for index in range(len(self.day_states)) if self._day_flow(index))
+            if days in priced:
+                break
+            priced.add(days)
+            for index in range(len(self.day_states)):
+                if index not in days:
+                    self._clear_day(index)
+            routed = solver.cost_scaling(deadline=self.deadline, price=sloped)
+            candidate = self._routed_cost()
+            if candidate < cost:
+                cost, price, best = candidate, routed, solver.capacities()
+
+        solver.restore_capacities(best)
+        return [index for index in range(len(self.day_states)) if self._day_flow(index)], price
+
+    def _routed_cost(self) -> int:
+        """Cost of the current flow, charging the open cost of every day that carries a lesson."""
+
+        solver = self.solver
+        cost = sum(
+            solver.edge_cost(state.open_edge)
+            for index, state in enumerate(self.day_states)
+            if self._day_flow(index)
+        )
+        return cost + sum(solver.edge_cost(edge) for edge in self.slot_edges if solver.residual_capacity(edge) == 0)
+
+    @property
+    def truncated(self) -> bool:
+        """Whether the last solve stopped at ``deadline`` rather than finishing."""
+
+        return self.solver.deadline_hit
+
+    def greedy_fill(self) -> int:
+        """Place still-unscheduled students one at a time on their cheapest free slot.
+
+        Used after a solve stopped at its deadline; a slot on a day that is not
+        open yet is charged the day's open cost. Returns how many were placed.
+        """
+
+        solver = self.solver
+        slots_by_student: Dict[int, List[int]] = defaultdict(list)
+        for slot_id, student_ids in self.slot_students.items():
+            for student_id in student_ids:
+                slots_by_student[student_id].append(slot_id)
+
+        placed = 0
+        for student_id in self.student_ids:
+            if solver.residual_capacity(self.sink_edges[student_id]) == 0:
+                continue
+            best_cost, best_slot = None, -1
+            for slot_id in slots_by_student[student_id]:
+                slot_edge = self.slot_edges[slot_id]
+                if solver.residual_capacity(slot_edge) == 0:
+                    continue
+                state = self.day_states[self.day_index[self.slot_metadata[slot_id][0]]]
+                cost = solver.edge_cost(slot_edge)
+                if not state.opened:
+                    cost += solver.edge_cost(state.open_edge)
+                if best_cost is None or cost < best_cost:
+                    best_cost, best_slot = cost, slot_id
+            if best_slot != -1 and self.assign(best_slot, student_id):
+                placed += 1
+        return placed
+
+    def objective_lower_bound(self, flow: int) -> int:
+        """A lower bound on the cost of any schedule placing ``flow`` students.
+
+        Open costs and gap costs are bounded separately: at least as many days
+        as it takes to hold ``flow`` lessons in the largest days, plus the
+        ``flow`` cheapest slot costs anywhere.
+        """
+
+        solver = self.solver
+        days_needed = 0
+        capacity = 0
+        for total_slots in sorted((state.total_slots for state in self.day_states), reverse=True):
+            if capacity >= flow:
+                break
+            capacity += total_slots
+            days_needed += 1
+        open_cost = min((solver.edge_cost(state.open_edge) for state in self.day_states), default=0)
+        slot_costs = sorted(solver.edge_cost(edge) for edge in self.slot_edges)
+        return days_needed * open_cost + sum(slot_costs[:flow])
+
+    def _day_flow(self, index: int) -> int:
+        return self.solver.residual_capacity(self.day_states[index].through_edge ^ 1)
+
+    def _clear_day(self, index: int) -> None:
+        """Withdraw every lesson routed through day ``index`` and close its arcs."""
+
+        solver = self.solver
+        state = self.day_states[index]
+        for slot_id, (day_key, _start_time, _position) in self.slot_metadata.items():
+            slot_edge = self.slot_edges[slot_id]
+            if self.day_index[day_key] != index or solver.residual_capacity(slot_edge):
+                continue
+            for edge in solver.forward_edges(self.first_slot_node + slot_id):
+                if solver.residual_capacity(edge) == 0:
+                    student_node = solver.edge_head(edge)
+                    student_id = self.student_ids[student_node - self.first_student_node]
+                    solver.push(edge ^ 1)
+                    solver.push(self.sink_edges[student_id] ^ 1)
+                    break
+            solver.push(slot_edge ^ 1)
+        solver.set_residual_capacity(state.through_edge, 0)
+        solver.set_residual_capacity(state.through_edge ^ 1, 0)
+
+    def assignments(self) -> Iterator[Tuple[int, int]]:
+        """Yield ``(slot_id, student_id)`` for every saturated slot -> student arc."""
+
+        for slot_node, person_node in self.solver.saturated_edges(_TAG_SLOT_STUDENT):
+            yield slot_node - self.first_slot_node, self.student_ids[person_node - self.first_student_node]
+
+    def assign(self, slot_id: int, student_id: int) -> bool:
+        """Route one unit of flow through ``slot_id`` to ``student_id`` if the arcs allow it."""
+
+        solver = self.solver
+        slot_node = self.first_slot_node + slot_id
+        slot_edge = self.slot_edges[slot_id]
+        student_edge = solver.find_edge(slot_node, self.student_nodes[student_id])
+        sink_edge = self.sink_edges[student_id]
+        if (
+            student_edge == -1
+            or solver.residual_capacity(slot_edge) == 0
+            or solver.residual_capacity(sink_edge) == 0
+        ):
+            return False
+
+        state = self.day_states[self.day_index[self.slot_metadata[slot_id][0]]]
+        if state.opened:
+            solver.push(state.through_edge)
+        else:
+            # Mirror successive_shortest_path: the first lesson pays for the day
+            # and unlocks the remaining slots through the throughput arc.
+            solver.push(state.open_edge)
+            solver.set_residual_capacity(state.open_edge ^ 1, 0)
+            solver.set_residual_capacity(state.through_edge, state.total_slots - 1)
+            state.opened = True
+        state.assignments_made += 1
+
+        solver.push(slot_edge)
+        solver.push(student_edge)
+        solver.push(sink_edge)
+        return True
+
+    def alternatives(self, count: int, max_searches: int) -> List[Tuple[int, List[Tuple[int, int]]]]:
+        """Return up to ``count`` other assignments of the solved flow, cheapest first.
+
+        Each candidate cancels one lesson of the current assignment by sending
+        a unit around the cheapest residual cycle through its reversed
+        slot -> student arc, so it schedules as many students and differs by
+        one chain of moves and swaps. At most ``max_searches`` lessons are
+        tried, tightest (smallest reduced cost to undo) first. Candidates are
+        deduplicated and priced by their actual days and slots, since a cycle
+        that empties a day does not pay back its open cost in the network.
+        """
+
+        solver = self.solver
+        snapshot = solver.capacities()
+        potential = solver.repair_potentials(self.source)
+        if solver.capacities() != snapshot:
+            # The flow was not min-cost after all; its cycles would not be alternatives.
+            solver.restore_capacities(snapshot)
+            return []
+
+        current = sorted(self.assignments())
+        undo_edges = []
+        for slot_id, student_id in current:
+            slot_node = self.first_slot_node + slot_id
+            student_node = self.student_nodes[student_id]
+            edge = solver.find_edge(slot_node, student_node) ^ 1
+            reduced = solver.edge_cost(edge) + potential[student_node] - potential[slot_node]
+            undo_edges.append((reduced, edge))
+        undo_edges.sort()
+
+        seen = {tuple(current)}
+        found: List[Tuple[int, List[Tuple[int, int]]]] = []
+        for _reduced, edge in undo_edges[:max_searches]:
+            cheapest = solver.cheapest_cycle(edge, potential)
+            if cheapest is None:
+                continue
+            for cycle_edge in cheapest[1]:
+                solver.push(cycle_edge)
+            candidate = sorted(self.assignments())
+            solver.restore_capacities(snapshot)
+            if tuple(candidate) in seen:
+                continue
+            seen.add(tuple(candidate))
+            found.append((self.assignment_cost(candidate), candidate))
+
+        found.sort()
+        return found[:count]
+
+    def assignment_cost(self, assignments: TypingIterable[Tuple[int, int]]) -> int:
+        """Objective cost of ``assignments``: each day used once, plus every slot's gap cost."""
+
+        solver = self.solver
+        days_used: Set[int] = set()
+        total = 0
+        for slot_id, _student_id in assignments:
+            index = self.day_index[self.slot_metadata[slot_id][0]]
+            if index not in days_used:
+                days_used.add(index)
+                total += solver.edge_cost(self.day_states[index].open_edge)
+            total += solver.edge_cost(self.slot_edges[slot_id])
+        return total
+
+    def objective_cost(self) -> int:
+        solver = self.solver
+        total = 0
+        for state in self.day_states:
+            if state.opened:
+                total += solver.edge_cost(state.open_edge)
+        for edge in self.slot_edges:
+            if solver.residual_capacity(edge) == 0:
+                total += solver.edge_cost(edge)
+        return total
+
+    def node_keys(self) -> Iterator[Tuple[Tuple, int]]:
+        """Yield a key that identifies each node across rebuilds of the network."""
+
+        yield ("source",), self.source
+        yield ("sink",), self.sink
+        for index, day_key in enumerate(self.day_keys):
+            yield ("day", day_key), self.first_day_node + index
+        for slot_id, (_day_key, start_time, _position) in self.slot_metadata.items():
+            yield ("slot", start_time), self.first_slot_node + slot_id
+        for student_id, node in self.student_nodes.items():
+            yield ("student", student_id), node
+
+
+SolverEngine = Callable[[_FlowNetwork, int], Tuple[int, int]]
+
+
+def _solve_successive_shortest_path(network: _FlowNetwork, target_flow: int) -> Tuple[int, int]:
+    return network.solve(target_flow)
+
+
+def _solve_cost_scaling(network: _FlowNetwork, target_flow: int) -> Tuple[int, int]:
+    return network.solve_cost_scaling(target_flow)
+
+
+_SOLVER_ENGINES: Dict[str, SolverEngine] = {
+    "ssp": _solve_successive_shortest_path,
+    "cost_scaling": _solve_cost_scaling,
+}
+_AUTO_ENGINE = "auto"
+# Schedules each student's own lesson length on a shared timeline (see
+# ``interval_engine``); it needs no flow network, so it is not registered.
+_INTERVAL_ENGINE = "interval"
+# With no day-open cost a lesson's cost is its slot's alone, so the solve is
+# a plain assignment problem (see ``_solve_assignment``); not registered either.
+_ASSIGNMENT_ENGINE = "assignment"
+
+
+def register_solver_engine(name: str, engine: SolverEngine) -> None:
+    """Make ``engine`` selectable as ``schedule_service.generate_schedule(..., engine=name)``.
+
+    An engine receives the built ``_FlowNetwork`` and the number of students
+    to place, must leave the chosen lessons as saturated slot -> student arcs
+    with ``day_states`` updated, and returns ``(scheduled_count, objective_cost)``.
+    """
+
+    if not name or name in (_AUTO_ENGINE, _INTERVAL_ENGINE, _ASSIGNMENT_ENGINE):
+        raise ValueError(f"Invalid solver engine name: {name!r}")
+    _SOLVER_ENGINES[name] = engine
+
+
+def solver_engine_names() -> List[str]:
+    return sorted([*_SOLVER_ENGINES, _INTERVAL_ENGINE, _ASSIGNMENT_ENGINE])
+
+
+# Each alternative schedule may cost one residual-cycle search per this many
+# lessons tried.
+_ALTERNATIVE_SEARCHES_PER_SCHEDULE = 16
+
+
+@dataclass
+class _SubProblem:
+    """One independent block of the slot/student graph, with slot ids renumbered from 0."""
+
+    day_slot_map: Dict[date, List[int]]
+    slot_metadata: Dict[int, Tuple[date, datetime, int]]
+    slot_students: Dict[int, List[int]]
+    student_ids: List[int]
+    slot_ids: List[int]
+    # Days presolve already opened, and the exact max flow when presolve knows it.
+    open_days: Set[date] = field(default_factory=set)
+    target_flow: Optional[int] = None
+
+    @property
+    def arc_count(self) -> int:
+        return sum(len(students) for students in self.slot_students.values())
+
+
+def _split_components(
+    day_slot_map: Dict[date, List[int]],
+    slot_metadata: Dict[int, Tuple[date, datetime, int]],
+    slot_students: Dict[int, List[int]],
+    student_ids: Sequence[int],
+) -> List[_SubProblem]:
+    """Partition the candidate slots into sub-problems that can be solved on their own.
+
+    Slots join their day and every student who can take them, so two
+    sub-problems never share a student or a day: a shared day would couple
+    their day-open costs. Sub-problems keep the day, slot and student order
+    of the whole problem, and students that can take no slot belong to none.
+    """
+
+    parent: Dict[Tuple, Tuple] = {}
+
+    def find(key: Tuple) -> Tuple:
+        parent.setdefault(key, key)
+        root = key
+        while parent[root] != root:
+            root = parent[root]
+        while parent[key] != root:
+            parent[key], key = root, parent[key]
+        return root
+
+    for day_key, slot_ids in day_slot_map.items():
+        day_root = find(("day", day_key))
+        for slot_id in slot_ids:
+            for student_id in slot_students[slot_id]:
+                student_root = find(("student", student_id))
+                if student_root != day_root:
+                    parent[student_root] = day_root
+
+    problems: Dict[Tuple, _SubProblem] = {}
+    for day_key, slot_ids in day_slot_map.items():
+        root = find(("day", day_key))
+        problem = problems.get(root)
+        if problem is None:
+            problem = problems[root] = _SubProblem({}, {}, {}, [], [])
+        local_slots: List[int] = []
+        for slot_id in slot_ids:
+            local_id = len(problem.slot_ids)
+            problem.slot_ids.append(slot_id)
+            problem.slot_metadata[local_id] = slot_metadata[slot_id]
+            problem.slot_students[local_id] = slot_students[slot_id]
+            local_slots.append(local_id)
+        problem.day_slot_map[day_key] = local_slots
+
+    for student_id in student_ids:
+        key = ("student", student_id)
+        if key in parent:
+            problems[find(key)].student_ids.append(student_id)
+
+    return list(problems.values())
+
+
+@dataclass
+class _SubSolution:
+    flow: int
+    cost: int
+    assignments: List[Tuple[int, int]]
+    stats: Dict[str, object]
+    truncated: bool = False
+    lower_bound: Optional[int] = None
+    alternatives: List[Tuple[int, List[Tuple[int, int]]]] = field(default_factory=list)
+    # False when the solve finished without proving its schedule optimal.
+    optimal: bool = True
+
+
+def _finish_truncated(network: _FlowNetwork, flow: int, total_cost: int) -> Tuple[int, int, Optional[int]]:
+    """Complete a solve that may have stopped at its deadline.
+
+    Returns the flow, its cost, and a lower bound on the optimal cost (the
+    cost itself when the solve finished). A stopped solve is completed with
+    ``greedy_fill``; its bound is only known when every student the network
+    can hold got placed, since the optimum then places as many.
+    """
+
+    if not network.truncated:
+        return flow, total_cost, total_cost
+    flow += network.greedy_fill()
+    total_cost = network.objective_cost()
+    if flow < network.max_flow_bound:
+        return flow, total_cost, None
+    return flow, total_cost, network.objective_lower_bound(flow)
+
+
+def _network_stats(network: _FlowNetwork, build_seconds: float, solve_seconds: float) -> Dict[str, object]:
+    return {
+        "nodes": network.solver.node_count,
+        "edges": network.solver.edge_count,
+        "build_seconds": build_seconds,
+        "solve_seconds": solve_seconds,
+        "counters": dict(network.solver.counters),
+    }
+
+
+def _solve_sub_problem(
+    problem: _SubProblem,
+    day_open_cost: int,
+    gap_penalty: int,
+    engine_name: str,
+    deadline: Optional[float] = None,
+    alternatives: int = 0,
+) -> _SubSolution:
+    """Solve one sub-problem; assignments come back in whole-problem slot ids.
+
+    Module-level so a process pool can pickle it by reference. ``deadline``
+    is a ``time.monotonic()`` value, which is system-wide on the platforms
+    the pool forks or spawns on, so workers honour the caller's deadline.
+    ``alternatives`` asks for that many other assignments as well (see
+    ``_FlowNetwork.alternatives``).
+    """
+
+    if engine_name == _ASSIGNMENT_ENGINE:
+        return _solve_assignment(problem, gap_penalty, deadline)
+    started = time.perf_counter()
+    network = _FlowNetwork(
+        problem.day_slot_map,
+        problem.slot_metadata,
+        problem.slot_students,
+        problem.student_ids,
+        day_open_cost,
+        gap_penalty,
+        problem.open_days,
+    )
+    network.deadline = deadline
+    return _run_engine(problem, network, engine_name, time.perf_counter() - started, alternatives)
+
+
+def _solve_assignment(problem: _SubProblem, gap_penalty: int, deadline: Optional[float]) -> _SubSolution:
+    """Solve a sub-problem whose days cost nothing to open, with no flow network.
+
+    Each slot then costs ``gap_penalty * position ** 2`` whoever takes it, so
+    the cheapest maximum schedule is a cheapest maximum slot/student
+    matching (see ``matching.cheapest_maximum_matching``). Slots of a day
+    never overlap, so any matching is a valid schedule.
+    """
+
+    started = time.perf_counter()
+    student_row = {student_id: row for row, student_id in enumerate(problem.student_ids)}
+    slot_count = len(problem.slot_ids)
+    adjacency = [[student_row[student_id] for student_id in problem.slot_students[slot]] for slot in range(slot_count)]
+    costs = [gap_penalty * problem.slot_metadata[slot][2] ** 2 for slot in range(slot_count)]
+    built = time.perf_counter()
+    flow, match, truncated = matching.cheapest_maximum_matching(adjacency, costs, len(problem.student_ids), deadline)
+    cost = sum(costs[slot] for slot, row in enumerate(match) if row != -1)
+    return _SubSolution(
+        flow=flow,
+        cost=cost,
+        assignments=[
+            (problem.slot_ids[slot], problem.student_ids[row]) for slot, row in enumerate(match) if row != -1
+        ],
+        stats={
+            "nodes": slot_count + len(problem.student_ids),
+            "edges": sum(len(students) for students in adjacency),
+            "build_seconds": built - started,
+            "solve_seconds": time.perf_counter() - built,
+            "counters": {},
+        },
+        truncated=truncated,
+        lower_bound=None if truncated else cost,
+    )
+
+
+def _run_engine(
+    problem: _SubProblem,
+    network: _FlowNetwork,
+    engine_name: str,
+    build_seconds: float,
+    alternatives: int = 0,
+) -> _SubSolution:
+    built = time.perf_counter()
+    target_flow = len(problem.student_ids)
+    if problem.target_flow is not None:
+        target_flow = network.max_flow_bound = problem.target_flow
+        network.max_flow_exact = True
+    flow, total_cost = _SOLVER_ENGINES[engine_name](network, target_flow)
+    flow, total_cost, lower_bound = _finish_truncated(network, flow, total_cost)
+    others = []
+    if alternatives and not network.truncated:
+        others = network.alternatives(alternatives, alternatives * _ALTERNATIVE_SEARCHES_PER_SCHEDULE)
+    solved = time.perf_counter()
+    return _SubSolution(
+        flow=flow,
+        cost=total_cost,
+        assignments=[(problem.slot_ids[slot_id], student_id) for slot_id, student_id in network.assignments()],
+        stats=_network_stats(network, build_seconds, solved - built),
+        truncated=network.truncated,
+        lower_bound=lower_bound,
+        alternatives=[
+            (cost, [(problem.slot_ids[slot_id], student_id) for slot_id, student_id in assignment])
+            for cost, assignment in others
+        ],
+    )
+
+
+class _AvailabilityMatrix:
+    """Boolean students x time-index availability matrix, stored by column.
+
+    Each schedule day keeps its sorted distinct teacher start times, and the
+    column for ``(day, index)`` is an int bitset whose bit ``row`` is set when
+    ``student_ids[row]`` is available at that start time. Testing whether
+    anyone is free, counting candidates and listing them are then whole-word
+    bit operations instead of per-student set lookups.
+    """
+
+    def __init__(
+        self,
+        student_ids: Sequence[int],
+        times: Dict[date, List[datetime]],
+        columns: Dict[date, List[int]],
+    ):
+        self.student_ids = student_ids
+        self.times = times
+        self.columns = columns
+
+    @classmethod
+    def build(
+        cls,
+        teacher_slots: Dict[date, List[datetime]],
+        student_slots: Dict[int, Set[datetime]],
+        student_ids: Sequence[int],
+        schedule_days: Set[date],
+    ) -> "_AvailabilityMatrix":
+        times: Dict[date, List[datetime]] = {}
+        columns: Dict[date, List[int]] = {}
+        time_index: Dict[datetime, Tuple[date, int]] = {}
+
+        for day_key in sorted(teacher_slots.keys()):
+            if schedule_days and day_key not in schedule_days:
+                continue
+            day_times = sorted(set(teacher_slots[day_key]))
+            times[day_key] = day_times
+            columns[day_key] = [0] * len(day_times)
+            for index, start_time in enumerate(day_times):
+                time_index[start_time] = (day_key, index)
+
+        for row, student_id in enumerate(student_ids):
+            bit = 1 << row
+            for start_time in student_slots.get(student_id, ()):
+                location = time_index.get(start_time)
+                if location is not None:
+                    day_key, index = location
+                    columns[day_key][index] |= bit
+
+        return cls(student_ids, times, columns)
+
+    def students_at(self, day_key: date, index: int) -> List[int]:
+        student_ids = self.student_ids
+        mask = self.columns[day_key][index]
+        available: List[int] = []
+        while mask:
+            low_bit = mask & -mask
+            available.append(student_ids[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return available
+
+
+def _build_candidate_slots(
+    matrix: _AvailabilityMatrix,
+    slot_duration: timedelta,
+) -> Tuple[Dict[date, List[int]], Dict[int, Tuple[date, datetime, int]], Dict[int, List[int]]]:
+    day_slot_map: Dict[date, List[int]] = {}
+    slot_metadata: Dict[int, Tuple[date, datetime, int]] = {}
+    slot_students: Dict[int, List[int]] = {}
+    slot_counter = 0
+
+    for day_key, teacher_times in matrix.times.items():
+        columns = matrix.columns[day_key]
+        day_slots: List[int] = []
+        next_available_time: Optional[datetime] = None
+
+        for index, start_time in enumerate(teacher_times):
+            if not columns[index]:
+                continue
+
+            if next_available_time is not None and start_time < next_available_time:
+                continue
+
+            slot_id = slot_counter
+            slot_counter += 1
+            slot_metadata[slot_id] = (day_key, start_time, len(day_slots))
+            slot_students[slot_id] = matrix.students_at(day_key, index)
+            day_slots.append(slot_id)
+            next_available_time = start_time + slot_duration
+
+        if day_slots:
+            day_slot_map[day_key] = day_slots
+
+    return day_slot_map, slot_metadata, slot_students
+
+
+def _parse_schedule_days(days_raw: Optional[TypingIterable] = None) -> Set[date]:
+    if not days_raw:
+        return set()
+
+    if isinstance(days_raw, (list, tuple, set)):
+        values: TypingIterable = days_raw
+    else:
+        try:
+            decoded = json.loads(days_raw)
+            if isinstance(decoded, list):
+                values = decoded
+            else:
+                values = str(days_raw).split(",")
+        except (json.JSONDecodeError, TypeError):
+            values = str(days_raw).split(",")
+
+    parsed: Set[date] = set()
+    for value in values:
+        if value is None:
+            continue
+        parsed.add(_coerce_date(value))
+    return parsed
+
+
+def _coerce_date(value) -> date:
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(str(value)).date()
+
+
+# How generate picks candidate start times: "greedy" keeps the flow model's
+# slots, "all" keeps every teacher start and leaves overlaps to the model.
+_CANDIDATE_STARTS = ("greedy", "all")
+
+
+def _resolve_engine(
+    engine: Optional[str],
+    incremental: bool,
+    assignment: bool = False,
+) -> str:
+    """Name the engine to run; ``assignment`` says the solve is a plain assignment problem."""
+
+    if engine is None or engine == _AUTO_ENGINE:
+        # cost_scaling is only run by name: pricing its days costs it the
+        # speed it had over ssp.
+        return _ASSIGNMENT_ENGINE if assignment and not incremental else "ssp"
+    if engine not in _SOLVER_ENGINES and engine not in (_INTERVAL_ENGINE, _ASSIGNMENT_ENGINE):
+        raise ValueError(
+            f"Unknown solver engine {engine!r}; expected one of: {', '.join(solver_engine_names())}"
+        )
+    if incremental and engine != "ssp":
+        raise ValueError("incremental generation is only supported by the ssp engine")
+    if engine == _ASSIGNMENT_ENGINE and not assignment:
+        raise ValueError("the assignment engine needs day_open_cost=0 and k=1")
+    return engine
+
+
+@dataclass
+class _WarmStart:
+    """What an incremental generate keeps from the previous solve of a schedule."""
+
+    parameters: Tuple[int, int, int, int]
+    assignments: Dict[int, datetime]
+    potentials: Dict[Tuple, int]
+
+
+_WARM_START_LIMIT = 64
+_warm_starts: "OrderedDict[int, _WarmStart]" = OrderedDict()
+_warm_starts_lock = threading.Lock()
+
+
+def _solve_incremental(
+    schedule_id: int,
+    parameters: Tuple[int, int, int, int],
+    network: _FlowNetwork,
+    target_flow: int,
+) -> Tuple[int, int]:
+    """Re-solve ``network`` starting from the previous assignment of the schedule.
+
+    Assignments that are still possible in the rebuilt network are routed
+    straight back in, so only students whose slot disappeared (or who were
+    unscheduled) need augmenting paths. The previous potentials are reused
+    when they still certify the carried-over flow; otherwise they are
+    repaired with one label-correcting pass before augmenting.
+    """
+
+    with _warm_starts_lock:
+        previous = _warm_starts.get(schedule_id)
+
+    if previous is None or previous.parameters != parameters:
+        flow, total_cost = network.solve(target_flow)
+    else:
+        slot_by_start = {
+            start_time: slot_id for slot_id, (_day_key, start_time, _position) in network.slot_metadata.items()
+        }
+        carried = 0
+        for student_id, start_time in previous.assignments.items():
+            slot_id = slot_by_start.get(start_time)
+            if student_id in network.student_nodes and slot_id is not None:
+                carried += network.assign(slot_id, student_id)
+
+        potential: Optional[List[int]] = [0] * network.solver.node_count
+        for key, node in network.node_keys():
+            if key not in previous.potentials:
+                potential = None
+                break
+            potential[node] = previous.potentials[key]
+
+        if potential is None or not network.solver.reduced_costs_valid(potential):
+            potential = network.solver.repair_potentials(network.source)
+
+        flow, _cost = network.solve(target_flow - carried, potential)
+        flow += carried
+        total_cost = network.objective_cost()
+
+    if network.truncated:
+        # A flow cut short is no min-cost flow for the next solve to start from.
+        return flow, total_cost
+
+    snapshot = _WarmStart(
+        parameters=parameters,
+        assignments={
+            student_id: network.slot_metadata[slot_id][1] for slot_id, student_id in network.assignments()
+        },
+        potentials={key: network.solver.potential[node] for key, node in network.node_keys()},
+    )
+    with _warm_starts_lock:
+        _warm_starts[schedule_id] = snapshot
+        _warm_starts.move_to_end(schedule_id)
+        while len(_warm_starts) > _WARM_START_LIMIT:
+            _warm_starts.popitem(last=False)
+
+    return flow, total_cost
+
+
+@dataclass
+class _Presolve:
+    """The candidate graph left after presolve, and what presolve settled itself.
+
+    ``problem`` keeps the remaining slots (renumbered from 0, with
+    ``slot_ids`` pointing back at the whole problem) and students. ``forced``
+    holds whole-problem ``(slot_id, student_id)`` lessons, ``open_days`` the
+    days they open, and ``matched`` the students of one maximum matching of
+    ``problem``, so ``len(matched)`` is exactly the flow still to route.
+    """
+
+    problem: _SubProblem
+    forced: List[Tuple[int, int]]
+    open_days: Set[date]
+    matched: Set[int]
+    stats: Dict[str, int]
+
+    def whole(self) -> _SubProblem:
+        problem = self.problem
+        problem.open_days = set(self.open_days)
+        problem.target_flow = len(self.matched)
+        return problem
+
+    def components(self) -> List[_SubProblem]:
+        remaining = self.problem
+        problems = _split_components(
+            remaining.day_slot_map,
+            remaining.slot_metadata,
+            remaining.slot_students,
+            remaining.student_ids,
+        )
+        for problem in problems:
+            problem.slot_ids = [remaining.slot_ids[slot_id] for slot_id in problem.slot_ids]
+            problem.open_days = {day_key for day_key in problem.day_slot_map if day_key in self.open_days}
+            problem.target_flow = sum(1 for student_id in problem.student_ids if student_id in self.matched)
+        return problems
+
+    def fixed_cost(
+        self,
+        slot_metadata: Dict[int, Tuple[date, datetime, int]],
+        day_open_cost: int,
+        gap_penalty: int,
+    ) -> int:
+        """What the forced lessons cost: their days' open costs and their slots' gap costs."""
+
+        positions = sum(slot_metadata[slot_id][2] ** 2 for slot_id, _student_id in self.forced)
+        return day_open_cost * len(self.open_days) + gap_penalty * positions
+
+    def complete(self, solution: _SubSolution, fixed_cost: int) -> _SubSolution:
+        """Add the forced lessons back into a solution of ``problem``."""
+
+        return _SubSolution(
+            flow=solution.flow + len(self.forced),
+            cost=solution.cost + fixed_cost,
+            assignments=solution.assignments + self.forced,
+            stats=solution.stats,
+            truncated=solution.truncated,
+            lower_bound=None if solution.lower_bound is None else solution.lower_bound + fixed_cost,
+            alternatives=[
+                (cost + fixed_cost, assignment + self.forced) for cost, assignment in solution.alternatives
+            ],
+            optimal=solution.optimal,
+        )
+
+
+def _presolve(
+    day_slot_map: Dict[date, List[int]],
+    slot_metadata: Dict[int, Tuple[date, datetime, int]],
+    slot_students: Dict[int, List[int]],
+    student_ids: Sequence[int],
+) -> _Presolve:
+    """Shrink the candidate graph before any min-cost search runs.
+
+    A student with a single candidate slot is given it: some min-cost
+    maximum flow always does (if another student held the slot, swapping
+    them keeps the flow and the cost), and fixing it can leave other
+    students with a single slot in turn. Students left with no slot cannot
+    be scheduled, and slots left with no student are dropped. A
+    Hopcroft-Karp matching of what remains then gives the exact flow to
+    route, so no search is spent proving that the rest cannot be placed.
+    """
+
+    candidates: Dict[int, Set[int]] = {student_id: set() for student_id in student_ids}
+    for slot_id, students in slot_students.items():
+        for student_id in students:
+            candidates[student_id].add(slot_id)
+
+    forced: List[Tuple[int, int]] = []
+    fixed: Set[int] = set()
+    taken: Set[int] = set()
+    queue = deque(student_id for student_id in student_ids if len(candidates[student_id]) == 1)
+    while queue:
+        student_id = queue.popleft()
+        if student_id in fixed or len(candidates[student_id]) != 1:
+            continue
+        slot_id = candidates[student_id].pop()
+        forced.append((slot_id, student_id))
+        fixed.add(student_id)
+        taken.add(slot_id)
+        for other_id in slot_students[slot_id]:
+            if other_id not in fixed:
+                candidates[other_id].discard(slot_id)
+                if len(candidates[other_id]) == 1:
+                    queue.append(other_id)
+
+    remaining_students = [
+        student_id for student_id in student_ids if student_id not in fixed and candidates[student_id]
+    ]
+    remaining = set(remaining_students)
+    problem = _SubProblem({}, {}, {}, remaining_students, [])
+    for day_key, slot_ids in day_slot_map.items():
+        local_slots: List[int] = []
+        for slot_id in slot_ids:
+            students = [student_id for student_id in slot_students[slot_id] if student_id in remaining]
+            if slot_id in taken or not students:
+                continue
+            local_id = len(problem.slot_ids)
+            problem.slot_ids.append(slot_id)
+            problem.slot_metadata[local_id] = slot_metadata[slot_id]
+            problem.slot_students[local_id] = students
+            local_slots.append(local_id)
+        if local_slots:
+            problem.day_slot_map[day_key] = local_slots
+
+    adjacency: List[List[int]] = [[] for _ in remaining_students]
+    row = {student_id: index for index, student_id in enumerate(remaining_students)}
+    for local_id, students in problem.slot_students.items():
+        for student_id in students:
+            adjacency[row[student_id]].append(local_id)
+    matched_count, match = matching.hopcroft_karp(adjacency, len(problem.slot_ids))
+    matched = {student_id for student_id, slot in zip(remaining_students, match) if slot != -1}
+
+    return _Presolve(
+        problem=problem,
+        forced=forced,
+        open_days={slot_metadata[slot_id][0] for slot_id, _student_id in forced},
+        matched=matched,
+        stats={
+            "students": len(student_ids),
+            "slots": len(slot_metadata),
+            "forced": len(forced),
+            "unschedulable": len(student_ids) - len(fixed) - len(remaining_students),
+            "dropped_slots": len(slot_metadata) - len(taken) - len(problem.slot_ids),
+            "max_scheduled": len(forced) + matched_count,
+            "remaining_students": len(remaining_students),
+            "remaining_slots": len(problem.slot_ids),
+        },
+    )
+
+
+# Sub-problems only go to the process pool when there is enough work to pay
+# for pickling them across.
+_PARALLEL_MIN_ARCS = 4_000
+_component_workers = min(4, os.cpu_count() or 1)
+_component_context: Optional[BaseContext] = None
+_component_pool: Optional[ProcessPoolExecutor] = None
+_component_pool_lock = threading.Lock()
+
+
+def configure_component_pool(max_workers: int, mp_context: Optional[BaseContext] = None) -> None:
+    """Set how many worker processes solve independent sub-problems (``<= 1`` solves in-process)."""
+
+    global _component_workers, _component_context, _component_pool
+    with _component_pool_lock:
+        if _component_pool is not None:
+            _component_pool.shutdown(wait=False)
+        _component_workers = max_workers
+        _component_context = mp_context
+        _component_pool = None
+
+
+def _get_component_pool() -> ProcessPoolExecutor:
+    global _component_pool
+    with _component_pool_lock:
+        if _component_pool is None:
+            _component_pool = ProcessPoolExecutor(max_workers=_component_workers, mp_context=_component_context)
+        return _component_pool
+
+
+def _solve_components(
+    problems: Sequence[_SubProblem],
+    day_open_cost: int,
+    gap_penalty: int,
+    engine_name: str,
+    diag: solver_diagnostics.GenerateDiagnostics,
+    deadline: Optional[float] = None,
+) -> _SubSolution:
+    """Solve every sub-problem and merge the results in sub-problem order.
+
+    Each sub-problem is solved the same way in a worker as in-process, so the
+    merged result does not depend on whether the pool was used (unless a
+    ``deadline`` cuts the solves short). The merged lower bound is only
+    known when every sub-problem's is.
+    """
+
+    solved = _solve_sub_problems(problems, day_open_cost, gap_penalty, engine_name, deadline)
+    for solution in solved:
+        diag.add_network(solution.stats)
+    return _merge_solutions(solved)
+
+
+def _solve_sub_problems(
+    problems: Sequence[_SubProblem],
+    day_open_cost: int,
+    gap_penalty: int,
+    engine_name: str,
+    deadline: Optional[float] = None,
+) -> List[_SubSolution]:
+    """Solve each sub-problem, in the process pool when they are worth shipping there."""
+
+    parallel = (
+        _component_workers > 1
+        and len(problems) > 1
+        and sum(problem.arc_count for problem in problems) >= _PARALLEL_MIN_ARCS
+    )
+    if parallel:
+        pool = _get_component_pool()
+        try:
+            futures = [
+                pool.submit(_solve_sub_problem, problem, day_open_cost, gap_penalty, engine_name, deadline)
+                for problem in problems
+            ]
+            return [future.result() for future in futures]
+        except BrokenProcessPool:
+            configure_component_pool(_component_workers, _component_context)
+    return [_solve_sub_problem(problem, day_open_cost, gap_penalty, engine_name, deadline) for problem in problems]
+
+
+def _merge_solutions(solved: Sequence[_SubSolution]) -> _SubSolution:
+    merged = _SubSolution(flow=0, cost=0, assignments=[], stats={}, lower_bound=0)
+    for solution in solved:
+        merged.flow += solution.flow
+        merged.cost += solution.cost
+        merged.assignments.extend(solution.assignments)
+        merged.truncated = merged.truncated or solution.truncated
+        merged.optimal = merged.optimal and solution.optimal
+        if merged.lower_bound is not None and solution.lower_bound is not None:
+            merged.lower_bound += solution.lower_bound
+        else:
+            merged.lower_bound = None
+    return merged
+
+
+# Day subsets the exact search evaluates per component, and seconds it
+# spends in all, before it settles for its best schedule so far. generate
+# runs inside the HTTP worker, so the search gets a wall-clock bound even
+# without a time_budget_ms.
+_DAY_SEARCH_MAX_NODES = 2_000
+_DAY_SEARCH_MAX_SECONDS = 1.0
+
+
+def _solve_exact_days(
+    problems: Sequence[_SubProblem],
+    slot_metadata: Dict[int, Tuple[date, datetime, int]],
+    day_open_cost: int,
+    gap_penalty: int,
+    engine_name: str,
+    diag: solver_diagnostics.GenerateDiagnostics,
+    deadline: Optional[float] = None,
+) -> _SubSolution:
+    """Solve each component, then search its day subsets for the cheapest schedule.
+
+    The engines open days as augmenting paths first need them, which can
+    open more days than necessary when ``day_open_cost`` dominates; their
+    schedules only seed ``_day_branch_and_bound``. Once days are fixed, no
+    day-open decision is left, so a subset is evaluated with
+    ``day_open_cost`` 0, where the assignment engine is exact and many times
+    faster than a flow network. The search over all components stops after
+    ``_DAY_SEARCH_MAX_SECONDS``.
+    """
+
+    incumbents = _solve_sub_problems(problems, day_open_cost, gap_penalty, engine_name, deadline)
+    for incumbent in incumbents:
+        diag.add_network(incumbent.stats)
+    search_deadline = time.monotonic() + _DAY_SEARCH_MAX_SECONDS
+    return _merge_solutions(
+        [
+            _day_branch_and_bound(
+                problem, incumbent, slot_metadata, day_open_cost, gap_penalty, diag, deadline, search_deadline
+            )
+            for problem, incumbent in zip(problems, incumbents)
+        ]
+    )
+
+
+def _day_branch_and_bound(
+    problem: _SubProblem,
+    incumbent: _SubSolution,
+    slot_metadata: Dict[int, Tuple[date, datetime, int]],
+    day_open_cost: int,
+    gap_penalty: int,
+    diag: solver_diagnostics.GenerateDiagnostics,
+    deadline: Optional[float],
+    search_deadline: float,
+) -> _SubSolution:
+    """Best-first search over which of ``problem``'s days to open.
+
+    A node fixes some days open and some closed. Evaluating it solves the
+    schedule on every day it has not closed, which must still place the
+    component's maximum number of students, and gives a lower bound: that
+    schedule's slot cost plus the open cost of the fewest days whose slots
+    can hold that many students, counting the days fixed open. The
+    evaluated schedule is also a candidate incumbent. Nodes are evaluated
+    in batches, one sub-problem each, so the component pool runs them in
+    parallel. Days presolve already opened cost nothing more. The result is
+    ``optimal: False`` when the node limit or ``search_deadline`` ends the
+    search first, and ``truncated`` when the caller's ``deadline`` does.
+    """
+
+    free_days = problem.open_days
+    target = len(problem.student_ids) if problem.target_flow is None else problem.target_flow
+    capacity = {day_key: len(slots) for day_key, slots in problem.day_slot_map.items()}
+    days = sorted(problem.day_slot_map)
+
+    def schedule_cost(assignments: Sequence[Tuple[int, int]]) -> int:
+        used = {slot_metadata[slot_id][0] for slot_id, _student_id in assignments}
+        positions = sum(slot_metadata[slot_id][2] ** 2 for slot_id, _student_id in assignments)
+        return day_open_cost * len(used - free_days) + gap_penalty * positions
+
+    def paid_days(included: Set[date], allowed: Collection[date]) -> Optional[int]:
+        held = sum(capacity[day_key] for day_key in allowed if day_key in included or day_key in free_days)
+        paid = len(included - free_days)
+        extra = sorted(
+            (capacity[day_key] for day_key in allowed if day_key not in included and day_key not in free_days),
+            reverse=True,
+        )
+        for slots in extra:
+            if held >= target:
+                break
+            held += slots
+            paid += 1
+        return paid if held >= target else None
+
+    best = incumbent
+    best_cost = schedule_cost(incumbent.assignments) if incumbent.flow >= target else float("inf")
+    frontier: List[Tuple[float, int, frozenset, frozenset]] = [(0, 0, frozenset(), frozenset())]
+    pushed = 1
+    evaluated = 0
+    stopped = truncated = False
+    while frontier and frontier[0][0] < best_cost:
+        if evaluated >= _DAY_SEARCH_MAX_NODES or time.monotonic() >= search_deadline:
+            stopped = True
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            stopped = truncated = True
+            break
+        batch = []
+        while frontier and frontier[0][0] < best_cost and len(batch) < max(1, _component_workers):
+            batch.append(heapq.heappop(frontier))
+        windows = [
+            _window_problem(
+                [day_key for day_key in days if day_key not in excluded],
+                problem.day_slot_map,
+                problem.slot_metadata,
+                problem.slot_students,
+                problem.student_ids,
+            )
+            for _bound, _order, _included, excluded in batch
+        ]
+        solutions = _solve_sub_problems(windows, 0, gap_penalty, _ASSIGNMENT_ENGINE, deadline)
+        evaluated += len(batch)
+        for (_bound, _order, included, excluded), window, solution in zip(batch, windows, solutions):
+            if solution.truncated:
+                # Its bound is unknown, so the search can no longer prove anything.
+                stopped = truncated = True
+                continue
+            if solution.flow < target:
+                continue
+            assignments = [(problem.slot_ids[slot_id], student_id) for slot_id, student_id in solution.assignments]
+            cost = schedule_cost(assignments)
+            if cost < best_cost:
+                best = _SubSolution(flow=solution.flow, cost=cost, assignments=assignments, stats={})
+                best_cost = cost
+            allowed = list(window.day_slot_map)
+            paid = paid_days(set(included), allowed)
+            if paid is None:
+                continue
+            bound = day_open_cost * paid + solution.cost
+            undecided = [day_key for day_key in allowed if day_key not in included and day_key not in free_days]
+            if bound >= best_cost or not undecided:
+                continue
+            # Branch on the day the evaluated schedule leans on least, closing it first.
+            load = Counter(slot_metadata[slot_id][0] for slot_id, _student_id in assignments)
+            day_key = min(undecided, key=lambda day: (load[day], day))
+            heapq.heappush(frontier, (bound, pushed, included, excluded | {day_key}))
+            heapq.heappush(frontier, (bound, pushed + 1, included | {day_key}, excluded))
+            pushed += 2
+    diag.counters["day_subsets_evaluated"] += evaluated
+
+    lower_bound: Optional[int] = best_cost if not stopped else None
+    if stopped and not truncated:
+        lower_bound = int(min([best_cost, *(node[0] for node in frontier)]))
+    return _SubSolution(
+        flow=best.flow,
+        cost=best_cost if best is not incumbent else incumbent.cost,
+        assignments=best.assignments,
+        stats={},
+        truncated=truncated,
+        lower_bound=lower_bound,
+        optimal=not stopped,
+    )
+
+
+def _solve_sweep_chunk(
+    problems: Sequence[_SubProblem],
+    weights: Sequence[Tuple[int, int]],
+    engine_name: str,
+) -> List[List[_SubSolution]]:
+    """Solve every sub-problem under each ``(day_open_cost, gap_penalty)`` pair.
+
+    Each sub-problem's network is built once and re-weighted between pairs.
+    Returns one list of sub-solutions per pair. Module-level for the pool.
+    """
+
+    solved: List[List[_SubSolution]] = [[] for _ in weights]
+    for problem in problems:
+        network: Optional[_FlowNetwork] = None
+        for index, (day_open_cost, gap_penalty) in enumerate(weights):
+            started = time.perf_counter()
+            if network is None:
+                network = _FlowNetwork(
+                    problem.day_slot_map,
+                    problem.slot_metadata,
+                    problem.slot_students,
+                    problem.student_ids,
+                    day_open_cost,
+                    gap_penalty,
+                    problem.open_days,
+                )
+            else:
+                network.reweight(day_open_cost, gap_penalty)
+            solved[index].append(_run_engine(problem, network, engine_name, time.perf_counter() - started))
+    return solved
+
+
+def _solve_sweep(
+    problems: Sequence[_SubProblem],
+    weights: Sequence[Tuple[int, int]],
+    engine_name: str,
+) -> List[_SubSolution]:
+    """Solve the sub-problems once per weight pair, splitting the pairs across the pool."""
+
+    parallel = (
+        _component_workers > 1
+        and len(weights) > 1
+        and sum(problem.arc_count for problem in problems) * len(weights) >= _PARALLEL_MIN_ARCS
+    )
+    solved: Optional[List[List[_SubSolution]]] = None
+    if parallel:
+        chunk_size = -(-len(weights) // _component_workers)
+        chunks = [weights[start : start + chunk_size] for start in range(0, len(weights), chunk_size)]
+        pool = _get_component_pool()
+        try:
+            futures = [pool.submit(_solve_sweep_chunk, problems, chunk, engine_name) for chunk in chunks]
+            solved = [per_weight for future in futures for per_weight in future.result()]
+        except BrokenProcessPool:
+            configure_component_pool(_component_workers, _component_context)
+    if solved is None:
+        solved = _solve_sweep_chunk(problems, weights, engine_name)
+    return [_merge_solutions(per_weight) for per_weight in solved]
+
+
+# ``k`` counts the returned schedule itself.
+_MAX_ALTERNATIVE_SCHEDULES = 10
+
+
+@dataclass
+class StudioInputs:
+    """A schedule's generate inputs held in memory instead of in the database.
+
+    ``students`` holds ``(id, name, lesson_length)`` rows and
+    ``student_start_times`` each student's free start times; a student left
+    out of it has submitted nothing.
+    """
+
+    id: int
+    days: Set[date]
+    students: List[Tuple[int, str, int]]
+    teacher_start_times: List[datetime]
+    student_start_times: Dict[int, List[datetime]] = field(default_factory=dict)
+
+
+def generate_studio_schedule(
+    studio: StudioInputs,
+    *,
+    slot_minutes: Optional[int] = None,
+    buffer_minutes: int = 0,
+    **options,
+) -> Dict[str, TypingIterable]:
+    """``schedule_service.generate_schedule`` on ``studio`` without touching the database.
+
+    ``options`` are ``generate_schedule``'s other keyword arguments, except
+    ``teacher_id``: every teacher start time in ``studio`` is used. Results
+    are cached and incremental warm starts kept under ``studio.id``, as for
+    a schedule id.
+    """
+
+    students = sorted(
+        _StudentRow(student_id, lesson_length, name) for student_id, name, lesson_length in studio.students
+    )
+    teacher_slots: Dict[date, List[datetime]] = defaultdict(list)
+    for start_time in studio.teacher_start_times:
+        teacher_slots[start_time.date()].append(start_time)
+    student_slots = {student_id: set(start_times) for student_id, start_times in studio.student_start_times.items()}
+    return _generate(
+        studio.id,
+        lambda mixed_lengths: _build_generate_inputs(
+            students,
+            teacher_slots,
+            student_slots,
+            set(studio.days),
+            slot_minutes,
+            buffer_minutes,
+            mixed_lengths,
+        ),
+        **options,
+    )
+
+
+def _generate(
+    schedule_id: int,
+    load_inputs: Callable[[bool], _GenerateInputs],
+    *,
+    day_open_cost: int = 10_000,
+    gap_penalty: int = 5,
+    incremental: bool = False,
+    engine: Optional[str] = None,
+    diagnostics: bool = False,
+    trace_memory: bool = False,
+    time_budget_ms: Optional[int] = None,
+    k: int = 1,
+    candidate_starts: str = "greedy",
+    horizon_days: Optional[int] = None,
+    horizon_repair: int = 1,
+    exact_days: bool = False,
+) -> Dict[str, TypingIterable]:
+    """Check the options and run one generate on what ``load_inputs(mixed_lengths)`` returns."""
+
+    if not 1 <= k <= _MAX_ALTERNATIVE_SCHEDULES:
+        raise ValueError(f"k must be between 1 and {_MAX_ALTERNATIVE_SCHEDULES}")
+    if candidate_starts not in _CANDIDATE_STARTS:
+        raise ValueError(f"candidate_starts must be one of: {', '.join(_CANDIDATE_STARTS)}")
+    if candidate_starts == "all":
+        if engine is None or engine == _AUTO_ENGINE:
+            engine = _INTERVAL_ENGINE
+        elif engine != _INTERVAL_ENGINE:
+            raise ValueError("candidate_starts='all' is only supported by the interval engine")
+    if k > 1 and engine == _INTERVAL_ENGINE:
+        raise ValueError("alternatives are only supported by the flow engines")
+    if horizon_days is not None:
+        if horizon_days < 1:
+            raise ValueError("horizon_days must be positive")
+        if horizon_repair < 0:
+            raise ValueError("horizon_repair must be non-negative")
+        if engine == _INTERVAL_ENGINE or incremental or k > 1:
+            raise ValueError("horizon_days is only supported by a plain flow engine solve")
+    if exact_days and (incremental or k > 1 or horizon_days is not None):
+        raise ValueError("exact_days is not supported with incremental, k or horizon_days")
+
+    deadline: Optional[float] = None
+    if time_budget_ms is not None:
+        if time_budget_ms <= 0:
+            raise ValueError("time_budget_ms must be positive")
+        deadline = time.monotonic() + time_budget_ms / 1000
+
+    diag = solver_diagnostics.GenerateDiagnostics(schedule_id, trace_memory=trace_memory)
+    with diag.measure():
+        result = _generate_schedule(
+            schedule_id,
+            diag,
+            load_inputs,
+            day_open_cost=day_open_cost,
+            gap_penalty=gap_penalty,
+            incremental=incremental,
+            engine=engine,
+            deadline=deadline,
+            k=k,
+            horizon_days=horizon_days,
+            horizon_repair=horizon_repair,
+            exact_days=exact_days,
+        )
+    solver_diagnostics.emit(diag)
+    if diagnostics:
+        result = {**result, "diagnostics": diag.to_dict()}
+    if deadline is not None and "optimal" not in result:
+        result = {**result, "optimal": True}
+    return result
+
+
+class _StudentRow(NamedTuple):
+    """The columns of a student that generating a schedule reads."""
+
+    id: int
+    lesson_length: int
+    name: str
+
+
+# (student_id, teacher_id, start_time) of one availability row.
+_AvailabilityRow = Tuple[Optional[int], Optional[int], datetime]
+
+
+@dataclass
+class _GenerateInputs:
+    """A schedule's students and availability, checked and loaded for one generate call."""
+
+    students: Sequence[_StudentRow]
+    student_by_id: Dict[int, _StudentRow]
+    slot_minutes: int
+    buffer_minutes: int
+    teacher_slots: Dict[date, List[datetime]]
+    student_slots: Dict[int, Set[datetime]]
+    schedule_days: Set[date]
+    # Each student keeps their own lesson_length; ``slot_minutes`` is then the longest.
+    mixed_lengths: bool = False
+
+    @property
+    def effective_slot_minutes(self) -> int:
+        return self.slot_minutes + self.buffer_minutes
+
+    def lesson_minutes(self, student: _StudentRow) -> int:
+        return student.lesson_length if self.mixed_lengths else self.slot_minutes
+
+    def lesson_duration(self, student: _StudentRow) -> timedelta:
+        return timedelta(minutes=self.lesson_minutes(student) + self.buffer_minutes)
+
+    def cache_key(
+        self,
+        day_open_cost: int,
+        gap_penalty: int,
+        incremental: bool,
+        engine_name: str,
+        k: int = 1,
+        horizon: Optional[Tuple[int, int]] = None,
+        exact_days: bool = False,
+        sweep: bool = False,
+    ) -> str:
+        return schedule_cache.make_key(
+            self.teacher_slots,
+            self.student_slots,
+            [(student.id, student.name, student.lesson_length) for student in self.students],
+            self.schedule_days,
+            {
+                "slot_minutes": self.slot_minutes,
+                "buffer_minutes": self.buffer_minutes,
+                "day_open_cost": day_open_cost,
+                "gap_penalty": gap_penalty,
+                "incremental": incremental,
+                "engine": engine_name,
+                "k": k,
+                "horizon": horizon,
+                "exact_days": exact_days,
+                "sweep": sweep,
+            },
+        )
+
+    def empty_result(self) -> Optional[Dict[str, TypingIterable]]:
+        """The result when there is nothing to solve, else ``None``."""
+
+        if not self.students:
+            return {"lessons": [], "unscheduled_student_ids": []}
+        if not self.teacher_slots:
+            return {
+                "lessons": [],
+                "unscheduled_student_ids": [student.id for student in self.students],
+            }
+        return None
+
+
+def _build_generate_inputs(
+    students: Sequence[_StudentRow],
+    teacher_slots: Dict[date, List[datetime]],
+    student_slots: Dict[int, Set[datetime]],
+    schedule_days: Set[date],
+    slot_minutes: Optional[int],
+    buffer_minutes: int,
+    mixed_lengths: bool = False,
+) -> _GenerateInputs:
+    """Check a schedule's rows against the generate options; no database access."""
+
+    if not students:
+        return _GenerateInputs([], {}, slot_minutes or 0, buffer_minutes, {}, {}, set())
+
+    lesson_lengths = {student.lesson_length for student in students}
+    inferred_slot_minutes: Optional[int] = slot_minutes
+    mixed_lengths = mixed_lengths and slot_minutes is None
+    if mixed_lengths:
+        if min(lesson_lengths) <= 0:
+            raise ValueError("lesson_length must be positive")
+        inferred_slot_minutes = max(lesson_lengths)
+    elif inferred_slot_minutes is None:
+        if len(lesson_lengths) != 1:
+            raise ValueError(
+                "slot_minutes must be provided when students have differing lesson lengths"
+            )
+        inferred_slot_minutes = lesson_lengths.pop()
+    else:
+        if any(length != inferred_slot_minutes for length in lesson_lengths):
+            raise ValueError("All students must share the configured slot_minutes length")
+
+    if inferred_slot_minutes <= 0:
+        raise ValueError("slot_minutes must be positive")
+    if buffer_minutes < 0:
+        raise ValueError("buffer_minutes must be non-negative")
+
+    if not teacher_slots:
+        return _GenerateInputs(students, {}, inferred_slot_minutes, buffer_minutes, {}, {}, set())
+
+    return _GenerateInputs(
+        students=students,
+        student_by_id={student.id: student for student in students},
+        slot_minutes=inferred_slot_minutes,
+        buffer_minutes=buffer_minutes,
+        teacher_slots=teacher_slots,
+        student_slots=student_slots,
+        schedule_days=schedule_days,
+        mixed_lengths=mixed_lengths,
+    )
+
+
+def _slots_from_rows(
+    rows: TypingIterable[_AvailabilityRow],
+    teacher_id: Optional[int],
+) -> Tuple[Dict[date, List[datetime]], Dict[int, Set[datetime]]]:
+    """Teacher slots by day and student slots by id from availability rows.
+
+    Only ``teacher_id``'s rows are teacher slots, or every teacher's when it is None.
+    """
+
+    teacher_slots: Dict[date, List[datetime]] = defaultdict(list)
+    student_slots: Dict[int, Set[datetime]] = defaultdict(set)
+    for student_id, row_teacher_id, start_time in rows:
+        if student_id is not None:
+            student_slots[student_id].add(start_time)
+        if row_teacher_id is not None and (teacher_id is None or row_teacher_id == teacher_id):
+            teacher_slots[start_time.date()].append(start_time)
+    return teacher_slots, student_slots
+
+
+def _candidate_slots(
+    inputs: _GenerateInputs,
+) -> Tuple[Dict[date, List[int]], Dict[int, Tuple[date, datetime, int]], Dict[int, List[int]]]:
+    matrix = _AvailabilityMatrix.build(
+        inputs.teacher_slots,
+        inputs.student_slots,
+        list(inputs.student_by_id),
+        inputs.schedule_days,
+    )
+    return _build_candidate_slots(matrix, timedelta(minutes=inputs.effective_slot_minutes))
+
+
+def _lessons_payload(
+    inputs: _GenerateInputs,
+    slot_metadata: Dict[int, Tuple[date, datetime, int]],
+    assignments: TypingIterable[Tuple[int, int]],
+) -> Tuple[List[dict], List[int]]:
+    """Return the sorted lesson dicts for ``assignments`` and the unscheduled student ids."""
+
+    lessons: List[ScheduledLesson] = []
+    assigned_student_ids = set()
+
+    for slot_id, student_id in assignments:
+        day_key, start_time, _position = slot_metadata[slot_id]
+        student = inputs.student_by_id[student_id]
+        assigned_student_ids.add(student.id)
+        lessons.append(
+            ScheduledLesson(
+                student_id=student.id,
+                student_name=student.name,
+                start_time=start_time,
+                end_time=start_time + inputs.lesson_duration(student),
+                day=day_key,
+            )
+        )
+
+    lessons.sort(key=lambda lesson: (lesson.day, lesson.start_time, lesson.student_name))
+    unscheduled = [student.id for student in inputs.students if student.id not in assigned_student_ids]
+
+    lessons_payload = [
+        {
+            "student_id": lesson.student_id,
+            "student_name": lesson.student_name,
+            "start_time": lesson.start_time.isoformat(),
+            "end_time": lesson.end_time.isoformat(),
+            "day": lesson.day.isoformat(),
+        }
+        for lesson in lessons
+    ]
+    return lessons_payload, unscheduled
+
+
+def _generate_schedule(
+    schedule_id: int,
+    diag: solver_diagnostics.GenerateDiagnostics,
+    load_inputs: Callable[[bool], _GenerateInputs],
+    *,
+    day_open_cost: int,
+    gap_penalty: int,
+    incremental: bool,
+    engine: Optional[str],
+    deadline: Optional[float],
+    k: int,
+    horizon_days: Optional[int],
+    horizon_repair: int,
+    exact_days: bool,
+) -> Dict[str, TypingIterable]:
+    inputs = load_inputs(engine == _INTERVAL_ENGINE)
+    empty = inputs.empty_result()
+    if empty is not None:
+        return empty
+    # Without a day-open cost there is no day to choose, and the engines are exact.
+    exact_days = exact_days and day_open_cost > 0
+
+    engine_name = _resolve_engine(
+        engine,
+        incremental,
+        assignment=day_open_cost == 0 and k == 1,
+    )
+    diag.engine = engine_name
+    diag.lap("load")
+
+    cache_key = inputs.cache_key(
+        day_open_cost,
+        gap_penalty,
+        incremental,
+        engine_name,
+        k,
+        horizon=None if horizon_days is None else (horizon_days, horizon_repair),
+        exact_days=exact_days,
+    )
+    cached = schedule_cache.result_cache.get(cache_key)
+    diag.lap("cache")
+    if cached is not None:
+        diag.cache_hit = True
+        return cached
+
+    if engine_name == _INTERVAL_ENGINE:
+        solved = _solve_interval_model(schedule_id, inputs, diag, day_open_cost, gap_penalty, deadline, exact_days)
+    elif horizon_days is not None:
+        solved = _solve_rolling_horizon(
+            inputs,
+            diag,
+            day_open_cost=day_open_cost,
+            gap_penalty=gap_penalty,
+            engine_name=engine_name,
+            deadline=deadline,
+            horizon_days=horizon_days,
+            horizon_repair=horizon_repair,
+        )
+    else:
+        solved = _solve_flow_model(
+            schedule_id,
+            inputs,
+            diag,
+            day_open_cost=day_open_cost,
+            gap_penalty=gap_penalty,
+            incremental=incremental,
+            engine_name=engine_name,
+            deadline=deadline,
+            k=k,
+            exact_days=exact_days,
+        )
+    if solved is None:
+        return {
+            "lessons": [],
+            "unscheduled_student_ids": [student.id for student in inputs.students],
+        }
+    slot_metadata, solution = solved
+    diag.lap("solve")
+    flow, total_cost, assignments = solution.flow, solution.cost, solution.assignments
+    truncated, lower_bound, alternatives = solution.truncated, solution.lower_bound, solution.alternatives
+
+    lessons_payload, unscheduled = _lessons_payload(inputs, slot_metadata, assignments)
+    result = {
+        "lessons": lessons_payload,
+        "unscheduled_student_ids": unscheduled,
+        "scheduled_count": flow,
+        "objective_cost": total_cost,
+        "engine": engine_name,
+    }
+    if k > 1:
+        result["alternatives"] = []
+        for alternative_cost, alternative in alternatives:
+            alternative_lessons, alternative_unscheduled = _lessons_payload(inputs, slot_metadata, alternative)
+            result["alternatives"].append(
+                {
+                    "lessons": alternative_lessons,
+                    "unscheduled_student_ids": alternative_unscheduled,
+                    "scheduled_count": len(alternative),
+                    "objective_cost": alternative_cost,
+                }
+            )
+    if truncated or not solution.optimal:
+        result["optimal"] = False
+        if lower_bound is not None:
+            result["cost_gap_bound"] = total_cost - lower_bound
+    if not truncated:
+        schedule_cache.result_cache.put(cache_key, schedule_id, result)
+    diag.lap("payload")
+    return result
+
+
+def _solve_flow_model(
+    schedule_id: int,
+    inputs: _GenerateInputs,
+    diag: solver_diagnostics.GenerateDiagnostics,
+    *,
+    day_open_cost: int,
+    gap_penalty: int,
+    incremental: bool,
+    engine_name: str,
+    deadline: Optional[float],
+    k: int,
+    exact_days: bool = False,
+) -> Optional[Tuple[Dict[int, Tuple[date, datetime, int]], _SubSolution]]:
+    """Solve ``inputs`` with the min-cost flow engines; ``None`` when no slot can be taken."""
+
+    day_slot_map, slot_metadata, slot_students = _candidate_slots(inputs)
+
+    if not day_slot_map:
+        return None
+
+    student_ids = list(inputs.student_by_id)
+    if incremental:
+        diag.lap("filter")
+        # Warm starts are keyed by whole-schedule node keys, so the network
+        # stays whole and unreduced.
+        started = time.perf_counter()
+        network = _FlowNetwork(
+            day_slot_map,
+            slot_metadata,
+            slot_students,
+            student_ids,
+            day_open_cost,
+            gap_penalty,
+        )
+        network.deadline = deadline
+        built = time.perf_counter()
+        parameters = (inputs.slot_minutes, inputs.buffer_minutes, day_open_cost, gap_penalty)
+        flow, total_cost = _solve_incremental(schedule_id, parameters, network, len(student_ids))
+        flow, total_cost, lower_bound = _finish_truncated(network, flow, total_cost)
+        solution = _SubSolution(
+            flow=flow,
+            cost=total_cost,
+            assignments=list(network.assignments()),
+            stats=_network_stats(network, built - started, time.perf_counter() - built),
+            truncated=network.truncated,
+            lower_bound=lower_bound,
+        )
+        if k > 1 and not network.truncated:
+            solution.alternatives = network.alternatives(k - 1, (k - 1) * _ALTERNATIVE_SEARCHES_PER_SCHEDULE)
+        diag.add_network(solution.stats)
+    else:
+        presolved = _presolve(day_slot_map, slot_metadata, slot_students, student_ids)
+        diag.presolve = presolved.stats
+        diag.lap("presolve")
+        if k > 1:
+            # Alternatives are cycles anywhere in the residual graph, so the network stays whole.
+            diag.lap("filter")
+            solution = _solve_sub_problem(
+                presolved.whole(),
+                day_open_cost,
+                gap_penalty,
+                engine_name,
+                deadline,
+                alternatives=k - 1,
+            )
+            diag.add_network(solution.stats)
+        else:
+            problems = presolved.components()
+            diag.lap("filter")
+            if exact_days:
+                solution = _solve_exact_days(
+                    problems,
+                    slot_metadata,
+                    day_open_cost,
+                    gap_penalty,
+                    engine_name,
+                    diag,
+                    deadline,
+                )
+            else:
+                solution = _solve_components(
+                    problems,
+                    day_open_cost,
+                    gap_penalty,
+                    engine_name,
+                    diag,
+                    deadline,
+                )
+        solution = presolved.complete(solution, presolved.fixed_cost(slot_metadata, day_open_cost, gap_penalty))
+    return slot_metadata, solution
+
+
+def _solve_rolling_horizon(
+    inputs: _GenerateInputs,
+    diag: solver_diagnostics.GenerateDiagnostics,
+    *,
+    day_open_cost: int,
+    gap_penalty: int,
+    engine_name: str,
+    deadline: Optional[float],
+    horizon_days: int,
+    horizon_repair: int,
+) -> Optional[Tuple[Dict[int, Tuple[date, datetime, int]], _SubSolution]]:
+    """Solve ``inputs`` window by window instead of as one network.
+
+    The candidate slots are built once for the whole schedule, so positions
+    and costs are the monolithic model's and the result is one of its
+    feasible schedules. Windows of ``horizon_days`` calendar days are solved
+    in date order, each with the students still unplaced. A repair sweep
+    then re-solves every pair of neighbouring windows with the students
+    placed in them plus the ones nobody placed, and keeps the result when
+    it places more students or costs less; sweeps stop after
+    ``horizon_repair`` of them or once one changes nothing.
+    """
+
+    day_slot_map, slot_metadata, slot_students = _candidate_slots(inputs)
+    if not day_slot_map:
+        return None
+    first_day = min(day_slot_map)
+    windows: List[List[date]] = []
+    for day_key in sorted(day_slot_map):
+        index = (day_key - first_day).days // horizon_days
+        if not windows or (windows[-1][0] - first_day).days // horizon_days != index:
+            windows.append([])
+        windows[-1].append(day_key)
+    diag.lap("filter")
+
+    truncated = False
+
+    def solve(days: Sequence[date], student_ids: Sequence[int]) -> List[Tuple[int, int]]:
+        nonlocal truncated
+        window = _window_problem(days, day_slot_map, slot_metadata, slot_students, student_ids)
+        if not window.student_ids:
+            return []
+        # Each window goes through presolve and components like a whole schedule.
+        presolved = _presolve(window.day_slot_map, window.slot_metadata, window.slot_students, window.student_ids)
+        solution = _solve_components(presolved.components(), day_open_cost, gap_penalty, engine_name, diag, deadline)
+        solution = presolved.complete(solution, presolved.fixed_cost(window.slot_metadata, day_open_cost, gap_penalty))
+        truncated = truncated or solution.truncated
+        return [(window.slot_ids[slot_id], student_id) for slot_id, student_id in solution.assignments]
+
+    placed: List[List[Tuple[int, int]]] = []
+    unplaced = list(inputs.student_by_id)
+    for days in windows:
+        assignments = solve(days, unplaced)
+        placed.append(assignments)
+        taken = {student_id for _slot_id, student_id in assignments}
+        unplaced = [student_id for student_id in unplaced if student_id not in taken]
+    diag.counters["horizon_windows"] += len(windows)
+
+    for _sweep in range(horizon_repair):
+        changed = False
+        for index in range(len(windows) - 1):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            current = placed[index] + placed[index + 1]
+            students = {student_id for _slot_id, student_id in current}
+            # Student order decides ties, so keep the schedule's.
+            students.update(unplaced)
+            candidates = [student_id for student_id in inputs.student_by_id if student_id in students]
+            repaired = solve(windows[index] + windows[index + 1], candidates)
+            diag.counters["horizon_repairs"] += 1
+            before = (len(current), -_assignments_cost(current, slot_metadata, day_open_cost, gap_penalty))
+            after = (len(repaired), -_assignments_cost(repaired, slot_metadata, day_open_cost, gap_penalty))
+            if after <= before:
+                continue
+            boundary = windows[index + 1][0]
+            placed[index] = [lesson for lesson in repaired if slot_metadata[lesson[0]][0] < boundary]
+            placed[index + 1] = [lesson for lesson in repaired if slot_metadata[lesson[0]][0] >= boundary]
+            taken = {student_id for _slot_id, student_id in repaired}
+            unplaced = [student_id for student_id in unplaced if student_id not in taken]
+            diag.counters["horizon_repairs_kept"] += 1
+            changed = True
+        if not changed:
+            break
+
+    assignments = [lesson for window in placed for lesson in window]
+    solution = _SubSolution(
+        flow=len(assignments),
+        cost=_assignments_cost(assignments, slot_metadata, day_open_cost, gap_penalty),
+        assignments=assignments,
+        stats={},
+        truncated=truncated,
+        optimal=len(windows) == 1,
+    )
+    return slot_metadata, solution
+
+
+def _window_problem(
+    days: Sequence[date],
+    day_slot_map: Dict[date, List[int]],
+    slot_metadata: Dict[int, Tuple[date, datetime, int]],
+    slot_students: Dict[int, List[int]],
+    student_ids: Sequence[int],
+) -> _SubProblem:
+    """The slots of ``days`` that some of ``student_ids`` can take, renumbered from 0."""
+
+    allowed = set(student_ids)
+    reachable: Set[int] = set()
+    problem = _SubProblem({}, {}, {}, [], [])
+    for day_key in days:
+        local_slots: List[int] = []
+        for slot_id in day_slot_map[day_key]:
+            students = [student_id for student_id in slot_students[slot_id] if student_id in allowed]
+            if not students:
+                continue
+            local_id = len(problem.slot_ids)
+            problem.slot_ids.append(slot_id)
+            problem.slot_metadata[local_id] = slot_metadata[slot_id]
+            problem.slot_students[local_id] = students
+            local_slots.append(local_id)
+            reachable.update(students)
+        if local_slots:
+            problem.day_slot_map[day_key] = local_slots
+    problem.student_ids = [student_id for student_id in student_ids if student_id in reachable]
+    return problem
+
+
+def _assignments_cost(
+    assignments: TypingIterable[Tuple[int, int]],
+    slot_metadata: Dict[int, Tuple[date, datetime, int]],
+    day_open_cost: int,
+    gap_penalty: int,
+) -> int:
+    days: Set[date] = set()
+    positions = 0
+    for slot_id, _student_id in assignments:
+        day_key, _start_time, position = slot_metadata[slot_id]
+        days.add(day_key)
+        positions += position * position
+    return day_open_cost * len(days) + gap_penalty * positions
+
+
+def _solve_interval_model(
+    schedule_id: int,
+    inputs: _GenerateInputs,
+    diag: solver_diagnostics.GenerateDiagnostics,
+    day_open_cost: int,
+    gap_penalty: int,
+    deadline: Optional[float],
+    exact_days: bool = False,
+) -> Optional[Tuple[Dict[int, Tuple[date, datetime, int]], _SubSolution]]:
+    """Solve ``inputs`` with ``interval_engine``; its lessons get slot ids of their own.
+
+    When the model has fixed slots it is the flow model's, so the flow
+    engines solve it instead, with the exact day search if ``exact_days``
+    asks for it.
+    """
+
+    started = time.perf_counter()
+    model = interval_engine.IntervalModel(
+        inputs.teacher_slots,
+        inputs.student_slots,
+        {student.id: inputs.lesson_minutes(student) for student in inputs.students},
+        inputs.schedule_days,
+        inputs.buffer_minutes,
+    )
+    if not model.days:
+        return None
+    if model.fixed_slots:
+        return _solve_flow_model(
+            schedule_id,
+            inputs,
+            diag,
+            day_open_cost=day_open_cost,
+            gap_penalty=gap_penalty,
+            incremental=False,
+            engine_name=_resolve_engine(None, False, assignment=day_open_cost == 0),
+            deadline=deadline,
+            k=1,
+            exact_days=exact_days,
+        )
+    built = time.perf_counter()
+    seed = _greedy_slot_seed(inputs, diag, day_open_cost, gap_penalty, deadline)
+    seeded = time.perf_counter()
+    solved = interval_engine.solve(model, day_open_cost, gap_penalty, deadline, seed=seed)
+
+    slot_metadata: Dict[int, Tuple[date, datetime, int]] = {}
+    assignments: List[Tuple[int, int]] = []
+    for student_id, day_index, candidate in solved.assignments:
+        slot_id = len(slot_metadata)
+        position = model.candidates[day_index][candidate][3]
+        slot_metadata[slot_id] = (model.days[day_index], model.start_time(day_index, candidate), position)
+        assignments.append((slot_id, student_id))
+    stats = {
+        "nodes": model.point_count + len(model.student_ids),
+        "edges": model.candidate_count,
+        "build_seconds": built - started,
+        "solve_seconds": time.perf_counter() - seeded,
+        "counters": solved.counters,
+    }
+    lower_bound = None if solved.cost_gap_bound is None else solved.cost - solved.cost_gap_bound
+    solution = _SubSolution(
+        flow=solved.scheduled_count,
+        cost=solved.cost,
+        assignments=assignments,
+        stats=stats,
+        truncated=solved.truncated,
+        lower_bound=lower_bound,
+        optimal=solved.optimal,
+    )
+    diag.add_network(stats)
+    return slot_metadata, solution
+
+
+def _greedy_slot_seed(
+    inputs: _GenerateInputs,
+    diag: solver_diagnostics.GenerateDiagnostics,
+    day_open_cost: int,
+    gap_penalty: int,
+    deadline: Optional[float],
+) -> List[Tuple[int, datetime]]:
+    """The flow model's schedule of ``inputs``, as lessons for the interval engine to start from.
+
+    Its slots are one longest lesson apart, so the schedule fits the interval
+    model as is, and keeping every start can then only schedule more.
+    """
+
+    day_slot_map, slot_metadata, slot_students = _candidate_slots(inputs)
+    if not slot_metadata:
+        return []
+    student_ids = [student.id for student in inputs.students]
+    problem = _SubProblem(day_slot_map, slot_metadata, slot_students, student_ids, list(slot_metadata))
+    engine_name = _resolve_engine(None, False, assignment=day_open_cost == 0)
+    solution = _solve_sub_problem(problem, day_open_cost, gap_penalty, engine_name, deadline)
+    diag.add_network(solution.stats)
+    return [(student_id, slot_metadata[slot_id][1]) for slot_id, student_id in solution.assignments]
+
+
+def _parse_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        normalized = value.replace('Z', '+00:00')
+        try:
+            return datetime.fromisoformat(normalized)
+        except ValueError as exc:
+            raise ValueError(f'Invalid datetime value: {value}') from exc
+    raise ValueError('Datetime value is required.')
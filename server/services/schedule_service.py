@@ -1,12 +1,17 @@
 from __future__ import annotations
 
-import json
 import re
 from collections import defaultdict
 from collections.abc import Iterable
-from dataclasses import dataclass
 from datetime import date, datetime, timedelta
-from typing import Dict, Iterable as TypingIterable, List, Optional, Sequence, Set, Tuple
+from typing import (
+    Dict,
+    Iterable as TypingIterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import joinedload
@@ -14,166 +19,33 @@ from sqlalchemy.orm import joinedload
 from extensions import db
 from models.models import Availability, FinalizedSchedule, Schedule, Student
 
+from . import schedule_cache
+from .schedule_core import (
+    _ASSIGNMENT_ENGINE,
+    _INTERVAL_ENGINE,
+    _AvailabilityRow,
+    _build_generate_inputs,
+    _candidate_slots,
+    _generate,
+    _GenerateInputs,
+    _lessons_payload,
+    _merge_solutions,
+    _parse_datetime,
+    _parse_schedule_days,
+    _presolve,
+    _resolve_engine,
+    _slots_from_rows,
+    _solve_assignment,
+    _solve_sweep,
+    _StudentRow,
+    _SubSolution,
+)
+
 
 def get_all_schedules() -> List[Schedule]:
     return Schedule.query.all()
 
 
-@dataclass(frozen=True)
-class ScheduledLesson:
-    """Result object representing a scheduled lesson."""
-
-    student_id: int
-    student_name: str
-    start_time: datetime
-    end_time: datetime
-    day: date
-
-
-class _Edge:
-    __slots__ = ("to", "rev", "cap", "cost", "metadata")
-
-    def __init__(self, to: int, rev: int, cap: int, cost: int, metadata: Optional[Tuple] = None):
-        self.to = to
-        self.rev = rev
-        self.cap = cap
-        self.cost = cost
-        self.metadata = metadata
-
-
-class _MinCostFlow:
-    def __init__(self, node_count: int):
-        self._n = node_count
-        self._graph: List[List[_Edge]] = [[] for _ in range(node_count)]
-
-    @property
-    def graph(self) -> List[List[_Edge]]:
-        return self._graph
-
-    def add_edge(
-        self,
-        u: int,
-        v: int,
-        capacity: int,
-        cost: int,
-        metadata: Optional[Tuple] = None,
-    ) -> Tuple[int, int]:
-        forward = _Edge(v, len(self._graph[v]), capacity, cost, metadata)
-        backward = _Edge(u, len(self._graph[u]), 0, -cost, metadata)
-        self._graph[u].append(forward)
-        self._graph[v].append(backward)
-        return u, len(self._graph[u]) - 1
-
-    def successive_shortest_path(
-        self,
-        source: int,
-        sink: int,
-        max_flow: int,
-        day_states: Dict[date, "_DayState"],
-    ) -> Tuple[int, int]:
-        import heapq
-
-        flow = 0
-        cost = 0
-        potential = [0] * self._n
-        inf = 10**18
-
-        while flow < max_flow:
-            dist = [inf] * self._n
-            prev_node = [-1] * self._n
-            prev_edge = [-1] * self._n
-            dist[source] = 0
-            heap: List[Tuple[int, int]] = [(0, source)]
-
-            while heap:
-                cur_dist, u = heapq.heappop(heap)
-                if cur_dist != dist[u]:
-                    continue
-                for idx, edge in enumerate(self._graph[u]):
-                    if edge.cap <= 0:
-                        continue
-                    next_cost = cur_dist + edge.cost + potential[u] - potential[edge.to]
-                    if next_cost < dist[edge.to]:
-                        dist[edge.to] = next_cost
-                        prev_node[edge.to] = u
-                        prev_edge[edge.to] = idx
-                        heapq.heappush(heap, (next_cost, edge.to))
-
-            if dist[sink] == inf:
-                break
-
-            for node in range(self._n):
-                if dist[node] < inf:
-                    potential[node] += dist[node]
-
-            add_flow = max_flow - flow
-            v = sink
-            path: List[Tuple[int, int]] = []
-            while v != source:
-                u = prev_node[v]
-                edge_index = prev_edge[v]
-                if u == -1 or edge_index == -1:
-                    add_flow = 0
-                    break
-                edge = self._graph[u][edge_index]
-                add_flow = min(add_flow, edge.cap)
-                path.append((u, edge_index))
-                v = u
-
-            if add_flow <= 0:
-                break
-
-            flow += add_flow
-            cost += add_flow * potential[sink]
-
-            days_seen: Dict[date, bool] = {}
-            open_edges: Dict[date, bool] = {}
-
-            for u, edge_index in path:
-                edge = self._graph[u][edge_index]
-                reverse = self._graph[edge.to][edge.rev]
-                edge.cap -= add_flow
-                reverse.cap += add_flow
-
-                if edge.metadata:
-                    marker = edge.metadata[0]
-                    if marker == "day_slot":
-                        day_key: date = edge.metadata[1]
-                        days_seen[day_key] = True
-                    elif marker == "open":
-                        day_key = edge.metadata[1]
-                        open_edges[day_key] = True
-
-            for day_key in days_seen.keys():
-                state = day_states[day_key]
-                state.assignments_made += add_flow
-                remaining = max(0, state.total_slots - state.assignments_made)
-                if not state.opened and day_key in open_edges:
-                    state.opened = True
-                    through_u, through_idx = state.through_edge
-                    self._graph[through_u][through_idx].cap = remaining
-                    open_u, open_idx = state.open_edge
-                    open_forward = self._graph[open_u][open_idx]
-                    open_reverse = self._graph[open_forward.to][open_forward.rev]
-                    open_reverse.cap = 0
-                elif state.opened:
-                    through_u, through_idx = state.through_edge
-                    current_cap = self._graph[through_u][through_idx].cap
-                    if current_cap > remaining:
-                        self._graph[through_u][through_idx].cap = remaining
-
-        return flow, cost
-
-
-@dataclass
-class _DayState:
-    total_slots: int
-    open_edge: Tuple[int, int]
-    through_edge: Tuple[int, int]
-    opened: bool = False
-    assignments_made: int = 0
-
-
 def generate_schedule(
     schedule_id: int,
     *,
@@ -182,9 +54,127 @@ def generate_schedule(
     day_open_cost: int = 10_000,
     gap_penalty: int = 5,
     teacher_id: Optional[int] = None,
+    incremental: bool = False,
+    engine: Optional[str] = None,
+    diagnostics: bool = False,
+    trace_memory: bool = False,
+    time_budget_ms: Optional[int] = None,
+    k: int = 1,
+    candidate_starts: str = "greedy",
+    horizon_days: Optional[int] = None,
+    horizon_repair: int = 1,
+    exact_days: bool = False,
 ) -> Dict[str, TypingIterable]:
-    """Generate a lesson schedule using a min-cost max-flow model."""
+    """Generate a lesson schedule using a min-cost max-flow model.
+
+    With ``incremental`` the solve is warm-started from this schedule's
+    previous incremental solve (if it used the same parameters), so a small
+    availability edit only re-routes the students it affects.
+
+    ``engine`` names a registered solver (see
+    ``schedule_core.register_solver_engine``); ``None`` or ``"auto"`` picks
+    ``"ssp"``, or
+    ``"assignment"`` when ``day_open_cost`` is 0 and ``k`` is 1: lessons
+    then cost what their slot costs, and a cheapest maximum matching
+    replaces the flow network (see ``_solve_assignment``).
+    ``"interval"`` instead gives every student their own ``lesson_length``
+    (unless ``slot_minutes`` sets one for all) and keeps lessons apart on a
+    shared timeline; see ``interval_engine``. It starts from the flow
+    model's schedule on slots one longest lesson apart, so it never
+    schedules fewer students than that. Its Lagrangian search is a
+    heuristic: it proves a schedule optimal when the bound closes and by
+    branch and bound up to ``interval_engine.EXACT_MAX_STUDENTS`` students.
+    Otherwise it reports ``optimal: False`` and how far its cost can be
+    off. Equal lengths whose starts are the flow model's slots are that
+    model, so the flow engines solve them instead, searching the days
+    exactly only when ``exact_days`` asks. It does not support
+    ``incremental`` or ``k``.
+
+    The flow engines only see one slot per lesson length: each day's teacher
+    start times are taken in order, skipping any that overlaps the slot kept
+    before it. On a grid finer than the lessons that drops most start
+    offsets, so a student free at 9:15 can go unscheduled behind a 9:00
+    slot somebody else takes. ``candidate_starts="all"`` keeps every start
+    and enforces non-overlap inside the model instead, which means the
+    interval engine (the default then, and the only engine allowed). Its
+    timeline only has the points where lessons start or end, so the model
+    grows with the availability, not with the grid. It places more students
+    only when the greedy slots are what leaves them out: students free at
+    few offsets of a fine grid, in a studio near capacity. With a slot for
+    everyone either way it places the same students, more slowly (see
+    ``benchmarks/fine_grid.py``). When every start already is a greedy slot
+    (equal lengths on a grid as long as the lessons) the model is the flow
+    model's, and it costs what the flow engines cost, with the exact day
+    search only under ``exact_days``.
+
+    Phase timings and solver counters go to the metrics hook (see
+    ``solver_diagnostics.set_metrics_hook``) on every call; ``diagnostics``
+    also returns them under ``"diagnostics"``. ``trace_memory`` adds the
+    peak ``tracemalloc`` memory, at the price of a much slower solve and
+    process while it runs. Only one call traces at a time, and the HTTP API
+    leaves it out; see ``solver_diagnostics.GenerateDiagnostics``.
+
+    ``time_budget_ms`` bounds the whole call: the solver stops at the
+    deadline and the students it has not placed yet are filled in greedily.
+    The result then says whether the solve ran to completion (``optimal``)
+    and, when it did not, how far above the optimum its cost can be at most
+    (``cost_gap_bound``, left out when no bound is known). Cut-short results
+    are not cached.
+
+    With ``k`` above 1, up to ``k - 1`` other low-cost schedules come back
+    under ``"alternatives"``, cheapest first. They are read off the solved
+    residual graph (see ``_FlowNetwork.alternatives``), not solved again,
+    and are left out of a solve cut short by ``time_budget_ms``.
+
+    ``horizon_days`` solves a long schedule in windows of that many calendar
+    days, in date order, each with the students no earlier window placed
+    (see ``_solve_rolling_horizon``). Every window is a fraction of the
+    whole network, so this trades some cost (and possibly students) for
+    time; ``horizon_repair`` sweeps of re-solving pairs of neighbouring
+    windows win part of it back, and wider windows win back more. Such a
+    result reports ``optimal: False`` unless there is a single window.
+    Only the flow engines support it, without ``incremental`` or ``k``.
+
+    The flow engines open days as their augmenting paths first need them,
+    so a schedule can open a day it did not have to. ``exact_days`` takes
+    their schedule as a starting point and searches which days to open,
+    proving the result optimal (see ``_day_branch_and_bound``). The search
+    can take exponentially many solves on a large component, so it gives up
+    after ``_DAY_SEARCH_MAX_NODES`` of them or ``_DAY_SEARCH_MAX_SECONDS``,
+    whichever comes first, and reports ``optimal: False`` with the gap it
+    has proven. It only changes anything when ``day_open_cost`` is
+    positive, and not with ``incremental``, ``k`` or ``horizon_days``. The
+    interval engine only uses it when it hands its model to the flow
+    engines.
+    """
+
+    return _generate(
+        schedule_id,
+        lambda mixed_lengths: _load_generate_inputs(
+            schedule_id, teacher_id, slot_minutes, buffer_minutes, mixed_lengths
+        ),
+        day_open_cost=day_open_cost,
+        gap_penalty=gap_penalty,
+        incremental=incremental,
+        engine=engine,
+        diagnostics=diagnostics,
+        trace_memory=trace_memory,
+        time_budget_ms=time_budget_ms,
+        k=k,
+        candidate_starts=candidate_starts,
+        horizon_days=horizon_days,
+        horizon_repair=horizon_repair,
+        exact_days=exact_days,
+    )
+
 
+def _load_generate_inputs(
+    schedule_id: int,
+    teacher_id: Optional[int],
+    slot_minutes: Optional[int],
+    buffer_minutes: int,
+    mixed_lengths: bool = False,
+) -> _GenerateInputs:
     schedule: Optional[Schedule] = Schedule.query.get(schedule_id)
     if schedule is None:
         raise LookupError("Schedule not found.")
@@ -192,256 +182,168 @@ def generate_schedule(
     if teacher_id is not None and schedule.teacher_id != teacher_id:
         raise PermissionError('Teacher is not authorized for this schedule.')
 
-    students: Sequence[Student] = schedule.students
+    # The relationships are never touched: two narrow SELECTs return plain
+    # rows, without building (and identity-mapping) an instance per row.
+    students = _fetch_student_rows(schedule_id)
     if not students:
-        return {"lessons": [], "unscheduled_student_ids": []}
-
-    lesson_lengths = {student.lesson_length for student in students}
-    inferred_slot_minutes: Optional[int] = slot_minutes
-    if inferred_slot_minutes is None:
-        if len(lesson_lengths) != 1:
-            raise ValueError(
-                "slot_minutes must be provided when students have differing lesson lengths"
-            )
-        inferred_slot_minutes = lesson_lengths.pop()
-    else:
-        if any(length != inferred_slot_minutes for length in lesson_lengths):
-            raise ValueError("All students must share the configured slot_minutes length")
-
-    if inferred_slot_minutes <= 0:
-        raise ValueError("slot_minutes must be positive")
-    if buffer_minutes < 0:
-        raise ValueError("buffer_minutes must be non-negative")
-
-    effective_slot_minutes = inferred_slot_minutes + buffer_minutes
-
-    teacher_slots = _collect_teacher_slots(schedule, schedule.teacher_id)
-    if not teacher_slots:
-        return {
-            "lessons": [],
-            "unscheduled_student_ids": [student.id for student in students],
-        }
-
-    student_slots = _collect_student_slots(schedule.availabilities)
-
-    student_by_id: Dict[int, Student] = {student.id: student for student in students}
-    schedule_days = _parse_schedule_days(schedule.days or schedule.dates)
-
-    day_slot_map: Dict[date, List[int]] = {}
-    slot_metadata: Dict[int, Tuple[date, datetime, int]] = {}
-    slot_students: Dict[int, List[int]] = {}
-    slot_counter = 0
-
-    slot_duration = timedelta(minutes=effective_slot_minutes)
-
-    for day_key in sorted(teacher_slots.keys()):
-        if schedule_days and day_key not in schedule_days:
-            continue
-
-        teacher_times = sorted(teacher_slots[day_key])
-        day_slots: List[int] = []
-        next_available_time: Optional[datetime] = None
-
-        filtered_slots: List[Tuple[datetime, List[int]]] = []
-
-        for start_time in teacher_times:
-            available_students = [
-                student_id
-                for student_id in student_by_id.keys()
-                if start_time in student_slots.get(student_id, set())
-            ]
-
-            if not available_students:
-                continue
-
-            if next_available_time is not None and start_time < next_available_time:
-                continue
-
-            filtered_slots.append((start_time, available_students))
-            next_available_time = start_time + slot_duration
-
-        for position, (start_time, available_students) in enumerate(filtered_slots):
-            
-            slot_id = slot_counter
-            slot_counter += 1
-            slot_metadata[slot_id] = (day_key, start_time, position)
-            slot_students[slot_id] = available_students
-            day_slots.append(slot_id)
-
-        if day_slots:
-            day_slot_map[day_key] = day_slots
-
-    if not day_slot_map:
-        return {
-            "lessons": [],
-            "unscheduled_student_ids": [student.id for student in students],
-        }
-
-    source = 0
-    day_nodes: Dict[date, int] = {}
-    slot_nodes: Dict[int, int] = {}
-    student_nodes: Dict[int, int] = {}
-
-    node_cursor = 1
-    for day_key in day_slot_map:
-        day_nodes[day_key] = node_cursor
-        node_cursor += 1
-
-    for slot_id in slot_metadata:
-        slot_nodes[slot_id] = node_cursor
-        node_cursor += 1
-
-    for student_id in student_by_id:
-        student_nodes[student_id] = node_cursor
-        node_cursor += 1
-
-    sink = node_cursor
-    solver = _MinCostFlow(sink + 1)
-
-    day_states: Dict[date, _DayState] = {}
-
-    for day_key, day_node in day_nodes.items():
-        open_edge = solver.add_edge(
-            source,
-            day_node,
-            1,
-            day_open_cost,
-            metadata=("open", day_key),
-        )
-        through_edge = solver.add_edge(
-            source,
-            day_node,
-            0,
-            0,
-            metadata=("throughput", day_key),
-        )
-        day_states[day_key] = _DayState(
-            total_slots=len(day_slot_map[day_key]),
-            open_edge=open_edge,
-            through_edge=through_edge,
-        )
+        return _GenerateInputs([], {}, slot_minutes or 0, buffer_minutes, {}, {}, set())
+
+    teacher_slots, student_slots = _slots_from_rows(_fetch_availability_rows(schedule_id), schedule.teacher_id)
+    return _build_generate_inputs(
+        students,
+        teacher_slots,
+        student_slots,
+        _parse_schedule_days(schedule.days or schedule.dates),
+        slot_minutes,
+        buffer_minutes,
+        mixed_lengths,
+    )
 
-    slot_to_student_edges: List[Tuple[int, int, int, int]] = []
-
-    for slot_id, (day_key, _start_time, position) in slot_metadata.items():
-        day_node = day_nodes[day_key]
-        slot_node = slot_nodes[slot_id]
-        gap_cost = gap_penalty * position * position
-        solver.add_edge(
-            day_node,
-            slot_node,
-            1,
-            gap_cost,
-            metadata=("day_slot", day_key, slot_id),
-        )
 
-        for student_id in slot_students[slot_id]:
-            person_node = student_nodes[student_id]
-            edge_ref = solver.add_edge(
-                slot_node,
-                person_node,
-                1,
-                0,
-                metadata=("slot_student", slot_id, student_id),
-            )
-            slot_to_student_edges.append((slot_id, student_id, edge_ref[0], edge_ref[1]))
-
-    for student_id, node in student_nodes.items():
-        solver.add_edge(node, sink, 1, 0, metadata=("student_sink", student_id))
-
-    target_flow = len(student_by_id)
-    flow, total_cost = solver.successive_shortest_path(source, sink, target_flow, day_states)
-
-    lessons: List[ScheduledLesson] = []
-    assigned_student_ids = set()
-
-    for slot_id, student_id, edge_u, edge_index in slot_to_student_edges:
-        edge = solver.graph[edge_u][edge_index]
-        if edge.cap == 0:
-            day_key, start_time, _position = slot_metadata[slot_id]
-            student = student_by_id[student_id]
-            assigned_student_ids.add(student_id)
-            lessons.append(
-                ScheduledLesson(
-                    student_id=student.id,
-                    student_name=student.name,
-                    start_time=start_time,
-                    end_time=start_time + timedelta(minutes=effective_slot_minutes),
-                    day=day_key,
-                )
-            )
+def _fetch_student_rows(schedule_id: int) -> List[_StudentRow]:
+    return (
+        db.session.query(Student.id, Student.lesson_length, Student.name)
+        .filter(Student.schedule_id == schedule_id)
+        .order_by(Student.id)
+        .all()
+    )
+
+
+def _fetch_availability_rows(schedule_id: int) -> List[_AvailabilityRow]:
+    return (
+        db.session.query(Availability.student_id, Availability.teacher_id, Availability.start_time)
+        .filter(Availability.schedule_id == schedule_id)
+        .all()
+    )
 
-    lessons.sort(key=lambda lesson: (lesson.day, lesson.start_time, lesson.student_name))
-    unscheduled = [student.id for student in students if student.id not in assigned_student_ids]
 
-    lessons_payload = [
-        {
-            "student_id": lesson.student_id,
-            "student_name": lesson.student_name,
-            "start_time": lesson.start_time.isoformat(),
-            "end_time": lesson.end_time.isoformat(),
-            "day": lesson.day.isoformat(),
-        }
-        for lesson in lessons
-    ]
+_SWEEP_MAX_PARAMETER_SETS = 32
+
+
+def sweep_schedule(
+    schedule_id: int,
+    parameter_sets: Sequence[dict],
+    *,
+    slot_minutes: Optional[int] = None,
+    buffer_minutes: int = 0,
+    teacher_id: Optional[int] = None,
+    engine: Optional[str] = None,
+) -> Dict[str, object]:
+    """Generate the schedule once per ``{"day_open_cost", "gap_penalty"}`` set.
+
+    The schedule is loaded, filtered into candidate slots and split into
+    components once, and each component's network is built once per worker
+    and only re-weighted between sets. Every entry of ``"results"`` is what
+    ``generate_schedule`` would return for its set, plus its ``day_count``,
+    ``total_gap_minutes`` (idle time between lessons on the same day) and
+    ``unscheduled_count``. Results are cached under keys of their own,
+    apart from ``generate_schedule``'s: the sweep solves its sets on
+    re-weighted networks, and generate never serves them. Repeating a sweep
+    is a cache hit.
+    """
+
+    weights = _parse_parameter_sets(parameter_sets)
+    if engine in (_INTERVAL_ENGINE, _ASSIGNMENT_ENGINE):
+        raise ValueError("sweeps are only supported by the flow engines")
+    inputs = _load_generate_inputs(schedule_id, teacher_id, slot_minutes, buffer_minutes)
+    results: List[Optional[Dict[str, TypingIterable]]] = [inputs.empty_result()] * len(weights)
+    engine_name: Optional[str] = None
+
+    if results[0] is None:
+        engine_name = _resolve_engine(engine, incremental=False)
+        # Sets without a day-open cost get the engine generate would pick for them.
+        engine_names = [
+            _resolve_engine(engine, incremental=False, assignment=day_open_cost == 0)
+            for day_open_cost, _gap_penalty in weights
+        ]
+        keys = [
+            inputs.cache_key(day_open_cost, gap_penalty, False, set_engine, sweep=True)
+            for (day_open_cost, gap_penalty), set_engine in zip(weights, engine_names)
+        ]
+        results = [schedule_cache.result_cache.get(key) for key in keys]
+        missing = [index for index, result in enumerate(results) if result is None]
+
+        day_slot_map: Dict[date, List[int]] = {}
+        if missing:
+            day_slot_map, slot_metadata, slot_students = _candidate_slots(inputs)
+        if missing and not day_slot_map:
+            for index in missing:
+                results[index] = {
+                    "lessons": [],
+                    "unscheduled_student_ids": [student.id for student in inputs.students],
+                }
+        elif missing:
+            presolved = _presolve(day_slot_map, slot_metadata, slot_students, list(inputs.student_by_id))
+            problems = presolved.components()
+            swept = [index for index in missing if engine_names[index] != _ASSIGNMENT_ENGINE]
+            solved: Dict[int, _SubSolution] = {}
+            if swept:
+                solved.update(zip(swept, _solve_sweep(problems, [weights[index] for index in swept], engine_name)))
+            for index in missing:
+                solution = solved.get(index)
+                if solution is None:
+                    solution = _merge_solutions(
+                        [_solve_assignment(problem, weights[index][1], None) for problem in problems]
+                    )
+                solution = presolved.complete(solution, presolved.fixed_cost(slot_metadata, *weights[index]))
+                lessons_payload, unscheduled = _lessons_payload(inputs, slot_metadata, solution.assignments)
+                results[index] = {
+                    "lessons": lessons_payload,
+                    "unscheduled_student_ids": unscheduled,
+                    "scheduled_count": solution.flow,
+                    "objective_cost": solution.cost,
+                    "engine": engine_names[index],
+                }
+                schedule_cache.result_cache.put(keys[index], schedule_id, results[index])
 
     return {
-        "lessons": lessons_payload,
-        "unscheduled_student_ids": unscheduled,
-        "scheduled_count": flow,
-        "objective_cost": total_cost,
+        "engine": engine_name,
+        "results": [
+            {
+                "day_open_cost": day_open_cost,
+                "gap_penalty": gap_penalty,
+                **result,
+                **_schedule_summary(result),
+            }
+            for (day_open_cost, gap_penalty), result in zip(weights, results)
+        ],
     }
 
 
-def _parse_schedule_days(days_raw: Optional[TypingIterable] = None) -> Set[date]:
-    if not days_raw:
-        return set()
-
-    if isinstance(days_raw, (list, tuple, set)):
-        values: TypingIterable = days_raw
-    else:
-        try:
-            decoded = json.loads(days_raw)
-            if isinstance(decoded, list):
-                values = decoded
-            else:
-                values = str(days_raw).split(",")
-        except (json.JSONDecodeError, TypeError):
-            values = str(days_raw).split(",")
-
-    parsed: Set[date] = set()
-    for value in values:
-        if value is None:
-            continue
-        parsed.add(_coerce_date(value))
-    return parsed
-
-
-def _coerce_date(value) -> date:
-    if isinstance(value, date):
-        return value
-    return datetime.fromisoformat(str(value)).date()
-
-
-def _collect_teacher_slots(schedule: Schedule, teacher_id: Optional[int]) -> Dict[date, List[datetime]]:
-    slots: Dict[date, List[datetime]] = defaultdict(list)
-    for availability in schedule.availabilities:
-        if availability.teacher_id is None:
-            continue
-        if teacher_id is not None and availability.teacher_id != teacher_id:
-            continue
-        start_time = availability.start_time
-        slots[start_time.date()].append(start_time)
-    return slots
-
-
-def _collect_student_slots(availabilities: TypingIterable[Availability]) -> Dict[int, Set[datetime]]:
-    student_slots: Dict[int, Set[datetime]] = defaultdict(set)
-    for availability in availabilities:
-        if availability.student_id is None:
-            continue
-        student_slots[availability.student_id].add(availability.start_time)
-    return student_slots
+def _parse_parameter_sets(parameter_sets: Sequence[dict]) -> List[Tuple[int, int]]:
+    if not isinstance(parameter_sets, list) or not parameter_sets:
+        raise ValueError("parameter_sets must be a non-empty list")
+    if len(parameter_sets) > _SWEEP_MAX_PARAMETER_SETS:
+        raise ValueError(f"At most {_SWEEP_MAX_PARAMETER_SETS} parameter sets can be swept at once")
+
+    weights: List[Tuple[int, int]] = []
+    for entry in parameter_sets:
+        if not isinstance(entry, dict):
+            raise ValueError("Each parameter set must be an object")
+        day_open_cost = entry.get("day_open_cost", 10_000)
+        gap_penalty = entry.get("gap_penalty", 5)
+        for name, value in (("day_open_cost", day_open_cost), ("gap_penalty", gap_penalty)):
+            if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                raise ValueError(f"{name} must be a non-negative integer")
+        weights.append((day_open_cost, gap_penalty))
+    return weights
+
+
+def _schedule_summary(result: Dict[str, TypingIterable]) -> Dict[str, int]:
+    lessons_by_day: Dict[str, List[dict]] = defaultdict(list)
+    for lesson in result["lessons"]:
+        lessons_by_day[lesson["day"]].append(lesson)
+
+    gap = timedelta()
+    for lessons in lessons_by_day.values():
+        for previous, following in zip(lessons, lessons[1:]):
+            gap += datetime.fromisoformat(following["start_time"]) - datetime.fromisoformat(previous["end_time"])
+
+    return {
+        "day_count": len(lessons_by_day),
+        "total_gap_minutes": int(gap.total_seconds() // 60),
+        "unscheduled_count": len(result["unscheduled_student_ids"]),
+    }
 
 
 def _slugify(value: str) -> str:
@@ -564,6 +466,25 @@ def create_schedule(data: dict, teacher_id: int) -> Schedule:
         raise
 
 
+def mark_edited(schedule: Schedule) -> int:
+    """Bump ``schedule.version`` for an edit of its inputs, in the caller's transaction.
+
+    Returns the version the edit started from. Every worker checks state it
+    derived from the schedule against this column (see
+    ``feasibility_service``), so an edit of its students or availability
+    bumps it too. The increment runs in SQL, under the row lock of the
+    UPDATE, so edits from different workers never share a version however
+    close together they commit; ``updated_at`` could not promise that, as a
+    MySQL ``DATETIME`` keeps whole seconds. After the commit the attribute
+    reloads, and reads exactly one more than the returned version unless
+    another edit committed as well.
+    """
+
+    previous = schedule.version
+    schedule.version = Schedule.version + 1
+    return previous
+
+
 def update_schedule(schedule_id: int, teacher_id: int, data: dict) -> Schedule:
     schedule = get_schedule(schedule_id, teacher_id)
     if schedule is None:
@@ -595,15 +516,17 @@ def update_schedule(schedule_id: int, teacher_id: int, data: dict) -> Schedule:
         new_slug = _ensure_unique_slug(data['slug'], schedule_id=schedule.id)
         schedule.slug = new_slug
 
+    mark_edited(schedule)
     try:
         db.session.commit()
-        return get_schedule(schedule.id, teacher_id)
     except IntegrityError:
         db.session.rollback()
         raise ValueError('Schedule slug must be unique.')
     except Exception:
         db.session.rollback()
         raise
+    schedule_cache.invalidate_schedule(schedule.id)
+    return get_schedule(schedule.id, teacher_id)
 
 
 def delete_schedule(schedule_id: int, teacher_id: int) -> None:
@@ -617,18 +540,7 @@ def delete_schedule(schedule_id: int, teacher_id: int) -> None:
     except Exception:
         db.session.rollback()
         raise
-
-
-def _parse_datetime(value) -> datetime:
-    if isinstance(value, datetime):
-        return value
-    if isinstance(value, str):
-        normalized = value.replace('Z', '+00:00')
-        try:
-            return datetime.fromisoformat(normalized)
-        except ValueError as exc:
-            raise ValueError(f'Invalid datetime value: {value}') from exc
-    raise ValueError('Datetime value is required.')
+    schedule_cache.invalidate_schedule(schedule_id)
 
 
 def finalize_schedule(schedule_id: int, teacher_id: int, entries: List[dict]) -> Schedule:
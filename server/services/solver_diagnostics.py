@@ -0,0 +1,127 @@
+import logging
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+MetricsHook = Callable[[dict], None]
+
+_metrics_hook: Optional[MetricsHook] = None
+# Held by the one call tracing memory; ``tracemalloc`` is process-wide.
+_trace_lock = threading.Lock()
+
+
+def set_metrics_hook(hook: Optional[MetricsHook]) -> None:
+    """Receive the diagnostics of every generate call (``None`` removes the hook)."""
+
+    global _metrics_hook
+    _metrics_hook = hook
+
+
+def emit(diagnostics: 'GenerateDiagnostics') -> None:
+    hook = _metrics_hook
+    if hook is None:
+        return
+    try:
+        hook(diagnostics.to_dict())
+    except Exception:
+        # Metrics must never fail a generate call.
+        logger.exception('generate metrics hook failed')
+
+
+class GenerateDiagnostics:
+    """Phase timings and solver counters collected during one generate call.
+
+    ``lap`` charges the time since the previous lap to a phase, so the phases
+    partition the call's wall-clock time. Graph build and flow time are also
+    summed per network, because sub-problems may be solved in pool workers.
+    Peak memory comes from ``tracemalloc`` and is only measured when
+    ``trace_memory`` is set: tracing every allocation makes the solve more
+    than ten times slower (which the timings then include), and it only
+    covers this process, not pool workers. The tracing is process-wide, so
+    it slows every other thread too and another traced call would reset
+    this one's peak: ``measure`` refuses a second trace with ``RuntimeError``
+    while one runs, and the HTTP API does not offer it (it is for the CLI
+    and benchmarks).
+    """
+
+    def __init__(self, schedule_id: int, trace_memory: bool = False):
+        self.schedule_id = schedule_id
+        self.trace_memory = trace_memory
+        self.phase_seconds: Dict[str, float] = defaultdict(float)
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.engine: Optional[str] = None
+        self.cache_hit = False
+        self.networks = 0
+        self.nodes = 0
+        self.edges = 0
+        self.build_seconds = 0.0
+        self.flow_seconds = 0.0
+        self.peak_memory_bytes: Optional[int] = None
+        self.presolve: Optional[Dict[str, int]] = None
+        self.total_seconds = 0.0
+        self._lap_started = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phase_seconds[phase] += now - self._lap_started
+        self._lap_started = now
+
+    @contextmanager
+    def measure(self) -> Iterator[None]:
+        started_tracing = False
+        if self.trace_memory:
+            if not _trace_lock.acquire(blocking=False):
+                raise RuntimeError('Another generate call is already tracing memory.')
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                started_tracing = True
+        started = self._lap_started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.total_seconds = time.perf_counter() - started
+            if self.trace_memory:
+                self.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+                _trace_lock.release()
+
+    def add_network(self, stats: Mapping[str, float]) -> None:
+        """Fold in the ``network_stats`` of one solved flow network."""
+
+        self.networks += 1
+        self.nodes += int(stats['nodes'])
+        self.edges += int(stats['edges'])
+        self.build_seconds += stats['build_seconds']
+        self.flow_seconds += stats['solve_seconds']
+        for name, value in stats['counters'].items():
+            self.counters[name] += value
+
+    def to_dict(self) -> dict:
+        payload = {
+            'schedule_id': self.schedule_id,
+            'engine': self.engine,
+            'cache_hit': self.cache_hit,
+            'total_ms': round(self.total_seconds * 1000, 3),
+            'phases_ms': {name: round(seconds * 1000, 3) for name, seconds in self.phase_seconds.items()},
+            'networks': {
+                'count': self.networks,
+                'nodes': self.nodes,
+                'edges': self.edges,
+                'build_ms': round(self.build_seconds * 1000, 3),
+                'flow_ms': round(self.flow_seconds * 1000, 3),
+            },
+            'counters': dict(self.counters),
+        }
+        if self.presolve is not None:
+            payload['presolve'] = dict(self.presolve)
+        if self.peak_memory_bytes is not None:
+            payload['peak_memory_bytes'] = self.peak_memory_bytes
+        return payload
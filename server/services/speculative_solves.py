@@ -0,0 +1,179 @@
+import logging
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Dict, List, Optional, Tuple
+
+from . import generation_jobs, schedule_cache
+
+DEFAULT_DELAY_SECONDS = 5.0
+
+# Job options of a speculative solve; kept apart from any request's options
+# so a teacher's async generate never joins a job it did not ask for.
+_JOB_OPTIONS = {'speculative': True}
+
+logger = logging.getLogger(__name__)
+
+
+class SpeculativeSolves:
+    """Debounced background generate calls, at most one waiting per schedule.
+
+    ``schedule`` (re)starts a schedule's debounce and ``cancel`` stops it. One
+    watcher thread tracks every waiting schedule; once a schedule's delay
+    passes, its solve is submitted to the ``generation_jobs`` pool, so it
+    shares that pool's workers and ``max_pending`` limit with async generate
+    requests and is dropped when the queue is full. The solve is also only
+    submitted if the schedule's cache generation is still the one it was
+    scheduled at, so an edit that reached ``invalidate_schedule`` by another
+    path cancels it too. A submitted solve runs to completion: generate reads
+    the inputs as they are when it starts and caches the result under their
+    hash, so a result for inputs that changed meanwhile is never served for
+    the new ones.
+
+    Results only fill this process's result cache, so behind several web
+    workers the one that saw the edit rarely serves the generate. The feature
+    is meant for single-worker deployments and is off by default.
+    """
+
+    def __init__(
+        self,
+        delay_seconds: float = DEFAULT_DELAY_SECONDS,
+        enabled: bool = False,
+        context: Optional[Callable[[], ContextManager]] = None,
+        jobs: Optional[generation_jobs.GenerationJobs] = None,
+    ):
+        self.delay_seconds = delay_seconds
+        self.enabled = enabled
+        self._context = context
+        self._jobs = jobs if jobs is not None else generation_jobs.jobs
+        self._condition = threading.Condition()
+        self._waiting: Dict[int, Tuple[float, int, int, Callable[[], object]]] = {}
+        self._watcher: Optional[threading.Thread] = None
+        self.scheduled = 0
+        self.cancelled = 0
+        self.started = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def configure(
+        self,
+        delay_seconds: Optional[float] = None,
+        enabled: Optional[bool] = None,
+        context: Optional[Callable[[], ContextManager]] = None,
+    ) -> None:
+        """``context`` is entered around every solve, e.g. ``app.app_context``."""
+
+        with self._condition:
+            if delay_seconds is not None:
+                self.delay_seconds = delay_seconds
+            if enabled is not None:
+                self.enabled = enabled
+            if context is not None:
+                self._context = context
+
+    def schedule(self, schedule_id: int, teacher_id: int, run: Callable[[], object]) -> bool:
+        """Submit ``run`` once ``delay_seconds`` pass without another call for ``schedule_id``.
+
+        Returns whether a solve was scheduled.
+        """
+
+        if not self.enabled:
+            return False
+        generation = schedule_cache.result_cache.generation(schedule_id)
+        with self._condition:
+            self._cancel_locked(schedule_id)
+            due = time.monotonic() + self.delay_seconds
+            self._waiting[schedule_id] = (due, generation, teacher_id, run)
+            self.scheduled += 1
+            if self._watcher is None:
+                self._watcher = threading.Thread(target=self._watch, name='speculative-solves', daemon=True)
+                self._watcher.start()
+            self._condition.notify()
+        return True
+
+    def cancel(self, schedule_id: int) -> bool:
+        """Stop ``schedule_id``'s waiting solve; returns whether there was one."""
+
+        with self._condition:
+            return self._cancel_locked(schedule_id)
+
+    def pending(self, schedule_id: int) -> bool:
+        with self._condition:
+            return schedule_id in self._waiting
+
+    def stats(self) -> Dict[str, float]:
+        with self._condition:
+            return {
+                'enabled': self.enabled,
+                'delay_seconds': self.delay_seconds,
+                'pending': len(self._waiting),
+                'scheduled': self.scheduled,
+                'cancelled': self.cancelled,
+                'started': self.started,
+                'dropped': self.dropped,
+                'failed': self.failed,
+            }
+
+    def _cancel_locked(self, schedule_id: int) -> bool:
+        if self._waiting.pop(schedule_id, None) is None:
+            return False
+        self.cancelled += 1
+        return True
+
+    def _watch(self) -> None:
+        while True:
+            with self._condition:
+                due = self._take_due_locked()
+                if not due:
+                    next_due = min((entry[0] for entry in self._waiting.values()), default=None)
+                    timeout = None if next_due is None else max(next_due - time.monotonic(), 0.0)
+                    self._condition.wait(timeout)
+                    continue
+                context = self._context
+            for schedule_id, teacher_id, run in due:
+                self._submit(schedule_id, teacher_id, run, context)
+
+    def _take_due_locked(self) -> List[Tuple[int, int, Callable[[], object]]]:
+        now = time.monotonic()
+        due = []
+        for schedule_id, (deadline, generation, teacher_id, run) in list(self._waiting.items()):
+            if deadline > now:
+                continue
+            del self._waiting[schedule_id]
+            if schedule_cache.result_cache.generation(schedule_id) != generation:
+                self.cancelled += 1
+                continue
+            due.append((schedule_id, teacher_id, run))
+        return due
+
+    def _submit(
+        self,
+        schedule_id: int,
+        teacher_id: int,
+        run: Callable[[], object],
+        context: Optional[Callable[[], ContextManager]],
+    ) -> None:
+        def solve():
+            try:
+                with context() if context is not None else nullcontext():
+                    return run()
+            except Exception:
+                with self._condition:
+                    self.failed += 1
+                logger.exception('speculative solve of schedule %s failed', schedule_id)
+                raise
+
+        key = generation_jobs.make_job_key(schedule_id, teacher_id, _JOB_OPTIONS)
+        try:
+            _job, created = self._jobs.submit(key, schedule_id, teacher_id, solve)
+        except generation_jobs.JobQueueFullError:
+            with self._condition:
+                self.dropped += 1
+            logger.info('speculative solve of schedule %s dropped: generation queue is full', schedule_id)
+            return
+        if created:
+            with self._condition:
+                self.started += 1
+
+
+solves = SpeculativeSolves()
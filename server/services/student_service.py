@@ -3,6 +3,8 @@ from typing import List, Optional
 from extensions import db
 from models.models import Schedule, Student
 
+from . import schedule_cache, schedule_service
+
 
 def _get_student(student_id: int, teacher_id: int) -> Optional[Student]:
     return (
@@ -43,14 +45,16 @@ def create_student(data: dict, teacher_id: int) -> Student:
         lesson_length = 30
 
     student = Student(name=name, lesson_length=lesson_length, schedule_id=schedule.id)
+    schedule_service.mark_edited(schedule)
 
     try:
         db.session.add(student)
         db.session.commit()
-        return student
     except Exception:
         db.session.rollback()
         raise
+    schedule_cache.invalidate_schedule(schedule.id)
+    return student
 
 
 def update_student(student_id: int, teacher_id: int, data: dict) -> Student:
@@ -79,19 +83,26 @@ def update_student(student_id: int, teacher_id: int, data: dict) -> Student:
         except (TypeError, ValueError):
             raise ValueError('lesson_length must be an integer value.')
 
+    previous_schedule_id = student.schedule_id
+    schedule_service.mark_edited(student.schedule)
+
     if 'schedule_id' in data:
         new_schedule_id = data.get('schedule_id')
         schedule = Schedule.query.filter_by(id=new_schedule_id, teacher_id=teacher_id).first()
         if schedule is None:
             raise LookupError('Target schedule not found for this teacher.')
         student.schedule_id = schedule.id
+        schedule_service.mark_edited(schedule)
 
     try:
         db.session.commit()
-        return student
     except Exception:
         db.session.rollback()
         raise
+    schedule_cache.invalidate_schedule(student.schedule_id)
+    if previous_schedule_id != student.schedule_id:
+        schedule_cache.invalidate_schedule(previous_schedule_id)
+    return student
 
 
 def delete_student(student_id: int, teacher_id: int) -> None:
@@ -99,9 +110,13 @@ def delete_student(student_id: int, teacher_id: int) -> None:
     if student is None:
         raise LookupError('Student not found.')
 
+    schedule_id = student.schedule_id
+    schedule_service.mark_edited(student.schedule)
+
     try:
         db.session.delete(student)
         db.session.commit()
     except Exception:
         db.session.rollback()
         raise
+    schedule_cache.invalidate_schedule(schedule_id)
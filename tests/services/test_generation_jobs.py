@@ -0,0 +1,101 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from server.services import generation_jobs
+from server.services.generation_jobs import GenerationJobs, JobQueueFullError
+
+
+def _wait(job, timeout=5):
+    for _ in range(int(timeout / 0.01)):
+        if job.finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job.id} did not finish")
+
+
+def test_identical_submissions_coalesce_while_pending():
+    runner = GenerationJobs(max_workers=1)
+    release = threading.Event()
+    calls = []
+
+    def run():
+        calls.append(1)
+        release.wait(5)
+        return {"lessons": []}
+
+    first, created_first = runner.submit("key", 1, 42, run)
+    second, created_second = runner.submit("key", 1, 42, run)
+    other, created_other = runner.submit("other", 1, 42, lambda: {"lessons": ["x"]})
+
+    assert (created_first, created_second, created_other) == (True, False, True)
+    assert second is first and other is not first
+
+    release.set()
+    assert _wait(first).status == generation_jobs.SUCCEEDED
+    assert _wait(other).result == {"lessons": ["x"]}
+    assert len(calls) == 1
+    assert first.to_dict() == {
+        "job_id": first.id,
+        "schedule_id": 1,
+        "status": "succeeded",
+        "result": {"lessons": []},
+    }
+
+    again, created_again = runner.submit("key", 1, 42, run)
+    assert created_again and again is not first
+    _wait(again)
+
+
+def test_failed_job_reports_error_status():
+    runner = GenerationJobs()
+
+    def run():
+        raise ValueError("slot_minutes must be positive")
+
+    job, _created = runner.submit("key", 3, 42, run)
+
+    payload = _wait(job).to_dict()
+    assert payload["status"] == "failed"
+    assert payload["error"] == "slot_minutes must be positive"
+    assert payload["error_status"] == 400
+
+
+def test_submit_rejects_when_pending_limit_reached():
+    runner = GenerationJobs(max_workers=1, max_pending=1)
+    release = threading.Event()
+    job, _created = runner.submit("a", 1, 42, lambda: release.wait(5) and {})
+
+    with pytest.raises(JobQueueFullError):
+        runner.submit("b", 1, 42, dict)
+
+    release.set()
+    _wait(job)
+    _wait(runner.submit("b", 1, 42, dict)[0])
+
+
+def test_finished_jobs_are_trimmed_oldest_first():
+    runner = GenerationJobs(max_finished=2)
+    finished = [_wait(runner.submit(str(index), 1, 42, dict)[0]) for index in range(3)]
+
+    assert runner.get(finished[0].id) is None
+    assert [runner.get(job.id) for job in finished[1:]] == finished[1:]
+    assert runner.stats()["succeeded"] == 2
+
+
+def test_job_key_changes_when_schedule_is_invalidated():
+    options = {"slot_minutes": 30, "engine": None}
+    before = generation_jobs.make_job_key(9, 42, options)
+
+    assert generation_jobs.make_job_key(9, 42, dict(reversed(list(options.items())))) == before
+    assert generation_jobs.make_job_key(9, 43, options) != before
+
+    generation_jobs.schedule_cache.invalidate_schedule(9)
+    assert generation_jobs.make_job_key(9, 42, options) != before
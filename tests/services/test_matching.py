@@ -0,0 +1,24 @@
+import os
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from server.services import matching
+
+
+def test_hopcroft_karp_reroutes_greedy_choices():
+    # Greedy gives left 0 right 0 and strands left 1; one augmenting path fixes it.
+    size, match = matching.hopcroft_karp([[0, 1], [0], [2]], 3)
+
+    assert size == 3
+    assert match == [1, 0, 2]
+
+
+def test_hopcroft_karp_leaves_contended_and_isolated_vertices_unmatched():
+    size, match = matching.hopcroft_karp([[0], [0], [], [1, 2]], 3)
+
+    assert size == 2
+    assert match[2] == -1
+    assert sorted(match[:2]) == [-1, 0]
@@ -0,0 +1,83 @@
+import os
+import sys
+from datetime import date, datetime
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from server.services.schedule_cache import ResultCache, make_key
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _key(**parameters):
+    day = date(2024, 2, 1)
+    return make_key(
+        {day: [datetime(2024, 2, 1, 9, 0), datetime(2024, 2, 1, 10, 0)]},
+        {1: {datetime(2024, 2, 1, 9, 0)}},
+        [(1, "Student 1", 60)],
+        {day},
+        {"slot_minutes": 60, "gap_penalty": 5, **parameters},
+    )
+
+
+def test_make_key_ignores_input_order_but_not_parameters():
+    day = date(2024, 2, 1)
+    reordered = make_key(
+        {day: [datetime(2024, 2, 1, 10, 0), datetime(2024, 2, 1, 9, 0)]},
+        {1: [datetime(2024, 2, 1, 9, 0)]},
+        [(1, "Student 1", 60)],
+        [day],
+        {"gap_penalty": 5, "slot_minutes": 60},
+    )
+
+    assert reordered == _key()
+    assert _key(gap_penalty=6) != _key()
+
+
+def test_result_cache_evicts_least_recently_used_entry():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1, {"value": "a"})
+    cache.put("b", 1, {"value": "b"})
+    assert cache.get("a") == {"value": "a"}
+
+    cache.put("c", 2, {"value": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": "a"}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_result_cache_expires_entries_after_ttl():
+    clock = _Clock()
+    cache = ResultCache(ttl_seconds=10, clock=clock)
+    cache.put("a", 1, {"value": "a"})
+
+    clock.now = 10
+    assert cache.get("a") == {"value": "a"}
+    clock.now = 10.5
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 0)
+
+
+def test_result_cache_invalidates_every_entry_of_a_schedule():
+    cache = ResultCache()
+    cache.put("a", 1, {"value": "a"})
+    cache.put("b", 1, {"value": "b"})
+    cache.put("c", 2, {"value": "c"})
+
+    cache.invalidate_schedule(1)
+
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    assert cache.get("c") == {"value": "c"}
+    assert cache.stats()["invalidations"] == 2
@@ -0,0 +1,81 @@
+import os
+import random
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from server.services import interval_engine, schedule_core
+
+
+@pytest.mark.parametrize(
+    "cwd, imports",
+    [
+        (ROOT_DIR, "from server.services import schedule_core"),
+        # The command-line tools, as server/cli.py runs them, and a batch pool worker.
+        (
+            os.path.join(ROOT_DIR, "server"),
+            "import cli\nfrom services import batch_generate, network_export\nbatch_generate._init_worker()",
+        ),
+    ],
+)
+def test_schedule_core_imports_without_the_web_stack(cwd, imports):
+    code = (
+        "import sys\n"
+        f"{imports}\n"
+        "print(sorted(name for name in ('flask', 'flask_sqlalchemy', 'sqlalchemy', 'extensions', 'models')"
+        " if name in sys.modules))\n"
+    )
+    completed = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True, check=True)
+    assert completed.stdout.strip() == "[]"
+
+
+def test_core_builds_slots_and_solves_without_stubs():
+    first_day = datetime(2024, 7, 1, 9, 0)
+    second_day = first_day + timedelta(days=1)
+    teacher_slots = {
+        first_day.date(): [first_day, first_day + timedelta(hours=1)],
+        second_day.date(): [second_day],
+    }
+    student_slots = {1: {first_day}, 2: {first_day, first_day + timedelta(hours=1)}, 3: {second_day}}
+    matrix = schedule_core._AvailabilityMatrix.build(
+        teacher_slots, student_slots, [1, 2, 3], schedule_core._parse_schedule_days('["2024-07-01", "2024-07-02"]')
+    )
+    day_slot_map, slot_metadata, slot_students = schedule_core._build_candidate_slots(matrix, timedelta(hours=1))
+    problem = schedule_core._SubProblem(
+        day_slot_map, slot_metadata, slot_students, [1, 2, 3], list(range(len(slot_metadata)))
+    )
+
+    solution = schedule_core._solve_sub_problem(problem, 10_000, 5, "ssp")
+
+    assert solution.flow == 3
+    assert solution.cost == 2 * 10_000 + 5
+    assert sorted(student_id for _slot_id, student_id in solution.assignments) == [1, 2, 3]
+
+
+def test_interval_search_proves_small_schedules_the_bound_leaves_open():
+    rng = random.Random(3)
+    days = [datetime(2024, 7, 8, 9, 0) + timedelta(days=offset) for offset in range(2)]
+    starts = [day + timedelta(minutes=15 * step) for day in days for step in range(12)]
+    lesson_minutes = {student_id: rng.choice((30, 45, 60)) for student_id in range(1, 9)}
+    student_slots = {student_id: set(rng.sample(starts, 6)) for student_id in lesson_minutes}
+    model = interval_engine.IntervalModel(
+        {day.date(): [start for start in starts if start.date() == day.date()] for day in days},
+        student_slots,
+        lesson_minutes,
+        {day.date() for day in days},
+    )
+    assert not model.fixed_slots
+
+    # One relaxation leaves the bound loose, so only the search can prove the schedule.
+    searched = interval_engine.solve(model, 10_000, 5, max_iterations=1)
+    relaxed = interval_engine.solve(model, 10_000, 5)
+
+    assert searched.optimal and searched.cost_gap_bound == 0
+    assert searched.counters["search_nodes"] >= 1
+    assert (searched.scheduled_count, searched.cost) == (relaxed.scheduled_count, relaxed.cost)
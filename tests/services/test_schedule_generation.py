@@ -1,6 +1,13 @@
+import importlib.util
 import json
+import io
+import itertools
+import multiprocessing
+import random
 import os
+import subprocess
 import sys
+import time
 from datetime import datetime, timedelta
 from types import ModuleType, SimpleNamespace
 
@@ -65,7 +72,7 @@ models_models.FinalizedSchedule = _FinalizedSchedule
 sys.modules["models.models"] = models_models
 setattr(sys.modules["models"], "models", models_models)
 
-from server.services import schedule_service
+from server.services import feasibility_service, schedule_core, schedule_service
 
 
 class _QueryStub:
@@ -104,6 +111,23 @@ def _patch_schedule(monkeypatch, schedule):
     mapping = {schedule.id: schedule}
     stub = SimpleNamespace(query=_QueryStub(mapping))
     monkeypatch.setattr(schedule_service, "Schedule", stub)
+    # Stand-ins for the narrow SELECTs, serving the same rows from the namespace.
+    monkeypatch.setattr(
+        schedule_service,
+        "_fetch_student_rows",
+        lambda schedule_id: [
+            schedule_service._StudentRow(student.id, student.lesson_length, student.name)
+            for student in mapping[schedule_id].students
+        ],
+    )
+    monkeypatch.setattr(
+        schedule_service,
+        "_fetch_availability_rows",
+        lambda schedule_id: [
+            (availability.student_id, availability.teacher_id, availability.start_time)
+            for availability in mapping[schedule_id].availabilities
+        ],
+    )
 
 
 @pytest.fixture
@@ -111,6 +135,13 @@ def teacher_id():
     return 42
 
 
+@pytest.fixture(autouse=True)
+def _empty_result_cache():
+    schedule_service.schedule_cache.result_cache.clear()
+    yield
+    schedule_service.schedule_cache.result_cache.clear()
+
+
 def test_generate_schedule_prefers_fewer_days(monkeypatch, teacher_id):
     day_one_start = datetime(2024, 1, 1, 9, 0)
     day_two_start = datetime(2024, 1, 2, 9, 0)
@@ -265,3 +296,1222 @@ def test_generate_schedule_avoids_overlapping_lessons(monkeypatch, teacher_id):
         assert end <= next_start
 
     assert result["unscheduled_student_ids"] == [2]
+
+
+@pytest.mark.parametrize("engine", ["ssp", "cost_scaling"])
+def test_generate_schedule_spills_onto_second_day(monkeypatch, teacher_id, engine):
+    day_one_start = datetime(2024, 1, 8, 9, 0)
+    day_two_start = datetime(2024, 1, 9, 9, 0)
+    start_times = [
+        day_start + timedelta(hours=offset)
+        for day_start in (day_one_start, day_two_start)
+        for offset in range(3)
+    ]
+
+    students = [_make_student(student_id) for student_id in range(1, 6)]
+
+    availabilities = [_make_teacher_availability(start, teacher_id) for start in start_times]
+    availabilities.extend(
+        _make_student_availability(start, student.id)
+        for student in students
+        for start in start_times
+    )
+
+    schedule = SimpleNamespace(
+        id=5,
+        teacher_id=teacher_id,
+        days=json.dumps([day_one_start.date().isoformat(), day_two_start.date().isoformat()]),
+        dates=[day_one_start.date().isoformat(), day_two_start.date().isoformat()],
+        students=students,
+        availabilities=availabilities,
+    )
+
+    _patch_schedule(monkeypatch, schedule)
+
+    result = schedule_service.generate_schedule(5, slot_minutes=60, gap_penalty=5, engine=engine)
+
+    assert result["engine"] == engine
+    assert result["scheduled_count"] == 5
+    assert result["unscheduled_student_ids"] == []
+    assert result["objective_cost"] == 2 * 10_000 + 2 * 5 + 20
+    assert len({lesson["start_time"] for lesson in result["lessons"]}) == 5
+
+
+@pytest.mark.parametrize("engine", ["ssp", "cost_scaling"])
+def test_generate_schedule_fills_greedily_past_time_budget(monkeypatch, teacher_id, engine):
+    day_one_start = datetime(2024, 1, 8, 9, 0)
+    day_two_start = datetime(2024, 1, 9, 9, 0)
+    start_times = [
+        day_start + timedelta(hours=offset)
+        for day_start in (day_one_start, day_two_start)
+        for offset in range(3)
+    ]
+    students = [_make_student(student_id) for student_id in range(1, 6)]
+    availabilities = [_make_teacher_availability(start, teacher_id) for start in start_times]
+    availabilities.extend(
+        _make_student_availability(start, student.id)
+        for student in students
+        for start in start_times
+    )
+    schedule = SimpleNamespace(
+        id=10,
+        teacher_id=teacher_id,
+        days=json.dumps([day_one_start.date().isoformat(), day_two_start.date().isoformat()]),
+        dates=[day_one_start.date().isoformat(), day_two_start.date().isoformat()],
+        students=students,
+        availabilities=availabilities,
+    )
+    _patch_schedule(monkeypatch, schedule)
+
+    solve = schedule_core._SOLVER_ENGINES[engine]
+
+    def late_solve(network, max_flow):
+        time.sleep(0.02)
+        return solve(network, max_flow)
+
+    monkeypatch.setitem(schedule_core._SOLVER_ENGINES, engine, late_solve)
+    cache = schedule_service.schedule_cache.result_cache
+
+    rushed = schedule_service.generate_schedule(10, slot_minutes=60, engine=engine, time_budget_ms=1)
+
+    assert rushed["optimal"] is False
+    assert rushed["scheduled_count"] == 5
+    assert len({lesson["start_time"] for lesson in rushed["lessons"]}) == 5
+    # Greedy fills one day, then the next; here that happens to be optimal.
+    assert rushed["objective_cost"] == 2 * 10_000 + 2 * 5 + 20
+    assert rushed["cost_gap_bound"] == 0
+
+    hits = cache.hits
+    relaxed = schedule_service.generate_schedule(10, slot_minutes=60, engine=engine, time_budget_ms=60_000)
+    assert cache.hits == hits
+    assert relaxed["optimal"] is True
+    assert "cost_gap_bound" not in relaxed
+    assert schedule_service.generate_schedule(10, slot_minutes=60, engine=engine, time_budget_ms=60_000) == relaxed
+    assert cache.hits == hits + 1
+
+    with pytest.raises(ValueError):
+        schedule_service.generate_schedule(10, slot_minutes=60, time_budget_ms=0)
+
+
+def test_sweep_schedule_matches_generate_for_every_parameter_set(monkeypatch, teacher_id):
+    day_one_start = datetime(2024, 1, 8, 9, 0)
+    day_two_start = datetime(2024, 1, 9, 9, 0)
+    start_times = [
+        day_start + timedelta(hours=offset)
+        for day_start in (day_one_start, day_two_start)
+        for offset in (0, 1, 3)
+    ]
+    students = [_make_student(student_id) for student_id in range(1, 6)]
+    availabilities = [_make_teacher_availability(start, teacher_id) for start in start_times]
+    availabilities.extend(
+        _make_student_availability(start, student.id)
+        for student in students
+        for start in start_times
+    )
+    schedule = SimpleNamespace(
+        id=11,
+        teacher_id=teacher_id,
+        days=json.dumps([day_one_start.date().isoformat(), day_two_start.date().isoformat()]),
+        dates=[day_one_start.date().isoformat(), day_two_start.date().isoformat()],
+        students=students,
+        availabilities=availabilities,
+    )
+    _patch_schedule(monkeypatch, schedule)
+    parameter_sets = [{"day_open_cost": 10_000}, {"day_open_cost": 0, "gap_penalty": 1}]
+
+    sweep = schedule_service.sweep_schedule(11, parameter_sets, slot_minutes=60)
+
+    assert sweep["engine"] == "ssp"
+    first, second = sweep["results"]
+    assert (first["day_open_cost"], first["gap_penalty"]) == (10_000, 5)
+    assert (first["day_count"], first["unscheduled_count"]) == (2, 0)
+    # Five lessons on two days leave one of them with the 11:00-12:00 hole.
+    assert first["total_gap_minutes"] == second["total_gap_minutes"] == 60
+    assert second["objective_cost"] == 0 + 0 + 1 + 1 + 4
+
+    # Sweep results are cached apart from generate's: generate solves for itself.
+    cache = schedule_service.schedule_cache.result_cache
+    hits = cache.hits
+    for parameters, result in zip(parameter_sets, sweep["results"]):
+        generated = schedule_service.generate_schedule(11, slot_minutes=60, **parameters)
+        assert {key: result[key] for key in generated} == generated
+    assert cache.hits == hits
+    assert schedule_service.sweep_schedule(11, parameter_sets, slot_minutes=60) == sweep
+    assert cache.hits == hits + 2
+
+    with pytest.raises(ValueError):
+        schedule_service.sweep_schedule(11, [])
+    with pytest.raises(ValueError):
+        schedule_service.sweep_schedule(11, [{"gap_penalty": -1}])
+
+
+def test_generate_schedule_returns_distinct_alternatives(monkeypatch, teacher_id):
+    day_start = datetime(2024, 1, 15, 9, 0)
+    nine, ten, eleven = (day_start + timedelta(hours=offset) for offset in range(3))
+    students = [_make_student(1), _make_student(2)]
+    availabilities = [_make_teacher_availability(start, teacher_id) for start in (nine, ten, eleven)]
+    availabilities.extend(
+        [
+            _make_student_availability(nine, 1),
+            _make_student_availability(ten, 1),
+            _make_student_availability(ten, 2),
+            _make_student_availability(eleven, 2),
+        ]
+    )
+    schedule = SimpleNamespace(
+        id=12,
+        teacher_id=teacher_id,
+        days=json.dumps([day_start.date().isoformat()]),
+        dates=[day_start.date().isoformat()],
+        students=students,
+        availabilities=availabilities,
+    )
+    _patch_schedule(monkeypatch, schedule)
+
+    result = schedule_service.generate_schedule(12, slot_minutes=60, k=3, diagnostics=True)
+
+    assert result["objective_cost"] == 10_000 + 5
+    assert [lesson["start_time"] for lesson in result["lessons"]] == [nine.isoformat(), ten.isoformat()]
+    alternatives = result["alternatives"]
+    # Moving student 2 to 11:00 costs 20 - 5 more; moving both students up costs 20 more.
+    assert [alternative["objective_cost"] for alternative in alternatives] == [10_000 + 20, 10_000 + 5 + 20]
+    assert [[lesson["start_time"] for lesson in alternative["lessons"]] for alternative in alternatives] == [
+        [nine.isoformat(), eleven.isoformat()],
+        [ten.isoformat(), eleven.isoformat()],
+    ]
+    assert all(alternative["scheduled_count"] == 2 for alternative in alternatives)
+    assert result["diagnostics"]["counters"]["cycle_searches"] == 2
+
+    assert "alternatives" not in schedule_service.generate_schedule(12, slot_minutes=60)
+    with pytest.raises(ValueError):
+        schedule_service.generate_schedule(12, slot_minutes=60, k=0)
+
+
+@pytest.mark.parametrize("engine", ["ssp", "cost_scaling"])
+def test_generate_schedule_presolves_forced_and_unschedulable_students(monkeypatch, teacher_id, engine):
+    day_start = datetime(2024, 1, 16, 9, 0)
+    nine, ten, eleven, noon = (day_start + timedelta(hours=offset) for offset in range(4))
+    students = [_make_student(student_id) for student_id in range(1, 6)]
+    availabilities = [_make_teacher_availability(start, teacher_id) for start in (nine, ten, eleven, noon)]
+    availabilities.extend(
+        _make_student_availability(start, student_id)
+        for student_id, starts in {1: [nine], 2: [nine, ten], 3: [nine], 4: [eleven, noon], 5: [eleven, noon]}.items()
+        for start in starts
+    )
+    schedule = SimpleNamespace(
+        id=13,
+        teacher_id=teacher_id,
+        days=json.dumps([day_start.date().isoformat()]),
+        dates=[day_start.date().isoformat()],
+        students=students,
+        availabilities=availabilities,
+    )
+    _patch_schedule(monkeypatch, schedule)
+
+    result = schedule_service.generate_schedule(13, slot_minutes=60, engine=engine, diagnostics=True)
+
+    # 1 takes 9:00, which leaves 2 only 10:00 and 3 nothing; 4 and 5 are left to the solver.
+    assert result["diagnostics"]["presolve"] == {
+        "students": 5,
+        "slots": 4,
+        "forced": 2,
+        "unschedulable": 1,
+        "dropped_slots": 0,
+        "max_scheduled": 4,
+        "remaining_students": 2,
+        "remaining_slots": 2,
+    }
+    assert result["diagnostics"]["networks"]["nodes"] == 1 + 1 + 2 + 2 + 1
+    assert result["scheduled_count"] == 4
+    assert result["unscheduled_student_ids"] == [3]
+    assert [lesson["student_id"] for lesson in result["lessons"][:2]] == [1, 2]
+    assert result["objective_cost"] == 10_000 + 5 * (0 + 1 + 4 + 9)
+
+    # The forced lessons already pay for the day, in the sweep's networks too.
+    parameter_sets = [{}, {"day_open_cost": 500, "gap_penalty": 1}]
+    sweep = schedule_service.sweep_schedule(13, parameter_sets, slot_minutes=60, engine=engine)
+    schedule_service.schedule_cache.result_cache.clear()
+    for parameters, swept in zip(parameter_sets, sweep["results"]):
+        generated = schedule_service.generate_schedule(13, slot_minutes=60, engine=engine, **parameters)
+        assert {key: swept[key] for key in generated} == generated
+
+
+def test_generate_schedule_auto_engine_runs_ssp(monkeypatch, teacher_id):
+    day_start = datetime(2024, 1, 10, 9, 0)
+    students = [_make_student(1), _make_student(2)]
+    availabilities = [
+        _make_teacher_availability(day_start, teacher_id),
+        _make_teacher_availability(day_start + timedelta(hours=1), teacher_id),
+        _make_student_availability(day_start, 1),
+        _make_student_availability(day_start, 2),
+        _make_student_availability(day_start + timedelta(hours=1), 2),
+    ]
+    schedule = SimpleNamespace(
+        id=6,
+        teacher_id=teacher_id,
+        days=json.dumps([day_start.date().isoformat()]),
+        dates=[day_start.date().isoformat()],
+        students=students,
+        availabilities=availabilities,
+    )
+    _patch_schedule(monkeypatch, schedule)
+
+    auto = schedule_service.generate_schedule(6, slot_minutes=60)
+    scaled = schedule_service.generate_schedule(6, slot_minutes=60, engine="cost_scaling")
+
+    assert (auto["engine"], scaled["engine"]) == ("ssp", "cost_scaling")
+    assert scaled["lessons"] == auto["lessons"]
+    assert scaled["objective_cost"] == auto["objective_cost"] == 10_000 + 5
+
+    with pytest.raises(ValueError):
+        schedule_service.generate_schedule(6, slot_minutes=60, engine="simplex")
+    with pytest.raises(ValueError):
+        schedule_service.generate_schedule(6, slot_minutes=60, engine="cost_scaling", incremental=True)
+
+
+def test_availability_matrix_filters_to_teacher_times_on_schedule_days():
+    day_start = datetime(2024, 1, 10, 9, 0)
+    outside_day = day_start + timedelta(days=1)
+
+    teacher_slots = {
+        day_start.date(): [day_start, day_start + timedelta(hours=1), day_start],
+        outside_day.date(): [outside_day],
+    }
+    student_slots = {
+        1: {day_start, outside_day},
+        2: {day_start, day_start + timedelta(hours=3)},
+        7: {day_start + timedelta(hours=1)},
+    }
+
+    matrix = schedule_core._AvailabilityMatrix.build(
+        teacher_slots,
+        student_slots,
+        [1, 2, 3],
+        {day_start.date()},
+    )
+
+    assert list(matrix.times) == [day_start.date()]
+    assert matrix.times[day_start.date()] == [day_start, day_start + timedelta(hours=1)]
+    assert matrix.students_at(day_start.date(), 0) == [1, 2]
+    assert matrix.students_at(day_start.date(), 1) == []
+    # Rows 0 and 1 (students 1 and 2) at 9:00; nobody at 10:00, since
+    # student 7 has no row.
+    assert matrix.columns[day_start.date()] == [0b11, 0]
+
+
+def test_split_components_groups_students_that_share_a_day():
+    monday = datetime(2024, 1, 15, 9, 0)
+    tuesday = monday + timedelta(days=1)
+    saturday = monday + timedelta(days=5)
+    day_slot_map = {monday.date(): [0, 1], tuesday.date(): [2], saturday.date(): [3]}
+    slot_metadata = {
+        0: (monday.date(), monday, 0),
+        1: (monday.date(), monday + timedelta(hours=1), 1),
+        2: (tuesday.date(), tuesday, 0),
+        3: (saturday.date(), saturday, 0),
+    }
+    # Students 1 and 2 never share a slot, but they share Monday; student 2
+    # pulls Tuesday in through student 3.
+    slot_students = {0: [1], 1: [2, 3], 2: [3], 3: [4]}
+
+    problems = schedule_core._split_components(day_slot_map, slot_metadata, slot_students, [4, 3, 2, 1, 5])
+
+    assert [list(problem.day_slot_map) for problem in problems] == [
+        [monday.date(), tuesday.date()],
+        [saturday.date()],
+    ]
+    assert [problem.student_ids for problem in problems] == [[3, 2, 1], [4]]
+    assert [problem.slot_ids for problem in problems] == [[0, 1, 2], [3]]
+    assert problems[0].day_slot_map[tuesday.date()] == [2]
+    assert problems[1].slot_metadata == {0: slot_metadata[3]}
+
+
+def test_generate_schedule_solves_components_in_process_pool(monkeypatch, teacher_id):
+    weekday = datetime(2024, 1, 17, 9, 0)
+    weekend = datetime(2024, 1, 20, 9, 0)
+    start_times = [day + timedelta(hours=offset) for day in (weekday, weekend) for offset in range(3)]
+    students = [_make_student(student_id) for student_id in range(1, 6)]
+    availabilities = [_make_teacher_availability(start, teacher_id) for start in start_times]
+    availabilities.extend(
+        _make_student_availability(start, student.id)
+        for student in students
+        for start in (start_times[:3] if student.id <= 3 else start_times[3:])
+    )
+    schedule = SimpleNamespace(
+        id=8,
+        teacher_id=teacher_id,
+        days=json.dumps([weekday.date().isoformat(), weekend.date().isoformat()]),
+        dates=[weekday.date().isoformat(), weekend.date().isoformat()],
+        students=students,
+        availabilities=availabilities,
+    )
+    _patch_schedule(monkeypatch, schedule)
+    monkeypatch.setattr(schedule_core, "_PARALLEL_MIN_ARCS", 0)
+    for name in ("_component_workers", "_component_context", "_component_pool"):
+        monkeypatch.setattr(schedule_core, name, getattr(schedule_core, name))
+
+    schedule_core.configure_component_pool(1)
+    serial = schedule_service.generate_schedule(8, slot_minutes=60)
+    schedule_service.schedule_cache.result_cache.clear()
+
+    submitted = []
+    schedule_core.configure_component_pool(2, multiprocessing.get_context("fork"))
+    try:
+        pool = schedule_core._get_component_pool()
+        submit = pool.submit
+        monkeypatch.setattr(pool, "submit", lambda *args: submitted.append(args) or submit(*args))
+        parallel = schedule_service.generate_schedule(8, slot_minutes=60)
+    finally:
+        schedule_core.configure_component_pool(1)
+
+    assert len(submitted) == 2
+    assert parallel == serial
+    assert serial["scheduled_count"] == 5
+    assert serial["objective_cost"] == 2 * 10_000 + (0 + 5 + 20) + (0 + 5)
+
+
+def test_incremental_generate_only_reroutes_displaced_students(monkeypatch, teacher_id):
+    day_start = datetime(2024, 1, 11, 9, 0)
+    hours = [day_start + timedelta(hours=offset) for offset in range(4)]
+
+    students = [_make_student(1), _make_student(2), _make_student(3)]
+    teacher_availabilities = [_make_teacher_availability(start, teacher_id) for start in hours]
+    student_availabilities = [
+        _make_student_availability(hours[0], 1),
+        _make_student_availability(hours[1], 1),
+        _make_student_availability(hours[0], 2),
+        _make_student_availability(hours[1], 2),
+        _make_student_availability(hours[2], 2),
+        _make_student_availability(hours[2], 3),
+        _make_student_availability(hours[3], 3),
+    ]
+
+    schedule = SimpleNamespace(
+        id=6,
+        teacher_id=teacher_id,
+        days=json.dumps([day_start.date().isoformat()]),
+        dates=[day_start.date().isoformat()],
+        students=students,
+        availabilities=teacher_availabilities + student_availabilities,
+    )
+    _patch_schedule(monkeypatch, schedule)
+    monkeypatch.setattr(schedule_core, "_warm_starts", schedule_core.OrderedDict())
+
+    first = schedule_service.generate_schedule(6, slot_minutes=60, incremental=True)
+    assert first["scheduled_count"] == 3
+    assert first["objective_cost"] == 10_000 + 5 * (0 + 1 + 4)
+
+    # The teacher blocks out 10:00, which one of the first two students was using.
+    schedule.availabilities = [
+        availability
+        for availability in schedule.availabilities
+        if not (availability.teacher_id and availability.start_time == hours[1])
+    ]
+
+    requested_flows = []
+    solve = schedule_core._MinCostFlow.successive_shortest_path
+
+    def recording_solve(self, source, sink, max_flow, day_states, potential=None, deadline=None):
+        requested_flows.append(max_flow)
+        return solve(self, source, sink, max_flow, day_states, potential, deadline)
+
+    monkeypatch.setattr(schedule_core._MinCostFlow, "successive_shortest_path", recording_solve)
+
+    warm = schedule_service.generate_schedule(6, slot_minutes=60, incremental=True)
+    assert requested_flows == [1]
+    cold = schedule_service.generate_schedule(6, slot_minutes=60)
+
+    # Without 10:00 every student has one slot left, so presolve places them all.
+    assert requested_flows == [1]
+    assert warm == cold
+    assert [lesson["student_id"] for lesson in warm["lessons"]] == [1, 2, 3]
+
+
+def test_generate_schedule_serves_repeat_calls_from_cache(monkeypatch, teacher_id):
+    day_start = datetime(2024, 1, 12, 9, 0)
+
+    students = [_make_student(1), _make_student(2)]
+    availabilities = [
+        _make_teacher_availability(day_start, teacher_id),
+        _make_teacher_availability(day_start + timedelta(hours=1), teacher_id),
+        _make_student_availability(day_start, 1),
+        _make_student_availability(day_start + timedelta(hours=1), 1),
+        _make_student_availability(day_start, 2),
+        _make_student_availability(day_start + timedelta(hours=1), 2),
+    ]
+    schedule = SimpleNamespace(
+        id=7,
+        teacher_id=teacher_id,
+        days=json.dumps([day_start.date().isoformat()]),
+        dates=[day_start.date().isoformat()],
+        students=students,
+        availabilities=availabilities,
+    )
+    _patch_schedule(monkeypatch, schedule)
+
+    cache = schedule_service.schedule_cache.result_cache
+    hits, misses = cache.hits, cache.misses
+
+    first = schedule_service.generate_schedule(7, slot_minutes=60)
+
+    def fail_solve(*_args, **_kwargs):  # pragma: no cover - only reached on a cache miss
+        raise AssertionError("cached generate should not solve again")
+
+    monkeypatch.setattr(schedule_core._MinCostFlow, "successive_shortest_path", fail_solve)
+    second = schedule_service.generate_schedule(7, slot_minutes=60)
+
+    assert second == first
+    assert (cache.hits - hits, cache.misses - misses) == (1, 1)
+
+    second["lessons"].clear()
+    assert schedule_service.generate_schedule(7, slot_minutes=60) == first
+
+    schedule_service.schedule_cache.invalidate_schedule(7)
+    with pytest.raises(AssertionError):
+        schedule_service.generate_schedule(7, slot_minutes=60)
+
+
+def test_generate_schedule_reports_diagnostics_and_feeds_metrics_hook(monkeypatch, teacher_id):
+    day_start = datetime(2024, 1, 22, 9, 0)
+    students = [_make_student(1), _make_student(2)]
+    availabilities = [
+        _make_teacher_availability(day_start, teacher_id),
+        _make_teacher_availability(day_start + timedelta(hours=1), teacher_id),
+        _make_student_availability(day_start, 1),
+        _make_student_availability(day_start + timedelta(hours=1), 1),
+        _make_student_availability(day_start, 2),
+        _make_student_availability(day_start + timedelta(hours=1), 2),
+    ]
+    schedule = SimpleNamespace(
+        id=9,
+        teacher_id=teacher_id,
+        days=json.dumps([day_start.date().isoformat()]),
+        dates=[day_start.date().isoformat()],
+        students=students,
+        availabilities=availabilities,
+    )
+    _patch_schedule(monkeypatch, schedule)
+    reported = []
+    monkeypatch.setattr(schedule_core.solver_diagnostics, "_metrics_hook", reported.append)
+
+    plain = schedule_service.generate_schedule(9, slot_minutes=60, engine="ssp")
+    schedule_service.schedule_cache.result_cache.clear()
+    result = schedule_service.generate_schedule(9, slot_minutes=60, engine="ssp", diagnostics=True)
+    cached = schedule_service.generate_schedule(9, slot_minutes=60, engine="ssp", diagnostics=True)
+
+    assert "diagnostics" not in plain
+    diagnostics = result.pop("diagnostics")
+    assert result == plain
+    assert set(diagnostics["phases_ms"]) == {"load", "cache", "presolve", "filter", "solve", "payload"}
+    assert diagnostics["presolve"]["forced"] == 0
+    assert diagnostics["presolve"]["max_scheduled"] == 2
+    assert diagnostics["networks"]["count"] == 1
+    # source, day, 2 slots, 2 students, sink; 2 day arcs + 2 slot arcs + 4 student arcs + 2 sink arcs.
+    assert diagnostics["networks"]["nodes"] == 7
+    assert diagnostics["networks"]["edges"] == 2 * 10
+    assert diagnostics["counters"]["augmentations"] == 2
+    assert diagnostics["counters"]["heap_pops"] >= diagnostics["counters"]["dijkstra_runs"] == 2
+    assert "peak_memory_bytes" not in diagnostics
+
+    assert cached["diagnostics"]["cache_hit"] is True
+    assert cached["diagnostics"]["networks"]["count"] == 0
+    assert [entry["cache_hit"] for entry in reported] == [False, False, True]
+    assert reported[1] == diagnostics
+
+
+def test_feasibility_tracker_stays_maximum_across_availability_edits(monkeypatch, teacher_id):
+    rng = random.Random(3)
+    days = [datetime(2024, 2, 5, 9, 0) + timedelta(days=offset) for offset in range(3)]
+    # Quarter-hour teacher times with 30 minute lessons, so student edits shift the slot grid.
+    teacher_times = [day + timedelta(minutes=15 * step) for day in days for step in range(8)]
+    students = [_make_student(student_id, lesson_length=30) for student_id in range(1, 13)]
+    student_times = {student.id: set(rng.sample(teacher_times, 3)) for student in students}
+
+    def make_schedule():
+        availabilities = [_make_teacher_availability(start, teacher_id) for start in teacher_times]
+        for student_id, starts in student_times.items():
+            availabilities.extend(_make_student_availability(start, student_id) for start in starts)
+        return SimpleNamespace(
+            id=14,
+            teacher_id=teacher_id,
+            days=json.dumps([day.date().isoformat() for day in days]),
+            dates=[],
+            students=students,
+            availabilities=availabilities,
+            version=0,
+        )
+
+    def build_tracker():
+        schedule = make_schedule()
+        _patch_schedule(monkeypatch, schedule)
+        return feasibility_service._build_tracker(schedule, 0)
+
+    tracker = build_tracker()
+    for step in range(40):
+        if step % 10 == 9:
+            teacher_times = sorted(rng.sample(teacher_times, len(teacher_times) - 2))
+            teacher_rows = [(None, teacher_id, start) for start in teacher_times]
+            tracker.replace_teacher(schedule_service._slots_from_rows(teacher_rows, teacher_id)[0])
+        else:
+            student_id = rng.choice(students).id
+            student_times[student_id] = set(rng.sample(teacher_times, rng.randint(0, 4)))
+            tracker.replace_student(student_id, student_times[student_id])
+
+        fresh = build_tracker()
+        assert tracker.slots == fresh.slots
+        assert tracker.matched_count == fresh.matched_count
+        assert all(start in student_times[student_id] for student_id, start in tracker.match_student.items())
+
+    _patch_schedule(monkeypatch, make_schedule())
+    result = schedule_service.generate_schedule(14, engine="ssp")
+    assert tracker.to_dict()["matched_count"] == result["scheduled_count"]
+    assert len(tracker.to_dict()["unmatchable_student_ids"]) == len(result["unscheduled_student_ids"])
+
+
+def test_feasibility_endpoint_service_applies_replacements_without_rebuilding(monkeypatch, teacher_id):
+    day_start = datetime(2024, 2, 12, 9, 0)
+    students = [_make_student(1), _make_student(2)]
+    availabilities = [
+        _make_teacher_availability(day_start, teacher_id),
+        _make_teacher_availability(day_start + timedelta(hours=1), teacher_id),
+        _make_student_availability(day_start, 1),
+        _make_student_availability(day_start, 2),
+    ]
+    schedule = SimpleNamespace(
+        id=15,
+        teacher_id=teacher_id,
+        days=json.dumps([day_start.date().isoformat()]),
+        dates=[],
+        students=students,
+        availabilities=availabilities,
+        version=7,
+    )
+    _patch_schedule(monkeypatch, schedule)
+    monkeypatch.setattr(feasibility_service, "Schedule", SimpleNamespace(query=_QueryStub({15: schedule})))
+    monkeypatch.setattr(feasibility_service, "_trackers", {})
+
+    def edit():
+        # What an edit's schedule_service.mark_edited leaves behind once committed.
+        since = schedule.version
+        schedule.version = since + 1
+        return since
+
+    first = feasibility_service.get_feasibility(15, teacher_id)
+    assert (first["matched_count"], first["unmatchable_student_ids"], first["feasible"]) == (1, [2], False)
+    assert first["approximate"] is False
+    with pytest.raises(PermissionError):
+        feasibility_service.get_feasibility(15, teacher_id + 1)
+
+    build_tracker = feasibility_service._build_tracker
+
+    def fail_build(*_args, **_kwargs):  # pragma: no cover - only reached on a rebuild
+        raise AssertionError("replacements should update the live tracker")
+
+    monkeypatch.setattr(feasibility_service, "_build_tracker", fail_build)
+    feasibility_service.student_availability_replaced(schedule, edit(), 2, [day_start + timedelta(hours=1)])
+    second = feasibility_service.get_feasibility(15, teacher_id)
+    assert (second["matched_count"], second["unmatchable_student_ids"], second["feasible"]) == (2, [], True)
+
+    feasibility_service.teacher_availability_replaced(schedule, edit(), [day_start])
+    assert feasibility_service.get_feasibility(15, teacher_id)["unmatchable_student_ids"] == [2]
+
+    # An edit from another worker only moves the version, so this tracker is
+    # behind and the next replacement here drops it for a rebuild.
+    edit()
+    feasibility_service.student_availability_replaced(schedule, edit(), 1, [])
+    assert 15 not in feasibility_service._trackers
+    monkeypatch.setattr(feasibility_service, "_build_tracker", build_tracker)
+    assert feasibility_service.get_feasibility(15, teacher_id)["matched_count"] == 1
+
+    # So is one whose replacement committed together with another worker's.
+    since = edit()
+    edit()
+    monkeypatch.setattr(feasibility_service, "_build_tracker", fail_build)
+    feasibility_service.student_availability_replaced(schedule, since, 1, [])
+    assert 15 not in feasibility_service._trackers
+    monkeypatch.setattr(feasibility_service, "_build_tracker", build_tracker)
+    assert feasibility_service.get_feasibility(15, teacher_id)["matched_count"] == 1
+
+    availabilities.append(_make_student_availability(day_start + timedelta(hours=1), 1))
+    edit()
+    assert feasibility_service.get_feasibility(15, teacher_id)["matched_count"] == 2
+
+    # A buffer pushes the 10:00 start inside the 9:00 slot's lesson.
+    buffered = feasibility_service.get_feasibility(15, teacher_id, buffer_minutes=15)
+    assert (buffered["matched_count"], buffered["buffer_minutes"]) == (1, 15)
+    with pytest.raises(ValueError):
+        feasibility_service.get_feasibility(15, teacher_id, buffer_minutes=-5)
+
+    # Reads leave the students alone; their lengths are the tracker's.
+    students[1].lesson_length = 30
+    assert feasibility_service.get_feasibility(15, teacher_id, buffer_minutes=15)["approximate"] is False
+    edit()
+    assert feasibility_service.get_feasibility(15, teacher_id)["approximate"] is True
+
+
+def test_interval_engine_schedules_each_students_own_lesson_length(monkeypatch, teacher_id):
+    day_start = datetime(2024, 2, 19, 9, 0)
+    students = [
+        _make_student(1, lesson_length=30),
+        _make_student(2, lesson_length=45),
+        _make_student(3, lesson_length=30),
+        _make_student(4, lesson_length=60),
+    ]
+    quarter = timedelta(minutes=15)
+    availabilities = [_make_teacher_availability(day_start + quarter * step, teacher_id) for step in range(8)]
+    availabilities.extend(
+        [
+            _make_student_availability(day_start, 1),
+            _make_student_availability(day_start + 2 * quarter, 2),
+            _make_student_availability(day_start + 5 * quarter, 3),
+            # Every start of student 4 overlaps lessons that fit the others.
+            _make_student_availability(day_start + quarter, 4),
+            _make_student_availability(day_start + 4 * quarter, 4),
+        ]
+    )
+    schedule = SimpleNamespace(
+        id=16,
+        teacher_id=teacher_id,
+        days=json.dumps([day_start.date().isoformat()]),
+        dates=[],
+        students=students,
+        availabilities=availabilities,
+    )
+    _patch_schedule(monkeypatch, schedule)
+
+    with pytest.raises(ValueError):
+        schedule_service.generate_schedule(16)
+    with pytest.raises(ValueError):
+        schedule_service.generate_schedule(16, engine="interval", k=2)
+    with pytest.raises(ValueError):
+        schedule_service.generate_schedule(16, engine="interval", incremental=True)
+
+    result = schedule_service.generate_schedule(16, engine="interval")
+
+    assert result["engine"] == "interval"
+    assert [(lesson["student_id"], lesson["start_time"], lesson["end_time"]) for lesson in result["lessons"]] == [
+        (1, day_start.isoformat(), (day_start + 2 * quarter).isoformat()),
+        (2, (day_start + 2 * quarter).isoformat(), (day_start + 5 * quarter).isoformat()),
+        (3, (day_start + 5 * quarter).isoformat(), (day_start + 7 * quarter).isoformat()),
+    ]
+    assert result["unscheduled_student_ids"] == [4]
+    # The flow model would keep 9:00, 9:30 and 10:00; 10:15 shares the last position.
+    assert result["objective_cost"] == 10_000 + 5 * (0 + 1**2 + 2**2)
+    assert "optimal" not in result
+
+
+def test_interval_engine_matches_flow_engine_on_uniform_lengths(monkeypatch, teacher_id):
+    rng = random.Random(5)
+    days = [datetime(2024, 2, 26, 9, 0) + timedelta(days=offset) for offset in range(3)]
+    starts = [day + timedelta(hours=step) for day in days for step in range(6)]
+    students = [_make_student(student_id) for student_id in range(1, 15)]
+    availabilities = [_make_teacher_availability(start, teacher_id) for start in starts]
+    for student in students:
+        availabilities.extend(_make_student_availability(start, student.id) for start in rng.sample(starts, 4))
+    schedule = SimpleNamespace(
+        id=17,
+        teacher_id=teacher_id,
+        days=json.dumps([day.date().isoformat() for day in days]),
+        dates=[],
+        students=students,
+        availabilities=availabilities,
+    )
+    _patch_schedule(monkeypatch, schedule)
+
+    flow = schedule_service.generate_schedule(17, engine="ssp")
+    interval = schedule_service.generate_schedule(17, engine="interval", diagnostics=True)
+
+    # Equal lengths on hourly starts are the flow model's slots, so the flow
+    # engines solve it, searching the days only when asked to.
+    assert interval["lessons"] == flow["lessons"]
+    assert interval["scheduled_count"] == flow["scheduled_count"] == 14
+    assert interval["objective_cost"] == flow["objective_cost"]
+    assert "lagrangian_iterations" not in interval["diagnostics"]["counters"]
+    assert "day_subsets_evaluated" not in interval["diagnostics"]["counters"]
+    # Every teacher start is already a slot here, so keeping them all changes nothing.
+    every = schedule_service.generate_schedule(17, candidate_starts="all", diagnostics=True)
+    assert every["lessons"] == flow["lessons"]
+    assert "day_subsets_evaluated" not in every["diagnostics"]["counters"]
+
+    exact = schedule_service.generate_schedule(17, engine="ssp", exact_days=True)
+    interval = schedule_service.generate_schedule(17, engine="interval", exact_days=True, diagnostics=True)
+    assert interval["objective_cost"] == exact["objective_cost"] <= flow["objective_cost"]
+    assert "optimal" not in interval
+    assert interval["diagnostics"]["counters"]["day_subsets_evaluated"] > 0
+
+
+def test_all_candidate_starts_schedule_students_between_greedy_slots(monkeypatch, teacher_id):
+    day_start = datetime(2024, 3, 4, 9, 0)
+    quarter = timedelta(minutes=15)
+    students = [_make_student(1, lesson_length=30), _make_student(2, lesson_length=30)]
+    availabilities = [_make_teacher_availability(day_start + quarter * step, teacher_id) for step in range(8)]
+    availabilities.extend(
+        [
+            _make_student_availability(day_start, 1),
+            _make_student_availability(day_start + 3 * quarter, 1),
+            # 9:15 overlaps the 9:00 slot, so the greedy filter drops it.
+            _make_student_availability(day_start + quarter, 2),
+        ]
+    )
+    schedule = SimpleNamespace(
+        id=18,
+        teacher_id=teacher_id,
+        days=json.dumps([day_start.date().isoformat()]),
+        dates=[],
+        students=students,
+        availabilities=availabilities,
+    )
+    _patch_schedule(monkeypatch, schedule)
+
+    with pytest.raises(ValueError):
+        schedule_service.generate_schedule(18, candidate_starts="some")
+    with pytest.raises(ValueError):
+        schedule_service.generate_schedule(18, candidate_starts="all", engine="ssp")
+
+    greedy = schedule_service.generate_schedule(18)
+    every = schedule_service.generate_schedule(18, candidate_starts="all")
+
+    assert greedy["unscheduled_student_ids"] == [2]
+    assert every["engine"] == "interval"
+    assert every["unscheduled_student_ids"] == []
+    assert [(lesson["student_id"], lesson["start_time"]) for lesson in every["lessons"]] == [
+        (2, (day_start + quarter).isoformat()),
+        (1, (day_start + 3 * quarter).isoformat()),
+    ]
+    assert every["objective_cost"] == 10_000 + 5 * (0 + 1**2)
+
+
+def test_all_candidate_starts_place_more_students_on_a_sparse_fine_grid(monkeypatch, teacher_id):
+    # Five-minute teacher starts, 30 minute lessons and two free starts per
+    # student: the greedy slots land on whoever is free first and block the
+    # offsets the others need.
+    rng = random.Random(0)
+    day_start = datetime(2024, 3, 5, 9, 0)
+    starts = [day_start + timedelta(minutes=5 * step) for step in range(36)]
+    students = [_make_student(student_id, lesson_length=30) for student_id in range(1, 9)]
+    availabilities = [_make_teacher_availability(start, teacher_id) for start in starts]
+    for student in students:
+        availabilities.extend(_make_student_availability(start, student.id) for start in rng.sample(starts, 2))
+    schedule = SimpleNamespace(
+        id=19,
+        teacher_id=teacher_id,
+        days=json.dumps([day_start.date().isoformat()]),
+        dates=[],
+        students=students,
+        availabilities=availabilities,
+    )
+    _patch_schedule(monkeypatch, schedule)
+
+    greedy = schedule_service.generate_schedule(19)
+    every = schedule_service.generate_schedule(19, candidate_starts="all")
+
+    assert (greedy["scheduled_count"], every["scheduled_count"]) == (3, 5)
+    assert "optimal" not in every
+
+
+def test_slots_from_rows_splits_teacher_and_student_rows(teacher_id):
+    day_start = datetime(2024, 3, 11, 9, 0)
+    next_day = day_start + timedelta(days=1)
+    rows = [
+        (None, teacher_id, day_start),
+        (None, teacher_id, next_day),
+        # Another teacher's row on the same schedule is not this teacher's slot.
+        (None, teacher_id + 1, day_start + timedelta(hours=1)),
+        (1, None, day_start),
+        (1, None, day_start),
+        (2, None, next_day),
+    ]
+
+    teacher_slots, student_slots = schedule_service._slots_from_rows(rows, teacher_id)
+
+    assert teacher_slots == {day_start.date(): [day_start], next_day.date(): [next_day]}
+    assert student_slots == {1: {day_start}, 2: {next_day}}
+    assert schedule_service._slots_from_rows(rows, None)[0] == {
+        day_start.date(): [day_start, day_start + timedelta(hours=1)],
+        next_day.date(): [next_day],
+    }
+
+
+def test_rolling_horizon_repairs_across_window_boundaries(monkeypatch, teacher_id):
+    first_day = datetime(2024, 3, 18, 9, 0)
+    second_day = first_day + timedelta(days=7)
+    students = [_make_student(1), _make_student(2)]
+    availabilities = [
+        _make_teacher_availability(first_day, teacher_id),
+        _make_teacher_availability(second_day, teacher_id),
+        _make_teacher_availability(second_day + timedelta(hours=1), teacher_id),
+        _make_student_availability(first_day, 1),
+        _make_student_availability(second_day, 1),
+        _make_student_availability(second_day + timedelta(hours=1), 2),
+    ]
+    schedule = SimpleNamespace(
+        id=19,
+        teacher_id=teacher_id,
+        days=json.dumps([first_day.date().isoformat(), second_day.date().isoformat()]),
+        dates=[],
+        students=students,
+        availabilities=availabilities,
+    )
+    _patch_schedule(monkeypatch, schedule)
+
+    with pytest.raises(ValueError):
+        schedule_service.generate_schedule(19, horizon_days=0)
+    with pytest.raises(ValueError):
+        schedule_service.generate_schedule(19, horizon_days=7, incremental=True)
+
+    monolithic = schedule_service.generate_schedule(19)
+    # The first week alone opens its day for student 1, although both fit the second.
+    greedy = schedule_service.generate_schedule(19, horizon_days=7, horizon_repair=0)
+    repaired = schedule_service.generate_schedule(19, horizon_days=7, diagnostics=True)
+    whole = schedule_service.generate_schedule(19, horizon_days=14)
+
+    assert monolithic["objective_cost"] == 10_000 + 5
+    assert greedy["scheduled_count"] == 2
+    assert greedy["objective_cost"] == 2 * 10_000 + 5
+    assert greedy["optimal"] is False
+    assert repaired["objective_cost"] == monolithic["objective_cost"]
+    assert [lesson["day"] for lesson in repaired["lessons"]] == [second_day.date().isoformat()] * 2
+    assert repaired["diagnostics"]["counters"]["horizon_repairs_kept"] == 1
+    assert whole["objective_cost"] == monolithic["objective_cost"]
+    assert "optimal" not in whole
+
+
+def test_assignment_engine_matches_flow_engines_without_day_open_cost(monkeypatch, teacher_id):
+    rng = random.Random(11)
+    days = [datetime(2024, 4, 1, 9, 0) + timedelta(days=offset) for offset in range(3)]
+    starts = [day + timedelta(hours=step) for day in days for step in range(5)]
+    for trial in range(5):
+        students = [_make_student(student_id) for student_id in range(1, 19)]
+        availabilities = [_make_teacher_availability(start, teacher_id) for start in starts]
+        for student in students:
+            availabilities.extend(
+                _make_student_availability(start, student.id) for start in rng.sample(starts, rng.randint(1, 4))
+            )
+        schedule = SimpleNamespace(
+            id=20 + trial,
+            teacher_id=teacher_id,
+            days=json.dumps([day.date().isoformat() for day in days]),
+            dates=[],
+            students=students,
+            availabilities=availabilities,
+        )
+        _patch_schedule(monkeypatch, schedule)
+
+        assignment = schedule_service.generate_schedule(schedule.id, day_open_cost=0, gap_penalty=3)
+        ssp = schedule_service.generate_schedule(schedule.id, day_open_cost=0, gap_penalty=3, engine="ssp")
+        scaled = schedule_service.generate_schedule(schedule.id, day_open_cost=0, gap_penalty=3, engine="cost_scaling")
+        assert assignment["engine"] == "assignment"
+        assert (assignment["scheduled_count"], assignment["objective_cost"]) == (
+            ssp["scheduled_count"],
+            ssp["objective_cost"],
+        )
+        assert (assignment["scheduled_count"], assignment["objective_cost"]) == (
+            scaled["scheduled_count"],
+            scaled["objective_cost"],
+        )
+        taken = [(lesson["start_time"], lesson["student_id"]) for lesson in assignment["lessons"]]
+        assert len({start for start, _student_id in taken}) == len({student_id for _start, student_id in taken})
+
+    with pytest.raises(ValueError):
+        schedule_service.generate_schedule(schedule.id, engine="assignment")
+    with pytest.raises(ValueError):
+        schedule_service.generate_schedule(schedule.id, day_open_cost=0, engine="assignment", k=2)
+    assert schedule_service.generate_schedule(schedule.id, day_open_cost=0, k=2)["engine"] != "assignment"
+
+
+def test_cost_scaling_prices_its_days_at_a_low_day_open_cost(monkeypatch, teacher_id):
+    rng = random.Random(3)
+    days = [datetime(2024, 5, 6, 9, 0) + timedelta(days=offset) for offset in range(4)]
+    starts = [day + timedelta(hours=step) for day in days for step in range(4)]
+    for trial in range(6):
+        students = [_make_student(student_id) for student_id in range(1, 11)]
+        availabilities = [_make_teacher_availability(start, teacher_id) for start in starts]
+        for student in students:
+            availabilities.extend(
+                _make_student_availability(start, student.id) for start in rng.sample(starts, rng.randint(1, 3))
+            )
+        schedule = SimpleNamespace(
+            id=40 + trial,
+            teacher_id=teacher_id,
+            days=json.dumps([day.date().isoformat() for day in days]),
+            dates=[],
+            students=students,
+            availabilities=availabilities,
+        )
+        _patch_schedule(monkeypatch, schedule)
+
+        # Every subset of days, solved without a day-open cost and charged for the days it uses.
+        subsets = []
+        for size in range(1, len(days) + 1):
+            for subset in itertools.combinations(days, size):
+                schedule.days = json.dumps([day.date().isoformat() for day in subset])
+                result = schedule_service.generate_schedule(schedule.id, day_open_cost=0)
+                subsets.append((result["lessons"], result.get("objective_cost", 0)))
+        schedule.days = json.dumps([day.date().isoformat() for day in days])
+
+        for day_open_cost in (0, 10):
+            scaled = schedule_service.generate_schedule(
+                schedule.id, day_open_cost=day_open_cost, engine="cost_scaling"
+            )
+            ssp = schedule_service.generate_schedule(schedule.id, day_open_cost=day_open_cost, engine="ssp")
+            brute_force = min(
+                (-len(lessons), cost + day_open_cost * len({lesson["day"] for lesson in lessons}))
+                for lessons, cost in subsets
+            )
+            assert (-scaled["scheduled_count"], scaled["objective_cost"]) == brute_force
+            assert (-ssp["scheduled_count"], ssp["objective_cost"]) == brute_force
+
+
+def test_exact_days_finds_the_cheapest_set_of_days(monkeypatch, teacher_id):
+    rng = random.Random(0)
+    days = [datetime(2024, 5, 6, 9, 0) + timedelta(days=offset) for offset in range(4)]
+    starts = [day + timedelta(hours=step) for day in days for step in range(4)]
+    improved = 0
+    for trial in range(6):
+        students = [_make_student(student_id) for student_id in range(1, 11)]
+        availabilities = [_make_teacher_availability(start, teacher_id) for start in starts]
+        for student in students:
+            availabilities.extend(
+                _make_student_availability(start, student.id) for start in rng.sample(starts, rng.randint(1, 3))
+            )
+        schedule = SimpleNamespace(
+            id=25 + trial,
+            teacher_id=teacher_id,
+            days=json.dumps([day.date().isoformat() for day in days]),
+            dates=[],
+            students=students,
+            availabilities=availabilities,
+        )
+        _patch_schedule(monkeypatch, schedule)
+
+        heuristic = schedule_service.generate_schedule(schedule.id, engine="ssp")
+        exact = schedule_service.generate_schedule(schedule.id, engine="ssp", exact_days=True)
+        # Every subset of days, solved without a day-open cost and charged for the days it uses.
+        brute_force = []
+        for size in range(1, len(days) + 1):
+            for subset in itertools.combinations(days, size):
+                schedule.days = json.dumps([day.date().isoformat() for day in subset])
+                result = schedule_service.generate_schedule(schedule.id, day_open_cost=0)
+                used = {lesson["day"] for lesson in result["lessons"]}
+                brute_force.append((-result["scheduled_count"], result["objective_cost"] + 10_000 * len(used)))
+        schedule.days = json.dumps([day.date().isoformat() for day in days])
+
+        assert exact["scheduled_count"] == heuristic["scheduled_count"] == -min(brute_force)[0]
+        assert exact["objective_cost"] == min(brute_force)[1]
+        assert "optimal" not in exact
+        improved += exact["objective_cost"] < heuristic["objective_cost"]
+    assert improved
+
+    # Out of search time, the engine's own days come back, without a proof.
+    monkeypatch.setattr(schedule_core, "_DAY_SEARCH_MAX_SECONDS", 0)
+    schedule_service.schedule_cache.result_cache.clear()
+    cut = schedule_service.generate_schedule(schedule.id, engine="ssp", exact_days=True)
+    assert (cut["scheduled_count"], cut["objective_cost"]) == (heuristic["scheduled_count"], heuristic["objective_cost"])
+    assert cut["optimal"] is False
+
+    with pytest.raises(ValueError):
+        schedule_service.generate_schedule(schedule.id, exact_days=True, k=2)
+    with pytest.raises(ValueError):
+        schedule_service.generate_schedule(schedule.id, exact_days=True, horizon_days=7)
+
+
+def test_exported_network_replays_to_the_generate_result(monkeypatch, teacher_id, tmp_path):
+    from server.services import network_export
+
+    rng = random.Random(3)
+    days = [datetime(2024, 6, 3, 9, 0) + timedelta(days=offset) for offset in range(3)]
+    starts = [day + timedelta(hours=step) for day in days for step in range(5)]
+    students = [_make_student(student_id) for student_id in range(1, 13)]
+    availabilities = [_make_teacher_availability(start, teacher_id) for start in starts]
+    for student in students:
+        availabilities.extend(
+            _make_student_availability(start, student.id) for start in rng.sample(starts, rng.randint(1, 4))
+        )
+    schedule = SimpleNamespace(
+        id=31,
+        teacher_id=teacher_id,
+        days=json.dumps([day.date().isoformat() for day in days]),
+        dates=[],
+        students=students,
+        availabilities=availabilities,
+    )
+    _patch_schedule(monkeypatch, schedule)
+    dimacs_path = str(tmp_path / "network.min")
+
+    inputs = schedule_service._load_generate_inputs(31, None, None, 0)
+    summary = network_export.export_network(31, inputs, dimacs_path, gap_penalty=3)
+    with open(network_export.sidecar_path(dimacs_path)) as handle:
+        sidecar = json.load(handle)
+    with open(dimacs_path) as handle:
+        problem_line = next(line for line in handle if line.startswith("p "))
+
+    assert problem_line.split() == ["p", "min", str(summary["nodes"]["count"]), str(summary["arc_count"])]
+    assert len(sidecar["arc_tags"]) == summary["arc_count"]
+    assert {sidecar["arc_tags"][day["state"]["open_arc"]] for day in sidecar["days"]} <= {"open"}
+
+    generated = schedule_service.generate_schedule(31, gap_penalty=3, engine="ssp")
+    profile = io.StringIO()
+    replayed = network_export.replay_network(dimacs_path, "ssp", repeat=2, profile_output=profile)
+    assert len(replayed["solve_seconds"]) == 2
+    assert (replayed["scheduled_count"], replayed["objective_cost"]) == (
+        generated["scheduled_count"],
+        generated["objective_cost"],
+    )
+    assert "successive_shortest_path" in profile.getvalue()
+
+    with open(dimacs_path, "a") as handle:
+        handle.write("a 1 2 0 1 0\n")
+    with pytest.raises(ValueError):
+        network_export.load_network(dimacs_path)
+
+
+def test_batch_generate_matches_generate_schedule_without_the_database(monkeypatch, teacher_id, tmp_path):
+    from server.services import batch_generate
+
+    rng = random.Random(7)
+    days = [datetime(2024, 6, 10, 9, 0) + timedelta(days=offset) for offset in range(3)]
+    starts = [day + timedelta(hours=step) for day in days for step in range(4)]
+    students = [_make_student(student_id, f"Student {student_id}") for student_id in range(1, 9)]
+    student_starts = {student.id: sorted(rng.sample(starts, rng.randint(1, 3))) for student in students}
+    schedule = SimpleNamespace(
+        id=32,
+        teacher_id=teacher_id,
+        days=json.dumps([day.date().isoformat() for day in days]),
+        dates=[],
+        students=students,
+        availabilities=[_make_teacher_availability(start, teacher_id) for start in starts],
+    )
+    schedule.availabilities.extend(
+        _make_student_availability(start, student_id) for student_id, times in student_starts.items() for start in times
+    )
+    _patch_schedule(monkeypatch, schedule)
+    expected = schedule_service.generate_schedule(32, gap_penalty=3)
+
+    studio = {
+        "id": 32,
+        "days": [day.date().isoformat() for day in days],
+        "teacher_start_times": [start.isoformat() for start in starts],
+        "students": [
+            {
+                "id": student.id,
+                "name": student.name,
+                "lesson_length": student.lesson_length,
+                "start_times": [start.isoformat() for start in student_starts[student.id]],
+            }
+            for student in students
+        ],
+    }
+    ndjson_path = tmp_path / "studios.ndjson"
+    ndjson_path.write_text(
+        json.dumps(studio) + "\n\n" + json.dumps({"id": 33, "days": [], "students": []}) + "\n"
+    )
+    json_path = tmp_path / "studios.json"
+    json_path.write_text(json.dumps([{**studio, "id": 34, "options": {"engine": "ssp"}}]))
+    paths = [str(ndjson_path), str(json_path)]
+
+    records = list(batch_generate.generate_batch(batch_generate.read_studios(paths), {"gap_penalty": 3}))
+    assert [record["id"] for record in records] == [32, 33, 34]
+    assert records[0]["result"] == expected
+    assert records[1]["error_status"] == 400 and "teacher_start_times" in records[1]["error"]
+    assert records[2]["result"]["engine"] == "ssp"
+    assert records[2]["result"]["objective_cost"] == expected["objective_cost"]
+
+    pooled = list(
+        batch_generate.generate_batch(
+            batch_generate.read_studios(paths), {"gap_penalty": 3}, 2, multiprocessing.get_context("fork")
+        )
+    )
+    assert [record.get("result") for record in pooled] == [record.get("result") for record in records]
+
+
+_LOAD_INPUTS_FROM_SQLITE = """
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from flask import Flask
+from sqlalchemy import event, text
+
+from extensions import db
+from models.models import Availability, Schedule, Student, Teacher
+from services import schedule_service
+
+app = Flask(__name__)
+# A file, so a second connection can stand in for another worker.
+database = os.path.join(tempfile.mkdtemp(), "studio.db")
+app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + database
+db.init_app(app)
+start = datetime(2024, 3, 4, 9, 0)
+with app.app_context():
+    db.create_all()
+    db.session.add_all([
+        Teacher(id=1, email="one@example.com", password="-", name="One"),
+        Teacher(id=2, email="two@example.com", password="-", name="Two"),
+        Schedule(id=1, title="Studio", slug="studio", days=json.dumps(["2024-03-04", "2024-03-05"]), teacher_id=1),
+        Schedule(id=2, title="Other", slug="other", days=json.dumps(["2024-03-04"]), teacher_id=1),
+        Student(id=3, name="Cleo", lesson_length=30, schedule_id=1),
+        Student(id=1, name="Ada", lesson_length=30, schedule_id=1),
+        Student(id=2, name="Bo", lesson_length=30, schedule_id=2),
+        Availability(start_time=start, schedule_id=1, teacher_id=1),
+        Availability(start_time=start + timedelta(days=1), schedule_id=1, teacher_id=1),
+        # Another teacher's time on this schedule, and a row of another schedule.
+        Availability(start_time=start + timedelta(hours=1), schedule_id=1, teacher_id=2),
+        Availability(start_time=start, schedule_id=2, teacher_id=1),
+        Availability(start_time=start, schedule_id=1, student_id=1),
+        Availability(start_time=start + timedelta(days=1), schedule_id=1, student_id=3),
+        Availability(start_time=start, schedule_id=2, student_id=2),
+    ])
+    db.session.commit()
+    db.session.expunge_all()
+
+    statements = []
+    event.listen(db.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    inputs = schedule_service._load_generate_inputs(1, 1, None, 5)
+    selected = [statement.split("FROM")[0] for statement in statements]
+
+    schedule = db.session.get(Schedule, 1)
+    since = schedule_service.mark_edited(schedule)
+    with db.engine.begin() as other_worker:
+        other_worker.execute(text("UPDATE schedule SET version = version + 1 WHERE id = 1"))
+    db.session.commit()
+    print(json.dumps({
+        "students": [[student.id, student.name, student.lesson_length] for student in inputs.students],
+        "slot_minutes": inputs.slot_minutes,
+        "buffer_minutes": inputs.buffer_minutes,
+        "teacher_slots": {day.isoformat(): [t.isoformat() for t in times] for day, times in inputs.teacher_slots.items()},
+        "student_slots": {str(key): sorted(t.isoformat() for t in times) for key, times in inputs.student_slots.items()},
+        "schedule_days": sorted(day.isoformat() for day in inputs.schedule_days),
+        "statements": len(selected),
+        "selected": selected,
+        "versions": [since, schedule.version],
+    }))
+"""
+
+
+@pytest.mark.skipif(importlib.util.find_spec("flask_sqlalchemy") is None, reason="needs Flask-SQLAlchemy")
+def test_load_generate_inputs_against_sqlalchemy_models():
+    # This module stubs models.models, so the real models load in a fresh interpreter.
+    completed = subprocess.run(
+        [sys.executable, "-c", _LOAD_INPUTS_FROM_SQLITE],
+        cwd=os.path.join(ROOT_DIR, "server"),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    loaded = json.loads(completed.stdout)
+
+    assert loaded["students"] == [[1, "Ada", 30], [3, "Cleo", 30]]
+    assert (loaded["slot_minutes"], loaded["buffer_minutes"]) == (30, 5)
+    assert loaded["teacher_slots"] == {
+        "2024-03-04": ["2024-03-04T09:00:00"],
+        "2024-03-05": ["2024-03-05T09:00:00"],
+    }
+    assert loaded["student_slots"] == {"1": ["2024-03-04T09:00:00"], "3": ["2024-03-05T09:00:00"]}
+    assert loaded["schedule_days"] == ["2024-03-04", "2024-03-05"]
+    # The schedule, then one narrow SELECT each for students and availability.
+    assert loaded["statements"] == 3
+    assert "lesson_length" in loaded["selected"][1] and "slug" not in loaded["selected"][1]
+    assert "start_time" in loaded["selected"][2] and "availability.id" not in loaded["selected"][2]
+    # mark_edited increments in SQL, so an edit committed in between is not lost.
+    assert loaded["versions"] == [0, 2]
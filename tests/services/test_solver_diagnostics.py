@@ -0,0 +1,67 @@
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from server.services import solver_diagnostics
+from server.services.solver_diagnostics import GenerateDiagnostics
+
+
+def test_network_stats_accumulate_across_sub_problems():
+    diag = GenerateDiagnostics(1)
+    for nodes in (5, 7):
+        diag.add_network(
+            {
+                "nodes": nodes,
+                "edges": 2 * nodes,
+                "build_seconds": 0.001,
+                "solve_seconds": 0.002,
+                "counters": {"augmentations": nodes},
+            }
+        )
+
+    payload = diag.to_dict()
+    assert payload["networks"] == {"count": 2, "nodes": 12, "edges": 24, "build_ms": 2.0, "flow_ms": 4.0}
+    assert payload["counters"] == {"augmentations": 12}
+
+
+def test_trace_memory_records_peak_allocation():
+    diag = GenerateDiagnostics(1, trace_memory=True)
+    with diag.measure():
+        block = bytearray(1 << 20)
+        diag.lap("work")
+        del block
+
+    payload = diag.to_dict()
+    assert payload["peak_memory_bytes"] >= 1 << 20
+    assert payload["total_ms"] >= payload["phases_ms"]["work"]
+
+
+def test_trace_memory_refuses_a_second_trace_while_one_runs():
+    first = GenerateDiagnostics(1, trace_memory=True)
+    with first.measure():
+        with pytest.raises(RuntimeError):
+            with GenerateDiagnostics(2, trace_memory=True).measure():
+                pass  # pragma: no cover - the trace is refused before this runs
+        with GenerateDiagnostics(3).measure():
+            pass
+    assert not tracemalloc.is_tracing()
+
+    second = GenerateDiagnostics(4, trace_memory=True)
+    with second.measure():
+        pass
+    assert second.peak_memory_bytes is not None
+
+
+def test_failing_metrics_hook_does_not_raise(monkeypatch):
+    def broken_hook(_payload):
+        raise RuntimeError("collector offline")
+
+    monkeypatch.setattr(solver_diagnostics, "_metrics_hook", broken_hook)
+
+    solver_diagnostics.emit(GenerateDiagnostics(1))
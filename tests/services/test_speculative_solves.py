@@ -0,0 +1,103 @@
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from server.services import schedule_cache
+from server.services.generation_jobs import FAILED, GenerationJobs
+from server.services.speculative_solves import SpeculativeSolves
+
+
+def _wait_until(condition, timeout=5):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        time.sleep(0.01)
+    raise AssertionError("condition was not reached")
+
+
+def test_repeated_edits_debounce_into_one_solve():
+    entered = []
+
+    @contextmanager
+    def context():
+        entered.append(1)
+        yield
+
+    jobs = GenerationJobs(max_workers=1)
+    solves = SpeculativeSolves(delay_seconds=0.2, enabled=True, context=context, jobs=jobs)
+    calls = []
+    done = threading.Event()
+
+    def run():
+        calls.append(1)
+        done.set()
+
+    for _ in range(3):
+        assert solves.schedule(101, 1, run)
+        time.sleep(0.01)
+
+    assert done.wait(5)
+    _wait_until(lambda: not solves.pending(101))
+    assert calls == [1] and entered == [1]
+    stats = solves.stats()
+    assert (stats["scheduled"], stats["cancelled"], stats["started"]) == (3, 2, 1)
+    # The solve ran as a job on the pool it was given.
+    _wait_until(lambda: jobs.stats()["succeeded"] == 1)
+
+
+def test_cancel_and_invalidation_stop_a_waiting_solve():
+    solves = SpeculativeSolves(delay_seconds=0.05, enabled=True, jobs=GenerationJobs())
+    calls = []
+
+    solves.schedule(102, 1, lambda: calls.append(102))
+    assert solves.cancel(102)
+    assert not solves.cancel(102)
+
+    # An edit that only reaches the result cache still cancels it.
+    solves.schedule(103, 1, lambda: calls.append(103))
+    schedule_cache.invalidate_schedule(103)
+    _wait_until(lambda: not solves.pending(103))
+    time.sleep(0.1)
+
+    assert calls == []
+    assert solves.stats()["cancelled"] == 2
+
+
+def test_failed_or_disabled_solves_do_not_raise():
+    jobs = GenerationJobs()
+    solves = SpeculativeSolves(delay_seconds=0, enabled=True, jobs=jobs)
+
+    def run():
+        raise ValueError("Schedule not found.")
+
+    solves.schedule(104, 1, run)
+    _wait_until(lambda: solves.stats()["failed"] == 1)
+    _wait_until(lambda: jobs.stats()[FAILED] == 1)
+
+    solves.configure(enabled=False)
+    assert not solves.schedule(104, 1, run)
+    assert not solves.pending(104)
+    assert not SpeculativeSolves().enabled
+
+
+def test_a_full_job_queue_drops_the_solve():
+    jobs = GenerationJobs(max_workers=1, max_pending=1)
+    release = threading.Event()
+    jobs.submit("busy", 105, 1, release.wait)
+    solves = SpeculativeSolves(delay_seconds=0, enabled=True, jobs=jobs)
+    calls = []
+
+    try:
+        solves.schedule(106, 1, lambda: calls.append(106))
+        _wait_until(lambda: solves.stats()["dropped"] == 1)
+    finally:
+        release.set()
+
+    assert calls == [] and not solves.pending(106)
+    assert solves.stats()["started"] == 0